@@ -30,7 +30,10 @@ CREATE TABLE IF NOT EXISTS products (
     price DECIMAL(10,2) NOT NULL,
     stock INT NOT NULL,
     image_path VARCHAR(255),
-    import_date DATE
+    import_date DATE,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_products_name (name),
+    INDEX idx_products_updated_at (updated_at)
 );
 
 -- Bảng quản lý đơn hàng
@@ -42,7 +45,15 @@ CREATE TABLE IF NOT EXISTS orders (
     order_date DATETIME DEFAULT CURRENT_TIMESTAMP,
     total_amount DECIMAL(10,2) NOT NULL,
     status VARCHAR(50) DEFAULT 'Pending',
-    FOREIGN KEY (user_id) REFERENCES users(id)
+    phone_reversed VARCHAR(15) AS (REVERSE(REPLACE(REPLACE(REPLACE(phone_number, ' ', ''), '-', ''), '.', ''))) STORED,
+    phone_digits VARCHAR(15) AS (REPLACE(REPLACE(REPLACE(phone_number, ' ', ''), '-', ''), '.', '')) STORED,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    INDEX idx_orders_order_date (order_date, id),
+    INDEX idx_orders_customer_name (customer_name),
+    INDEX idx_orders_phone_number (phone_number),
+    INDEX idx_orders_phone_reversed (phone_reversed),
+    INDEX idx_orders_phone_digits (phone_digits),
+    FULLTEXT INDEX ft_orders_customer_name (customer_name)
 );
 
 -- Bảng chi tiết đơn hàng
@@ -79,4 +90,37 @@ CREATE TABLE IF NOT EXISTS invoices (
     FOREIGN KEY (order_id) REFERENCES orders(id),
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
+
+-- Bảng cộng dồn doanh thu theo ngày / tuần / tháng / toàn thời gian ('all', '1970-01-01')
+CREATE TABLE IF NOT EXISTS sales_rollup (
+    period_type VARCHAR(5) NOT NULL,
+    period_start DATE NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(15,2) NOT NULL DEFAULT 0,
+    units_sold INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (period_type, period_start)
+);
+
+-- Nhật ký thay đổi chỉ-ghi-thêm, các quầy đọc tiếp theo id để đồng bộ (xem services/change_feed.py)
+CREATE TABLE IF NOT EXISTS change_events (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    entity VARCHAR(20) NOT NULL,
+    entity_id VARCHAR(20) NOT NULL,
+    action VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_change_events_created_at (created_at)
+);
+
+-- Bộ đếm cấp mã ORD/INV/NV, mỗi quầy đặt trước từng khối số
+CREATE TABLE IF NOT EXISTS id_sequences (
+    name VARCHAR(20) PRIMARY KEY,
+    next_value BIGINT NOT NULL
+);
+
+-- Các phiên bản schema đã áp dụng (xem csdl/migrations.py)
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INT PRIMARY KEY,
+    description VARCHAR(255) NOT NULL,
+    applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
 """
\ No newline at end of file
@@ -0,0 +1,259 @@
+# csdl/migrations.py
+# Các bước nâng cấp schema có đánh số phiên bản, được áp dụng khi khởi động ứng dụng
+# hoặc chạy tay:
+#     python -m csdl.migrations            # áp dụng các migration còn thiếu
+#     python -m csdl.migrations --status   # xem phiên bản hiện tại
+#     python -m csdl.migrations --check    # EXPLAIN các truy vấn nóng, lỗi nếu quét toàn bảng
+
+import argparse
+import sys
+
+from database_connection import get_connection
+from services.sales_rollup import ensure_rollup_table, ensure_units_column
+from services.id_allocator import ensure_sequences
+from services.change_log import ensure_change_table
+
+CREATE_MIGRATIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        description VARCHAR(255) NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def index_exists(cursor, table, index_name):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        LIMIT 1
+    """, (table, index_name))
+    return cursor.fetchone() is not None
+
+def create_index(cursor, table, index_name, columns):
+    # MySQL không hỗ trợ CREATE INDEX IF NOT EXISTS nên tự kiểm tra trước
+    if not index_exists(cursor, table, index_name):
+        cursor.execute(f"CREATE INDEX {index_name} ON {table} ({columns})")
+
+def column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        LIMIT 1
+    """, (table, column))
+    return cursor.fetchone() is not None
+
+# Chỉ mục phục vụ các truy vấn nóng: (bảng, tên chỉ mục, cột)
+HOT_PATH_INDEXES = [
+    # OrderManagementTab.loadOrders: lọc theo khoảng order_date, sắp xếp mới nhất trước
+    ("orders", "idx_orders_order_date", "order_date, id"),
+    # Tìm đơn hàng theo tên khách / số điện thoại
+    ("orders", "idx_orders_customer_name", "customer_name"),
+    ("orders", "idx_orders_phone_number", "phone_number"),
+    # SalesTab.loadProducts: ORDER BY name
+    ("products", "idx_products_name", "name"),
+]
+
+def _migration_sales_rollup(conn):
+    # Dựng lại dù bảng đã tồn tại: migration chưa được ghi nhận nghĩa là lần dựng trước chưa xong
+    ensure_rollup_table(conn, rebuild_data=True)
+
+def _migration_hot_path_indexes(conn):
+    cursor = conn.cursor()
+    try:
+        for table, index_name, columns in HOT_PATH_INDEXES:
+            create_index(cursor, table, index_name, columns)
+    finally:
+        cursor.close()
+
+def _migration_id_sequences(conn):
+    ensure_sequences(conn)
+
+# Tìm đơn hàng: số điện thoại đảo ngược (chỉ giữ chữ số) để tìm theo đuôi số bằng chỉ mục,
+# FULLTEXT trên tên khách thay cho LIKE '%...%'
+PHONE_REVERSED_COLUMN = (
+    "phone_reversed VARCHAR(15) AS "
+    "(REVERSE(REPLACE(REPLACE(REPLACE(phone_number, ' ', ''), '-', ''), '.', ''))) STORED")
+SEARCH_INDEXES = [
+    ("orders", "idx_orders_phone_reversed", "phone_reversed"),
+]
+FULLTEXT_INDEXES = [
+    ("orders", "ft_orders_customer_name", "customer_name"),
+]
+
+def _migration_order_search(conn):
+    cursor = conn.cursor()
+    try:
+        if not column_exists(cursor, "orders", "phone_reversed"):
+            cursor.execute(f"ALTER TABLE orders ADD COLUMN {PHONE_REVERSED_COLUMN}")
+        for table, index_name, columns in SEARCH_INDEXES:
+            create_index(cursor, table, index_name, columns)
+        for table, index_name, columns in FULLTEXT_INDEXES:
+            if not index_exists(cursor, table, index_name):
+                cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {index_name} ({columns})")
+    finally:
+        cursor.close()
+
+def _migration_rollup_units(conn):
+    ensure_units_column(conn)
+
+# Mốc thay đổi cho việc làm mới định kỳ danh mục sản phẩm (chỉ đọc các dòng đổi sau mốc)
+UPDATED_AT_COLUMN = "updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"
+CHANGE_INDEXES = [
+    ("products", "idx_products_updated_at", "updated_at"),
+]
+
+def _migration_products_updated_at(conn):
+    cursor = conn.cursor()
+    try:
+        if not column_exists(cursor, "products", "updated_at"):
+            cursor.execute(f"ALTER TABLE products ADD COLUMN {UPDATED_AT_COLUMN}")
+        for table, index_name, columns in CHANGE_INDEXES:
+            create_index(cursor, table, index_name, columns)
+    finally:
+        cursor.close()
+
+def _migration_change_events(conn):
+    ensure_change_table(conn)
+
+# Tìm theo đầu số trên cùng dạng chuẩn hóa với phone_reversed ("090 123 4567" khớp "0901")
+PHONE_DIGITS_COLUMN = (
+    "phone_digits VARCHAR(15) AS "
+    "(REPLACE(REPLACE(REPLACE(phone_number, ' ', ''), '-', ''), '.', '')) STORED")
+PHONE_DIGITS_INDEXES = [
+    ("orders", "idx_orders_phone_digits", "phone_digits"),
+]
+
+def _migration_phone_digits(conn):
+    cursor = conn.cursor()
+    try:
+        if not column_exists(cursor, "orders", "phone_digits"):
+            cursor.execute(f"ALTER TABLE orders ADD COLUMN {PHONE_DIGITS_COLUMN}")
+        for table, index_name, columns in PHONE_DIGITS_INDEXES:
+            create_index(cursor, table, index_name, columns)
+    finally:
+        cursor.close()
+
+# (phiên bản, mô tả, hàm áp dụng) - chỉ thêm vào cuối, không sửa migration đã phát hành
+MIGRATIONS = [
+    (1, "Bảng cộng dồn doanh thu sales_rollup", _migration_sales_rollup),
+    (2, "Chỉ mục cho các truy vấn nóng trên orders và products", _migration_hot_path_indexes),
+    (3, "Bảng dãy số id_sequences cho mã đơn hàng, hóa đơn, nhân viên", _migration_id_sequences),
+    (4, "Tìm đơn hàng: cột phone_reversed có chỉ mục và FULLTEXT trên tên khách", _migration_order_search),
+    (5, "sales_rollup: cột units_sold và các dòng theo tuần", _migration_rollup_units),
+    (6, "products.updated_at có chỉ mục cho làm mới định kỳ", _migration_products_updated_at),
+    (7, "Nhật ký thay đổi change_events để đồng bộ giữa các quầy", _migration_change_events),
+    (8, "Tìm đơn hàng: cột phone_digits (số điện thoại chỉ giữ chữ số) có chỉ mục", _migration_phone_digits),
+]
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_MIGRATIONS_TABLE)
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+def current_version(conn):
+    return max(applied_versions(conn), default=0)
+
+def apply_migrations(conn):
+    # Áp dụng lần lượt các migration chưa chạy, trả về danh sách phiên bản vừa áp dụng
+    done = applied_versions(conn)
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        migrate(conn)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (version, description))
+            conn.commit()
+        finally:
+            cursor.close()
+        print(f"Đã áp dụng migration {version}: {description}")
+        applied.append(version)
+    return applied
+
+# Truy vấn nóng cần được kiểm tra kế hoạch thực thi: (tên, câu lệnh, tham số, bảng, chỉ mục mong đợi)
+HOT_QUERIES = [
+    ("Danh sách đơn hàng theo khoảng ngày",
+     "SELECT id, customer_name, phone_number, order_date, total_amount, status "
+     "FROM orders WHERE order_date BETWEEN %s AND %s ORDER BY order_date DESC",
+     ("2024-01-01", "2024-02-01"), "orders", "idx_orders_order_date"),
+    ("Tìm đơn hàng theo tên khách",
+     "SELECT id FROM orders WHERE MATCH(customer_name) AGAINST (%s IN BOOLEAN MODE)",
+     ("+nguyen*",), "orders", "ft_orders_customer_name"),
+    ("Tìm đơn hàng theo tên khách (từ ngắn)",
+     "SELECT id FROM orders WHERE customer_name LIKE %s",
+     ("Ng%",), "orders", "idx_orders_customer_name"),
+    ("Tìm đơn hàng theo đầu số điện thoại",
+     "SELECT id FROM orders WHERE phone_digits LIKE %s",
+     ("090%",), "orders", "idx_orders_phone_digits"),
+    ("Tìm đơn hàng theo đuôi số điện thoại",
+     "SELECT id FROM orders WHERE phone_reversed LIKE %s",
+     ("4321%",), "orders", "idx_orders_phone_reversed"),
+    ("Sản phẩm thay đổi từ lần làm mới trước",
+     "SELECT id, name, price, stock, image_path, import_date FROM products WHERE updated_at >= %s",
+     ("2024-01-01 00:00:00",), "products", "idx_products_updated_at"),
+    ("Danh mục sản phẩm theo tên",
+     "SELECT id, name, price, stock, image_path, import_date FROM products ORDER BY name",
+     (), "products", "idx_products_name"),
+]
+
+# Dưới ngần này dòng (ước lượng của EXPLAIN), optimizer quét toàn bảng là hợp lý, không coi là lỗi
+SMALL_TABLE_ROWS = 1000
+
+def check_query_plans(conn):
+    # Trả về danh sách lỗi; rỗng nghĩa là mọi truy vấn nóng đều dùng được chỉ mục
+    problems = []
+    cursor = conn.cursor(dictionary=True)
+    try:
+        indexes = HOT_PATH_INDEXES + SEARCH_INDEXES + FULLTEXT_INDEXES + CHANGE_INDEXES + PHONE_DIGITS_INDEXES
+        for table, index_name, _ in indexes:
+            if not index_exists(cursor, table, index_name):
+                problems.append(f"Thiếu chỉ mục {index_name} trên bảng {table}")
+
+        for name, sql, params, table, index_name in HOT_QUERIES:
+            cursor.execute("EXPLAIN " + sql, params)
+            for row in cursor.fetchall():
+                if row.get("table") != table:
+                    continue
+                # Lỗi cả khi chỉ mục vẫn khả dụng nhưng optimizer chọn cách khác (kế hoạch bị thoái lui)
+                key = row.get("key")
+                rows = int(row.get("rows") or 0)
+                if key != index_name and rows >= SMALL_TABLE_ROWS:
+                    plan = f"dùng {key}" if key else "quét toàn bảng"
+                    problems.append(f"{name}: {plan} trên {table} (~{rows:,} dòng) thay vì {index_name}")
+    finally:
+        cursor.close()
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration schema CSDL quán café")
+    parser.add_argument("--status", action="store_true", help="Chỉ hiển thị phiên bản schema hiện tại")
+    parser.add_argument("--check", action="store_true",
+                        help="Kiểm tra kế hoạch thực thi của các truy vấn nóng bằng EXPLAIN")
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        if args.status:
+            print(f"Phiên bản schema: {current_version(conn)} / {MIGRATIONS[-1][0]}")
+            return 0
+
+        apply_migrations(conn)
+        print(f"Phiên bản schema: {current_version(conn)}")
+
+        if args.check:
+            problems = check_query_plans(conn)
+            for problem in problems:
+                print(f"LỖI: {problem}")
+            if problems:
+                return 1
+            print("Mọi truy vấn nóng đều dùng chỉ mục.")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,56 @@
+import atexit
+import threading
+from contextlib import contextmanager
+
 import mysql.connector
 
+from db_pool import ConnectionPool, PoolTimeoutError
+
+DB_CONFIG = {
+    "host": "localhost",  # XAMPP chạy MySQL trên localhost
+    "user": "root",       # Mặc định user trong XAMPP
+    "password": "",       # Mật khẩu mặc định của MySQL trong XAMPP là rỗng
+    "database": "BTL_PY"  # Sử dụng database theo yêu cầu
+}
+
+# Cấu hình pool kết nối dùng chung cho mọi tab, dialog và form đăng nhập/đăng ký
+POOL_CONFIG = {
+    "min_size": 2,             # Số kết nối luôn giữ sẵn
+    "max_size": 10,            # Số kết nối tối đa mở cùng lúc
+    "idle_timeout": 300,       # Đóng kết nối dư thừa rảnh quá 5 phút
+    "checkout_timeout": 10,    # Thời gian chờ tối đa khi pool đã dùng hết
+    "health_check_after": 5    # Ping lại kết nối đã rảnh quá 5 giây trước khi giao
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def open_raw_connection():
+    # Mở một kết nối MySQL mới, không qua pool
+    return mysql.connector.connect(**DB_CONFIG)
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool = ConnectionPool(open_raw_connection, **POOL_CONFIG)
+                pool.warmup()
+                atexit.register(pool.close)
+                _pool = pool
+    return _pool
+
 def connect_db():
+    # Lấy kết nối từ pool; conn.close() sẽ trả kết nối về pool
     try:
-        db = mysql.connector.connect(
-            host="localhost",  # XAMPP chạy MySQL trên localhost
-            user="root",       # Mặc định user trong XAMPP
-            password="",       # Mật khẩu mặc định của MySQL trong XAMPP là rỗng
-            database="BTL_PY"    # Sử dụng database theo yêu cầu
-        )
-        return db
-    except mysql.connector.Error as err:
+        return get_pool().acquire()
+    except (mysql.connector.Error, PoolTimeoutError) as err:
         print(f"Lỗi kết nối CSDL: {err}")
         return None
+
+@contextmanager
+def get_connection():
+    # Dùng: with get_connection() as conn: ...
+    # Ném lỗi nếu không lấy được kết nối, kết nối luôn được trả về pool khi ra khỏi khối with
+    with get_pool().connection() as conn:
+        yield conn
@@ -0,0 +1,220 @@
+# db_pool.py
+# Pool kết nối dùng chung cho toàn bộ ứng dụng.
+# Kết nối được mở một lần và tái sử dụng, tránh phải bắt tay/xác thực với MySQL
+# mỗi lần bấm nút.
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    """Không lấy được kết nối nào trong thời gian chờ cho phép."""
+
+
+class PooledConnection:
+    """Bọc kết nối thật; close() trả kết nối về pool thay vì đóng hẳn."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        raw = self.__dict__.get("_raw")
+        if raw is None:
+            raise AttributeError(f"Kết nối đã được trả về pool, không thể dùng '{name}'")
+        return getattr(raw, name)
+
+    def __setattr__(self, name, value):
+        # Thuộc tính như autocommit phải được gán vào kết nối thật
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._raw, name, value)
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw)
+
+    def discard(self):
+        # Đóng hẳn kết nối thay vì trả về pool (không chắc trạng thái phía máy chủ)
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._discard(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    def __init__(self, factory, min_size=1, max_size=10, idle_timeout=300,
+                 checkout_timeout=10, health_check_after=5):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Cấu hình pool không hợp lệ: cần 0 <= min_size <= max_size, max_size >= 1")
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        # Chỉ ping lại kết nối đã rảnh lâu hơn ngưỡng này (giây)
+        self.health_check_after = health_check_after
+
+        self._idle = deque()  # (kết nối, thời điểm trả về pool)
+        self._size = 0        # Tổng số kết nối đang mở (rảnh + đang dùng)
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def warmup(self):
+        # Mở sẵn min_size kết nối để lần dùng đầu tiên không phải chờ
+        opened = []
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    break
+                self._size += 1
+            try:
+                opened.append(self._factory())
+            except Exception as e:
+                with self._cond:
+                    self._size -= 1
+                print(f"Không thể khởi tạo kết nối cho pool: {str(e)}")
+                break
+        now = time.monotonic()
+        with self._cond:
+            for raw in opened:
+                self._idle.append((raw, now))
+            self._cond.notify_all()
+
+    def acquire(self, timeout=None):
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            raw, last_used, to_close = None, None, []
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolTimeoutError("Pool kết nối đã bị đóng")
+                    to_close.extend(self._prune_idle())
+                    if self._idle:
+                        # LIFO: lấy kết nối vừa dùng gần nhất, ít khả năng bị server cắt
+                        raw, last_used = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Hết thời gian chờ kết nối ({timeout}s), pool đang dùng {self._size}/{self.max_size}")
+                    self._cond.wait(remaining)
+            self._close_all(to_close)
+
+            if raw is None:
+                try:
+                    raw = self._factory()
+                except Exception:
+                    self._discard(None)
+                    raise
+                return PooledConnection(self, raw)
+
+            # Kiểm tra sức khỏe kết nối trước khi giao cho người dùng
+            if time.monotonic() - last_used < self.health_check_after or self._is_alive(raw):
+                return PooledConnection(self, raw)
+            self._discard(raw)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle = [raw for raw, _ in self._idle]
+            self._size -= len(idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        self._close_all(idle)
+
+    def _release(self, raw):
+        ok = self._reset(raw)
+        to_close = []
+        with self._cond:
+            if ok and not self._closed:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._size -= 1
+                to_close.append(raw)
+            to_close.extend(self._prune_idle())
+            self._cond.notify()
+        self._close_all(to_close)
+
+    def _discard(self, raw):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        if raw is not None:
+            self._close_all([raw])
+
+    def _prune_idle(self):
+        # Đóng bớt kết nối rảnh quá idle_timeout nhưng luôn giữ lại min_size kết nối
+        # Phải được gọi khi đang giữ self._cond
+        expired = []
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size:
+            raw, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            expired.append(raw)
+        return expired
+
+    @staticmethod
+    def _reset(raw):
+        # Đọc hết kết quả còn dở và hủy giao dịch chưa commit để người dùng sau nhận kết nối sạch
+        try:
+            if getattr(raw, "unread_result", False):
+                raw.consume_results()
+            raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _is_alive(raw):
+        try:
+            return raw.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_all(connections):
+        for raw in connections:
+            try:
+                raw.close()
+            except Exception:
+                pass
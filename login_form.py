@@ -2,11 +2,20 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit,
     QPushButton, QMessageBox, QFrame, QHBoxLayout)
 from PySide6.QtGui import QFont, QIcon, QPixmap
 from PySide6.QtCore import Qt
-from database_connection import connect_db
+from services.query_executor import query_executor
 import hashlib
 import sys
 import globals
 
+def find_user(conn, username, password_hash):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, name, role 
+        FROM users 
+        WHERE username = %s AND password = %s
+    """, (username, password_hash))
+    return cursor.fetchone()
+
 class LoginForm(QWidget):
     def __init__(self, onLoginSuccess=None):
         super().__init__()
@@ -79,6 +88,7 @@ class LoginForm(QWidget):
         
         # Login button
         login_button = QPushButton("ĐĂNG NHẬP")
+        self.login_button = login_button
         login_button.setMinimumHeight(45)
         login_button.clicked.connect(self.login)
         
@@ -144,30 +154,30 @@ class LoginForm(QWidget):
             QMessageBox.warning(self, "Lỗi", "Vui lòng nhập đầy đủ thông tin!")
             return
         
-        conn = connect_db()
-        if conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    SELECT id, name, role 
-                    FROM users 
-                    WHERE username = %s AND password = %s
-                """, (username, password))
-                user = cursor.fetchone()
-                
-                if user:
-                    # Save current user ID to global variable
-                    globals.current_user_id = user[0]
-                    
-                    # Call the onLoginSuccess callback
-                    if self.onLoginSuccess:
-                        self.onLoginSuccess()
-                    self.hide()
-                else:
-                    QMessageBox.warning(self, "Lỗi", "Tên đăng nhập hoặc mật khẩu không đúng!")
-            finally:
-                cursor.close()
-                conn.close()
+        # Kiểm tra tài khoản ở luồng nền, khóa nút trong lúc chờ
+        self.login_button.setEnabled(False)
+        query_executor().submit(
+            find_user, username, password, owner=self, key="login",
+            on_result=self.onLoginChecked,
+            on_error=self.onLoginFailed
+        )
+    
+    def onLoginChecked(self, user):
+        self.login_button.setEnabled(True)
+        if user:
+            # Save current user ID to global variable
+            globals.current_user_id = user[0]
+            
+            # Call the onLoginSuccess callback
+            if self.onLoginSuccess:
+                self.onLoginSuccess()
+            self.hide()
+        else:
+            QMessageBox.warning(self, "Lỗi", "Tên đăng nhập hoặc mật khẩu không đúng!")
+    
+    def onLoginFailed(self, error):
+        self.login_button.setEnabled(True)
+        QMessageBox.critical(self, "Lỗi", f"Không thể kết nối đến cơ sở dữ liệu: {str(error)}")
     
     def set_register_window(self, register_window):
         self.register_window = register_window
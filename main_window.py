@@ -0,0 +1,411 @@
+# main_window.py
+# Cửa sổ chính của ứng dụng. Được main.py import sau khi đã bật đo thời gian khởi động;
+# tách khỏi main.py để tiến trình con của ReportJobRunner (spawn, import lại main.py dưới tên
+# __mp_main__) không phải nạp PySide6 và toàn bộ các service.
+
+import os
+import sys
+import importlib
+
+from startup_profiler import profiler
+
+from PySide6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget, 
+    QStackedWidget, QHBoxLayout, QPushButton, QButtonGroup, QLabel, QFrame,
+    QMessageBox, QMenu, QDialog, QProgressBar)
+from PySide6.QtGui import QFont, QCursor
+from PySide6.QtCore import Qt, QTimer
+
+from database_connection import connect_db
+from styles import Styles
+from services.dashboard_metrics import dashboard_metrics
+from services.sales_analytics import sales_analytics
+from csdl.migrations import apply_migrations
+from services.query_executor import query_executor
+from services.change_feed import change_feed
+
+# Import UI components - remove LoginForm import
+from ui.user_dialogs import UserProfileDialog, ChangePasswordDialog
+from login_form import LoginForm
+
+# Import globals
+import globals
+
+# Các tab chỉ được import và khởi tạo khi người dùng mở lần đầu (module, tên lớp)
+# StatisticsTab kéo theo matplotlib/NumPy nên không import sẵn
+TAB_SPECS = [
+    ("tabs.dashboard_tab", "DashboardTab"),
+    ("tabs.sales", "SalesTab"),
+    ("tabs.product_management", "ProductManagementTab"),
+    ("tabs.employee_management", "EmployeeManagementTab"),
+    ("tabs.order_management", "OrderManagementTab"),
+    ("tabs.statisticss", "StatisticsTab"),
+]
+CART_TAB_SPEC = ("tabs.cart", "CartTab")
+
+# Khởi tạo dần các tab còn lại khi ứng dụng rảnh (None để tắt)
+PREFETCH_DELAY_MS = 1500
+
+# Thời gian chờ trước khi hiện chỉ báo bận
+BUSY_DELAY_MS = 300
+
+class CafeManagementUI(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Quản Lý Quán Café")
+        self.setMinimumSize(1400, 900)
+        
+        self.busy_indicator = None
+        query_executor().busyChanged.connect(self.onBusyChanged)
+        
+        # Schema phải sẵn sàng trước khi đăng nhập / đăng ký (bảng dãy số cấp mã NV)
+        with profiler.span("prepareDatabase"):
+            self.prepareDatabase()
+        
+        # Khởi chạy form đăng nhập trước
+        self.showLoginForm()
+    
+    def showLoginForm(self):
+        self.login_form = LoginForm(onLoginSuccess=self.initializeMainUI)
+        self.login_form.show()
+    
+    def initializeMainUI(self):
+        try:
+            # Lấy thông tin người dùng hiện tại từ CSDL dựa trên ID đã lưu trong globals
+            print(f"Initializing UI with user_id: {globals.current_user_id}")
+            profiler.mark("login accepted")
+            with profiler.span("getUserInfo"):
+                self.current_user = self.getUserInfo()
+            if not self.current_user:
+                print("Failed to get user info")
+                return
+        
+            central_widget = QWidget()
+            self.setCentralWidget(central_widget)
+        
+            main_layout = QVBoxLayout(central_widget)
+            main_layout.setSpacing(0)
+            main_layout.setContentsMargins(0, 0, 0, 0)
+        
+            with profiler.span("createHeader"):
+                self.createHeader(main_layout)
+            with profiler.span("createContent"):
+                self.createContent(main_layout)
+            self.setStyleSheet(Styles.MAIN_STYLE)
+            
+            # Nhận thay đổi từ các quầy khác qua nhật ký change_events
+            change_feed().start()
+        
+            # Hiển thị cửa sổ chính
+            profiler.watch_first_paint(self, "main window first paint", write_report=True)
+            self.show()
+            
+            print("Main UI initialized and shown")
+        except Exception as e:
+            print(f"Error initializing main UI: {str(e)}")
+            import traceback
+            traceback.print_exc()
+    
+    def createHeader(self, layout):
+        header_frame = QFrame()
+        header_frame.setStyleSheet("""
+        QFrame {
+            background-color: #1976D2;
+            padding: 0px;
+        }
+        QLabel {
+            color: white;
+        }
+        QPushButton {
+            color: white;
+            border: none;
+            padding: 10px 20px;
+            font-size: 14px;
+            font-weight: normal;
+        }
+        QPushButton:hover {
+            background-color: #1565C0;
+        }
+        QPushButton:checked {
+            background-color: #0D47A1;
+            font-weight: bold;
+        }
+        #userButton, #cartButton {
+            padding: 5px 15px;
+            background-color: #1565C0;
+            border-radius: 5px;
+            margin: 5px;
+        }
+        #userButton:hover, #cartButton:hover {
+            background-color: #0D47A1;
+        }
+    """)
+    
+        header_layout = QVBoxLayout(header_frame)
+        header_layout.setSpacing(0)
+        header_layout.setContentsMargins(0, 0, 0, 0)
+    
+        # Top bar với logo và user info
+        top_bar = QHBoxLayout()
+    
+        logo_label = QLabel("QUẢN LÝ QUÁN CAFÉ")
+        logo_label.setFont(QFont("Arial", 18, QFont.Weight.Bold))
+        logo_label.setStyleSheet("padding: 10px 20px;")
+        top_bar.addWidget(logo_label)
+    
+        top_bar.addStretch()
+    
+        # Chỉ báo bận khi có truy vấn chạy nền; chỉ hiện nếu chờ lâu hơn BUSY_DELAY_MS để tránh nháy
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setRange(0, 0)
+        self.busy_indicator.setFixedSize(120, 8)
+        self.busy_indicator.setTextVisible(False)
+        self.busy_indicator.setVisible(False)
+        self.busy_indicator.setToolTip("Đang tải dữ liệu...")
+        top_bar.addWidget(self.busy_indicator)
+        self.busy_timer = QTimer(self)
+        self.busy_timer.setSingleShot(True)
+        self.busy_timer.setInterval(BUSY_DELAY_MS)
+        self.busy_timer.timeout.connect(lambda: self.busy_indicator.setVisible(query_executor().isBusy()))
+    
+        # Add cart button
+        self.cart_button = QPushButton("🛒 Giỏ hàng")
+        self.cart_button.setObjectName("cartButton")
+        self.cart_button.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+        self.cart_button.clicked.connect(self.openCart)
+        top_bar.addWidget(self.cart_button)
+    
+        self.user_button = QPushButton(f"👤 {self.current_user['name']} ({self.current_user['role']})")
+        self.user_button.setObjectName("userButton")
+        self.user_button.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+        self.user_button.clicked.connect(self.showUserMenu)
+        top_bar.addWidget(self.user_button)
+    
+        header_layout.addLayout(top_bar)
+    
+        # Menu bar
+        menu_bar = QHBoxLayout()
+        menu_bar.setSpacing(0)
+        menu_bar.setContentsMargins(20, 0, 20, 0)
+    
+        self.nav_buttons = []
+        nav_items = [
+            ("🏠 Trang Chủ", 0),
+            ("🛒 Oder", 1),
+            ("📋 Quản Lý Sản Phẩm", 2),
+            ("👤 Quản Lý Nhân Viên", 3),
+            ("📦 Quản Lý Đơn Hàng", 4),
+            ("📊 Thống Kê", 5)
+        ]
+    
+        button_group = QButtonGroup(self)
+        button_group.setExclusive(True)
+    
+        for text, index in nav_items:
+            btn = QPushButton(text)
+            btn.setCheckable(True)
+            btn.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
+            btn.clicked.connect(lambda checked, x=index: self.showTab(x))
+            button_group.addButton(btn)
+            menu_bar.addWidget(btn)
+            self.nav_buttons.append(btn)
+    
+        self.nav_buttons[0].setChecked(True)
+    
+        header_layout.addLayout(menu_bar)
+        layout.addWidget(header_frame)
+
+    def onBusyChanged(self, busy):
+        # Chỉ báo nằm trên header, chưa có trước khi đăng nhập
+        if self.busy_indicator is None:
+            return
+        if busy:
+            self.busy_timer.start()
+        else:
+            self.busy_timer.stop()
+            self.busy_indicator.setVisible(False)
+
+    def showUserMenu(self):
+        menu = QMenu(self)
+        menu.setStyleSheet("""
+            QMenu {
+                background-color: white;
+                border: 1px solid #ddd;
+            }
+            QMenu::item {
+                padding: 8px 20px;
+            }
+            QMenu::item:selected {
+                background-color: #1976D2;
+                color: white;
+            }
+        """)
+    
+        profile_action = menu.addAction("👤 Thông tin cá nhân")
+        change_password_action = menu.addAction("🔑 Đổi mật khẩu")
+        menu.addSeparator()
+        logout_action = menu.addAction("🚪 Đăng xuất")
+    
+        profile_action.triggered.connect(self.showProfile)
+        change_password_action.triggered.connect(self.showChangePassword)
+        logout_action.triggered.connect(self.logout)
+    
+        menu.exec_(QCursor.pos())
+
+    def openCart(self):
+        # Chuyển đến tab giỏ hàng
+        self.showTab(self.cart_tab_index)
+    
+        # Bỏ chọn tất cả các nút điều hướng
+        for button in self.nav_buttons:
+            button.setChecked(False)
+
+    def createContent(self, layout):
+        self.content_stack = QStackedWidget()
+        self.cart_tab = None
+    
+        # Mỗi tab (và CartTab ở cuối) giữ chỗ bằng một widget rỗng cho đến khi được mở
+        self.tab_specs = TAB_SPECS + [CART_TAB_SPEC]
+        self.tabs = [None] * len(self.tab_specs)
+        for _ in self.tab_specs:
+            self.content_stack.addWidget(QWidget())
+        self.cart_tab_index = len(self.tab_specs) - 1
+    
+        layout.addWidget(self.content_stack)
+    
+        # Chỉ dựng trang chủ ngay sau khi đăng nhập
+        self.showTab(0)
+        if PREFETCH_DELAY_MS is not None:
+            QTimer.singleShot(PREFETCH_DELAY_MS, self.prefetchNextTab)
+
+    def showTab(self, index):
+        self.ensureTab(index)
+        self.content_stack.setCurrentIndex(index)
+
+    def ensureTab(self, index):
+        if self.tabs[index] is not None:
+            return self.tabs[index]
+    
+        module_name, class_name = self.tab_specs[index]
+        with profiler.span(f"import {module_name}", "tab"):
+            tab_class = getattr(importlib.import_module(module_name), class_name)
+        with profiler.span(f"{class_name}.__init__", "tab"):
+            tab = tab_class()
+        self.tabs[index] = tab
+    
+        # Thay widget giữ chỗ bằng tab thật
+        placeholder = self.content_stack.widget(index)
+        current = self.content_stack.currentIndex()
+        self.content_stack.insertWidget(index, tab)
+        self.content_stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.content_stack.setCurrentIndex(current)
+    
+        if index == self.cart_tab_index:
+            self.cart_tab = tab
+            # Đơn hàng mới làm số liệu trang chủ và thống kê doanh thu cũ đi
+            tab.orderPlaced.connect(dashboard_metrics.invalidate)
+            tab.orderPlaced.connect(sales_analytics.invalidate)
+        elif hasattr(tab, "setCartTab"):
+            # Set CartTab cho SalesTab
+            tab.setCartTab(self.ensureTab(self.cart_tab_index))
+        return tab
+
+    def prefetchNextTab(self):
+        # Mỗi lần rảnh chỉ dựng một tab để giao diện vẫn phản hồi
+        if not self.isVisible() or None not in self.tabs:
+            return
+        try:
+            self.ensureTab(self.tabs.index(None))
+        except Exception as e:
+            print(f"Error prefetching tab: {str(e)}")
+            return
+        QTimer.singleShot(0, self.prefetchNextTab)
+
+    def prepareDatabase(self):
+        # Áp dụng các migration schema còn thiếu (bảng phụ, chỉ mục)
+        conn = connect_db()
+        if conn:
+            try:
+                apply_migrations(conn)
+            except Exception as e:
+                print(f"Error applying schema migrations: {str(e)}")
+            finally:
+                conn.close()
+
+    def getUserInfo(self):
+        conn = connect_db()
+        if conn:
+            try:
+                cursor = conn.cursor()
+                # Lấy user_id từ biến toàn cục đã lưu khi đăng nhập
+                user_id = globals.current_user_id
+            
+                cursor.execute("""
+                SELECT id, username, name, email, phone, role
+                FROM users
+                WHERE id = %s
+                """, (user_id,))
+                user = cursor.fetchone()
+                if user:
+                    return {
+                    "id": user[0],
+                    "username": user[1],
+                    "name": user[2],
+                    "email": user[3],
+                    "phone": user[4],
+                    "role": user[5]
+                }
+            except Exception as e:
+                print(f"Error fetching user info: {str(e)}")
+            finally:
+                conn.close()
+
+        # Return default user info if database connection fails
+        return {
+            "id": "Unknown",
+            "username": "unknown",
+            "name": "Unknown User",
+            "role": "User",
+            "email": "unknown@example.com",
+            "phone": "N/A"
+        }
+
+    def showProfile(self):
+        dialog = UserProfileDialog(self.current_user, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            # Refresh user info
+            self.current_user = self.getUserInfo()
+            self.user_button.setText(f"👤 {self.current_user['name']} ({self.current_user['role']})")
+
+    def showChangePassword(self):
+        dialog = ChangePasswordDialog(self.current_user["id"], self)
+        dialog.exec()
+
+    def logout(self):
+        reply = QMessageBox.question(self, 'Xác nhận', 
+                                    'Bạn có chắc chắn muốn đăng xuất?',
+                                    QMessageBox.StandardButton.Yes | 
+                                    QMessageBox.StandardButton.No,
+                                    QMessageBox.StandardButton.No)
+    
+        if reply == QMessageBox.StandardButton.Yes:
+            # Xóa thông tin người dùng hiện tại
+            globals.current_user_id = None
+            change_feed().stop()
+        
+            # Đóng cửa sổ hiện tại và hiển thị form đăng nhập
+            self.hide()
+            self.showLoginForm()
+    def showLoginForm(self):
+        with profiler.span("LoginForm.__init__"):
+            self.login_form = LoginForm(onLoginSuccess=lambda: print("Login successful") or self.initializeMainUI())
+        profiler.watch_first_paint(self.login_form, "login window first paint", write_report=True)
+        self.login_form.show()
+
+def run():
+    profiler.mark("imports done")
+    with profiler.span("QApplication"):
+        app = QApplication(sys.argv)
+    with profiler.span("CafeManagementUI.__init__"):
+        window = CafeManagementUI()
+    return app.exec()
\ No newline at end of file
@@ -3,10 +3,54 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit,
     QPushButton, QMessageBox, QFrame, QHBoxLayout)
 from PySide6.QtGui import QFont
 from PySide6.QtCore import Qt
-from database_connection import connect_db
+from services.query_executor import query_executor
+from services.id_allocator import next_user_id
 import hashlib
 import re
 
+def create_users_table(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                id VARCHAR(10) PRIMARY KEY,
+                username VARCHAR(50) UNIQUE NOT NULL,
+                password VARCHAR(255) NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                email VARCHAR(100) NOT NULL,
+                phone VARCHAR(15),
+                role VARCHAR(20) DEFAULT 'Nhân viên'
+            )
+        """)
+        conn.commit()
+    finally:
+        cursor.close()
+
+def register_user(conn, username, hashed_password, name, email, phone):
+    # Chạy ở luồng nền; trả về (mã nhân viên, None) hoặc (None, thông báo lỗi) nếu trùng tài khoản
+    cursor = conn.cursor()
+    try:
+        # Kiểm tra username đã tồn tại
+        cursor.execute("SELECT username FROM users WHERE username = %s", (username,))
+        if cursor.fetchone():
+            return None, "Tên đăng nhập đã tồn tại!"
+        
+        # Kiểm tra email đã tồn tại
+        cursor.execute("SELECT email FROM users WHERE email = %s", (email,))
+        if cursor.fetchone():
+            return None, "Email đã được sử dụng!"
+        
+        # Mã nhân viên lấy từ dãy số 'users' trong bảng id_sequences
+        user_id = next_user_id()
+        cursor.execute("""
+            INSERT INTO users (id, username, password, name, email, phone, role)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (user_id, username, hashed_password, name, email, phone, 'Nhân viên'))
+        conn.commit()
+        return user_id, None
+    finally:
+        cursor.close()
+
 class RegisterWindow(QWidget):
     def __init__(self, login_form=None):
         super().__init__()
@@ -15,27 +59,8 @@ class RegisterWindow(QWidget):
         self.initUI()
     
     def setup_database(self):
-        conn = connect_db()
-        if conn:
-            cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS users (
-                        id VARCHAR(10) PRIMARY KEY,
-                        username VARCHAR(50) UNIQUE NOT NULL,
-                        password VARCHAR(255) NOT NULL,
-                        name VARCHAR(100) NOT NULL,
-                        email VARCHAR(100) NOT NULL,
-                        phone VARCHAR(15),
-                        role VARCHAR(20) DEFAULT 'Nhân viên'
-                    )
-                """)
-                conn.commit()
-            except Exception as e:
-                print(f"Lỗi khi tạo bảng: {str(e)}")
-            finally:
-                cursor.close()
-                conn.close()
+        query_executor().submit(create_users_table, owner=self,
+                                on_error=lambda e: print(f"Lỗi khi tạo bảng: {str(e)}"))
 
     def initUI(self):
         self.setWindowTitle("Đăng Ký - Quản Lý Quán Café")
@@ -93,9 +118,9 @@ class RegisterWindow(QWidget):
         self.phone.setMinimumHeight(45)
         
         # Register button
-        register_button = QPushButton("ĐĂNG KÝ")
-        register_button.setMinimumHeight(45)
-        register_button.clicked.connect(self.register)
+        self.register_button = QPushButton("ĐĂNG KÝ")
+        self.register_button.setMinimumHeight(45)
+        self.register_button.clicked.connect(self.register)
         
         # Login link
         switch_to_login = QPushButton("Đã có tài khoản? Đăng nhập ngay")
@@ -109,7 +134,7 @@ class RegisterWindow(QWidget):
         register_layout.addWidget(self.name)
         register_layout.addWidget(self.email)
         register_layout.addWidget(self.phone)
-        register_layout.addWidget(register_button)
+        register_layout.addWidget(self.register_button)
         register_layout.addWidget(switch_to_login)
         
         main_layout.addWidget(register_frame, 1)
@@ -190,26 +215,6 @@ class RegisterWindow(QWidget):
         pattern = r'^(0|\+84)\d{9,10}$'
         return re.match(pattern, phone) is not None
     
-    def generate_user_id(self, cursor):
-        try:
-            cursor.execute("SELECT id FROM users WHERE id LIKE 'NV%' ORDER BY id DESC LIMIT 1")
-            result = cursor.fetchone()
-        
-            if result and result[0]:
-                last_id = result[0]
-                last_number = int(last_id[2:])
-                new_number = last_number + 1
-            else:
-                new_number = 1
-            
-            new_id = f"NV{new_number:03d}"
-            return new_id
-        
-        except Exception as e:
-            print(f"Lỗi khi tạo mã nhân viên: {str(e)}")
-            import random
-            return f"NV{random.randint(1, 999):03d}"
-    
     def register(self):
         username = self.username.text().strip()
         password = self.password.text()
@@ -239,59 +244,45 @@ class RegisterWindow(QWidget):
             QMessageBox.warning(self, "Lỗi", "Số điện thoại không hợp lệ!\nVui lòng nhập số điện thoại bắt đầu bằng 0 hoặc +84 và có 10-11 số.")
             return
         
-        conn = connect_db()
-        if conn:
-            cursor = conn.cursor()
-            try:
-                # Kiểm tra username đã tồn tại
-                cursor.execute("SELECT username FROM users WHERE username = %s", (username,))
-                if cursor.fetchone():
-                    QMessageBox.warning(self, "Lỗi", "Tên đăng nhập đã tồn tại!")
-                    return
-                
-                # Kiểm tra email đã tồn tại
-                cursor.execute("SELECT email FROM users WHERE email = %s", (email,))
-                if cursor.fetchone():
-                    QMessageBox.warning(self, "Lỗi", "Email đã được sử dụng!")
-                    return
-                
-                # Tạo mã nhân viên mới
-                user_id = self.generate_user_id(cursor)
-                
-                # Tiến hành đăng ký
-                hashed_password = self.hash_password(password)
-                cursor.execute("""
-                    INSERT INTO users (id, username, password, name, email, phone, role)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """, (user_id, username, hashed_password, name, email, phone, 'Nhân viên'))
-                conn.commit()
-                
-                QMessageBox.information(
-                    self, 
-                    "Thành công", 
-                    f"""Đăng ký thành công!
-                    Mã nhân viên của bạn là: {user_id}
-                    Vui lòng đăng nhập để tiếp tục."""
-                )
-                
-                # Xóa dữ liệu đã nhập
-                for widget in [self.username, self.password, self.confirm, 
-                             self.name, self.email, self.phone]:
-                    widget.clear()
-                
-                # Chuyển về màn hình đăng nhập
-                self.show_login()
-                    
-            except Exception as e:
-                print(f"Lỗi đăng ký: {str(e)}")
-                QMessageBox.warning(
-                    self, 
-                    "Lỗi", 
-                    "Có lỗi xảy ra trong quá trình đăng ký! Vui lòng thử lại."
-                )
-            finally:
-                cursor.close()
-                conn.close()
+        # Tiến hành đăng ký ở luồng nền
+        self.register_button.setEnabled(False)
+        query_executor().submit(
+            register_user, username, self.hash_password(password), name, email, phone,
+            owner=self, timeout=None,
+            on_result=self.on_registered, on_error=self.on_register_failed
+        )
+    
+    def on_registered(self, result):
+        self.register_button.setEnabled(True)
+        user_id, error = result
+        if error:
+            QMessageBox.warning(self, "Lỗi", error)
+            return
+        
+        QMessageBox.information(
+            self, 
+            "Thành công", 
+            f"""Đăng ký thành công!
+            Mã nhân viên của bạn là: {user_id}
+            Vui lòng đăng nhập để tiếp tục."""
+        )
+        
+        # Xóa dữ liệu đã nhập
+        for widget in [self.username, self.password, self.confirm, 
+                     self.name, self.email, self.phone]:
+            widget.clear()
+        
+        # Chuyển về màn hình đăng nhập
+        self.show_login()
+    
+    def on_register_failed(self, e):
+        self.register_button.setEnabled(True)
+        print(f"Lỗi đăng ký: {str(e)}")
+        QMessageBox.warning(
+            self, 
+            "Lỗi", 
+            "Có lỗi xảy ra trong quá trình đăng ký! Vui lòng thử lại."
+        )
     
     def show_login(self):
         if self.login_form:
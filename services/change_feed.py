@@ -0,0 +1,175 @@
+# services/change_feed.py
+# Đọc tiếp nhật ký change_events (services/change_log.py) và áp từng thay đổi vào dữ liệu trong bộ nhớ:
+# danh mục sản phẩm được cập nhật từng dòng, danh sách đơn hàng / nhân viên và số liệu trang chủ
+# được báo để làm mới phần liên quan. Mỗi lượt chỉ là một truy vấn theo khóa chính id > mốc
+# (cộng một truy vấn sản phẩm theo mã khi có sản phẩm đổi), nên có thể hỏi vài lần mỗi giây.
+#
+# Sự kiện do chính máy này ghi cũng được đọc lại; mọi thao tác áp dụng đều lặp lại được an toàn.
+
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from services.change_log import (PRODUCT, ORDER, EMPLOYEE, DELETE, fetch_events, latest_event_id)
+from services.dashboard_metrics import dashboard_metrics
+from services.product_catalog import PRODUCT_COLUMNS, product_catalog
+from services.query_executor import query_executor
+from services.refresh_scheduler import refresh_scheduler
+from services.sales_analytics import sales_analytics
+
+POLL_INTERVAL_MS = 500
+BATCH_LIMIT = 500
+# id AUTO_INCREMENT được cấp lúc INSERT nhưng chỉ thấy được sau commit: id bị nhảy cóc được hỏi lại
+# trong một khoảng ngắn (giao dịch chậm), quá hạn thì coi là giao dịch đã rollback
+GAP_TIMEOUT = 10.0
+# Khoảng nhảy lớn (máy chủ khởi động lại, cấp id theo khối) không phải giao dịch đang chờ
+MAX_GAP = 50
+
+def load_changes(conn, after_id, retry_ids=(), limit=BATCH_LIMIT):
+    # Chạy ở luồng nền: đọc sự kiện mới, gộp theo đối tượng (hành động cuối cùng thắng)
+    # và đọc sẵn dòng sản phẩm đã đổi
+    cursor = conn.cursor()
+    events = fetch_events(cursor, after_id, list(retry_ids), limit)
+    latest = {}
+    for _, entity, entity_id, action in events:
+        latest.pop((entity, entity_id), None)
+        latest[(entity, entity_id)] = action
+
+    changed = {entity: [] for entity in (PRODUCT, ORDER, EMPLOYEE)}
+    removed = {entity: [] for entity in (PRODUCT, ORDER, EMPLOYEE)}
+    for (entity, entity_id), action in latest.items():
+        if entity in changed:
+            (removed if action == DELETE else changed)[entity].append(entity_id)
+
+    products = []
+    if changed[PRODUCT]:
+        placeholders = ", ".join(["%s"] * len(changed[PRODUCT]))
+        cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id IN ({placeholders})",
+                       changed[PRODUCT])
+        products = cursor.fetchall()
+        # Sản phẩm đã bị xóa ngay sau sự kiện sửa
+        found = {str(row[0]) for row in products}
+        removed[PRODUCT].extend(pid for pid in changed[PRODUCT] if pid not in found)
+
+    return {
+        "event_ids": [event[0] for event in events],
+        "more": len(events) >= limit,
+        "products": products,
+        "removed_products": removed[PRODUCT],
+        "orders": changed[ORDER],
+        "removed_orders": removed[ORDER],
+        "employees": changed[EMPLOYEE] + removed[EMPLOYEE],
+    }
+
+class ChangeFeed(QObject):
+    # Mã các đơn hàng mới / bị xóa ở bất kỳ quầy nào
+    ordersChanged = Signal(object)
+    ordersRemoved = Signal(object)
+    # Danh sách nhân viên có thay đổi
+    employeesChanged = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._last_id = None
+        self._gaps = {}        # id bị nhảy cóc -> thời điểm phát hiện
+        self._task = None
+        self._failing = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(POLL_INTERVAL_MS)
+        self._timer.timeout.connect(self.poll)
+
+    def isRunning(self):
+        return self._timer.isActive()
+
+    def start(self):
+        # Bắt đầu từ sự kiện mới nhất: dữ liệu trước đó đã có trong lần tải đầu của các tab
+        if self._timer.isActive() or self._task is not None:
+            return
+        if self._last_id is not None:
+            self._timer.start()
+            return
+        self._task = query_executor().submit(latest_event_id, owner=self, key="change_feed",
+                                             on_result=self._onStarted, on_error=self._onFailed)
+
+    def stop(self):
+        self._timer.stop()
+        query_executor().cancel(owner=self, key="change_feed")
+        self._task = None
+
+    def poll(self):
+        # Lượt trước chưa xong thì bỏ qua, lượt sau sẽ đọc tiếp từ cùng mốc
+        if self._task is not None or self._last_id is None:
+            return
+        now = time.monotonic()
+        self._gaps = {gap: seen for gap, seen in self._gaps.items() if now - seen < GAP_TIMEOUT}
+        self._task = query_executor().submit(load_changes, self._last_id, sorted(self._gaps),
+                                             owner=self, key="change_feed",
+                                             on_result=self._apply, on_error=self._onFailed)
+
+    def _onStarted(self, last_id):
+        self._task = None
+        self._last_id = last_id
+        self._timer.start()
+
+    def _onFailed(self, error):
+        self._task = None
+        # Mất kết nối thì chỉ báo một lần, vẫn tiếp tục thử ở các lượt sau
+        if not self._failing:
+            print(f"Lỗi đọc nhật ký thay đổi: {str(error)}")
+        self._failing = True
+        if self._last_id is None:
+            QTimer.singleShot(POLL_INTERVAL_MS * 10, self.start)
+
+    def _apply(self, changes):
+        self._task = None
+        self._failing = False
+        self._advance(changes["event_ids"])
+
+        catalog = product_catalog()
+        if catalog.isLoaded():
+            for row in changes["products"]:
+                product = tuple(row)
+                current = catalog.get(product[0])
+                if current is None or current[1:] != product[1:]:
+                    catalog.upsert(product)
+            for product_id in changes["removed_products"]:
+                catalog.remove(product_id)
+
+        if changes["orders"] or changes["removed_orders"]:
+            # Doanh thu đổi: bỏ cache số liệu và làm mới trang chủ (hoặc khi nó được mở lại)
+            dashboard_metrics.invalidate()
+            sales_analytics.invalidate()
+            refresh_scheduler().request("dashboard")
+            if changes["orders"]:
+                self.ordersChanged.emit(changes["orders"])
+            if changes["removed_orders"]:
+                self.ordersRemoved.emit(changes["removed_orders"])
+
+        if changes["employees"]:
+            self.employeesChanged.emit()
+
+        if changes["more"]:
+            # Còn tồn sự kiện (ví dụ sau khi mất kết nối): đọc tiếp ngay
+            QTimer.singleShot(0, self.poll)
+
+    def _advance(self, event_ids):
+        now = time.monotonic()
+        expected = self._last_id + 1
+        for event_id in event_ids:
+            if event_id in self._gaps:
+                del self._gaps[event_id]
+                continue
+            if event_id - expected <= MAX_GAP:
+                for missing in range(expected, event_id):
+                    self._gaps.setdefault(missing, now)
+            expected = max(expected, event_id + 1)
+        self._last_id = expected - 1
+
+_feed = None
+
+def change_feed():
+    # Tạo khi cần vì QObject chỉ được tạo sau khi đã có QApplication
+    global _feed
+    if _feed is None:
+        _feed = ChangeFeed()
+    return _feed
@@ -0,0 +1,99 @@
+# services/change_log.py
+# Nhật ký thay đổi chỉ-ghi-thêm (bảng change_events) cho đồng bộ giữa các quầy: mỗi lần thanh toán,
+# thêm/sửa/xóa sản phẩm, đơn hàng, nhân viên ghi thêm một dòng (loại, mã, hành động) trong cùng
+# giao dịch với thay đổi. Các máy đọc tiếp từ id đã đọc lần trước (services/change_feed.py)
+# thay vì quét lại cả bảng products / orders.
+#
+# Dọn các sự kiện cũ:
+#     python -m services.change_log --prune 7
+
+import argparse
+
+from database_connection import get_connection
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS change_events (
+        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+        entity VARCHAR(20) NOT NULL,
+        entity_id VARCHAR(20) NOT NULL,
+        action VARCHAR(10) NOT NULL,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        INDEX idx_change_events_created_at (created_at)
+    )
+"""
+
+PRODUCT = "product"
+ORDER = "order"
+EMPLOYEE = "employee"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+KEEP_DAYS = 7
+
+def record_changes(cursor, entity, entity_ids, action=UPSERT):
+    # Gọi trước commit: giao dịch rollback thì sự kiện cũng không còn
+    rows = [(entity, str(entity_id), action) for entity_id in entity_ids]
+    if rows:
+        cursor.executemany(
+            "INSERT INTO change_events (entity, entity_id, action) VALUES (%s, %s, %s)", rows)
+
+def record_change(cursor, entity, entity_id, action=UPSERT):
+    record_changes(cursor, entity, [entity_id], action)
+
+def latest_event_id(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM change_events")
+        return int(cursor.fetchone()[0])
+    finally:
+        cursor.close()
+
+def fetch_events(cursor, after_id, retry_ids=(), limit=500):
+    # Sự kiện sau after_id theo thứ tự id, cộng các id còn thiếu trước đó (giao dịch commit muộn)
+    condition = "id > %s"
+    params = [after_id]
+    if retry_ids:
+        condition += f" OR id IN ({', '.join(['%s'] * len(retry_ids))})"
+        params.extend(retry_ids)
+    cursor.execute(f"""
+        SELECT id, entity, entity_id, action
+        FROM change_events
+        WHERE {condition}
+        ORDER BY id
+        LIMIT %s
+    """, params + [limit])
+    return cursor.fetchall()
+
+def prune(conn, keep_days=KEEP_DAYS):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM change_events WHERE created_at < NOW() - INTERVAL %s DAY", (keep_days,))
+        deleted = cursor.rowcount
+        conn.commit()
+    finally:
+        cursor.close()
+    return deleted
+
+def ensure_change_table(conn):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_TABLE)
+    finally:
+        cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Nhật ký thay đổi đồng bộ giữa các quầy (change_events)")
+    parser.add_argument("--prune", type=int, metavar="DAYS", default=None,
+                        help="Xóa các sự kiện cũ hơn số ngày chỉ định")
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        ensure_change_table(conn)
+        if args.prune is not None:
+            deleted = prune(conn, args.prune)
+            print(f"change_events: đã xóa {deleted:,} sự kiện cũ hơn {args.prune} ngày")
+        print(f"change_events: sự kiện mới nhất #{latest_event_id(conn):,}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# services/checkout.py
+# Thanh toán giỏ hàng trong một giao dịch ngắn với số lượt truy vấn cố định:
+# khóa và kiểm tra tồn kho bằng một SELECT ... FOR UPDATE, thêm chi tiết đơn bằng executemany,
+# trừ kho bằng một câu UPDATE, rồi tạo hóa đơn - bất kể giỏ hàng có bao nhiêu dòng.
+
+import time
+
+from services.sales_rollup import record_order
+from services.change_log import ORDER, PRODUCT, record_change, record_changes
+
+class CheckoutError(Exception):
+    pass
+
+class ProductNotFoundError(CheckoutError):
+    def __init__(self, product_name):
+        super().__init__(f"Sản phẩm {product_name} không tồn tại trong hệ thống!")
+        self.product_name = product_name
+
+class OutOfStockError(CheckoutError):
+    def __init__(self, product_name, available, requested, product_id=None):
+        super().__init__(
+            f"Sản phẩm '{product_name}' chỉ còn {available} sản phẩm trong kho, không đủ số lượng {requested}!")
+        self.product_name = product_name
+        self.product_id = product_id
+        self.available = available
+        self.requested = requested
+
+def _merge_lines(cart_items):
+    # Gộp các dòng trùng sản phẩm: product_id -> [tên, đơn giá, số lượng]
+    lines = {}
+    for item in cart_items:
+        if item.product_id in lines:
+            lines[item.product_id][2] += item.quantity
+        else:
+            lines[item.product_id] = [item.name, item.price, item.quantity]
+    return lines
+
+def place_order(conn, cart_items, order_id, invoice_id, customer_name, phone_number,
+                payment_method, total_amount, order_time):
+    # Trả về tồn kho còn lại {product_id: stock} sau khi trừ; ném CheckoutError nếu thiếu hàng
+    started = time.perf_counter()
+    lines = _merge_lines(cart_items)
+    product_ids = list(lines)
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    current_date = order_time.strftime("%Y-%m-%d %H:%M:%S")
+
+    cursor = conn.cursor()
+    try:
+        # Khóa các dòng sản phẩm để hai quầy không cùng bán một phần tồn kho
+        cursor.execute(
+            f"SELECT id, stock FROM products WHERE id IN ({placeholders}) FOR UPDATE",
+            product_ids)
+        stock = {str(product_id): current for product_id, current in cursor.fetchall()}
+
+        for product_id, (name, _, quantity) in lines.items():
+            if str(product_id) not in stock:
+                raise ProductNotFoundError(name)
+            if stock[str(product_id)] < quantity:
+                raise OutOfStockError(name, stock[str(product_id)], quantity, str(product_id))
+
+        # Tạo đơn hàng không sử dụng user_id để tránh lỗi khóa ngoại
+        cursor.execute("""
+            INSERT INTO orders (id, customer_name, phone_number, total_amount, order_date, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, (order_id, customer_name, phone_number, total_amount, current_date, payment_method))
+
+        # executemany gộp thành một câu INSERT nhiều dòng
+        cursor.executemany("""
+            INSERT INTO order_items (order_id, product_id, quantity, price)
+            VALUES (%s, %s, %s, %s)
+        """, [(order_id, product_id, quantity, price)
+              for product_id, (_, price, quantity) in lines.items()])
+
+        # Trừ kho cho mọi sản phẩm bằng một câu lệnh
+        cases = " ".join(["WHEN %s THEN %s"] * len(product_ids))
+        params = []
+        for product_id, (_, _, quantity) in lines.items():
+            params.extend([product_id, quantity])
+        cursor.execute(
+            f"UPDATE products SET stock = stock - CASE id {cases} END WHERE id IN ({placeholders})",
+            params + product_ids)
+
+        cursor.execute("""
+            INSERT INTO invoices (id, order_id, customer_name, phone_number, total_amount, payment_method, invoice_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (invoice_id, order_id, customer_name, phone_number, total_amount, payment_method, current_date))
+
+        # Cộng dồn doanh thu trong cùng giao dịch
+        record_order(cursor, order_time, total_amount,
+                     sum(quantity for _, _, quantity in lines.values()))
+        # Báo cho các quầy khác: đơn mới và tồn kho của các sản phẩm vừa bán
+        record_change(cursor, ORDER, order_id)
+        record_changes(cursor, PRODUCT, lines.keys())
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"Checkout {order_id}: {len(product_ids)} sản phẩm, giao dịch {elapsed_ms:.1f} ms")
+    # Các dòng đã bị khóa nên tồn kho sau giao dịch đúng bằng giá trị đã đọc trừ số lượng bán
+    return {str(product_id): stock[str(product_id)] - quantity
+            for product_id, (_, _, quantity) in lines.items()}
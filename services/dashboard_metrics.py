@@ -0,0 +1,74 @@
+# services/dashboard_metrics.py
+# Số liệu tổng quan cho Trang Chủ: doanh thu/đơn hàng hôm nay, doanh thu tháng này, tổng số đơn.
+# Đọc ba dòng của bảng cộng dồn sales_rollup bằng một truy vấn và lưu cache ngắn hạn
+# để chuyển tab không tốn thêm truy vấn.
+
+import threading
+import time
+
+from database_connection import get_connection
+from services.sales_rollup import read_totals
+
+# Thời gian sống của ảnh chụp số liệu (giây)
+SNAPSHOT_TTL = 30
+
+EMPTY_SNAPSHOT = {
+    "daily_revenue": 0,
+    "daily_orders": 0,
+    "monthly_revenue": 0,
+    "total_orders": 0
+}
+
+class DashboardMetrics:
+    def __init__(self, ttl=SNAPSHOT_TTL):
+        self.ttl = ttl
+        self._snapshot = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        cached = self.cached()
+        if cached is not None:
+            return cached
+
+        try:
+            with get_connection() as conn:
+                return self.load(conn)
+        except Exception as e:
+            print(f"Error getting dashboard metrics: {str(e)}")
+            return EMPTY_SNAPSHOT
+
+    def cached(self):
+        # Ảnh chụp còn hạn hoặc None
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._fetched_at < self.ttl:
+                return self._snapshot
+        return None
+
+    def load(self, conn):
+        # Đọc lại số liệu bằng kết nối có sẵn (dùng được từ luồng nền) và lưu vào cache
+        snapshot = self.fetch_snapshot(conn)
+        with self._lock:
+            self._snapshot = snapshot
+            self._fetched_at = time.monotonic()
+        return snapshot
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def fetch_snapshot(self, conn):
+        cursor = conn.cursor()
+        totals = read_totals(cursor)
+        daily_orders, daily_revenue = totals["day"]
+        _, monthly_revenue = totals["month"]
+        total_orders, _ = totals["all"]
+        return {
+            "daily_revenue": int(daily_revenue),
+            "daily_orders": daily_orders,
+            "monthly_revenue": int(monthly_revenue),
+            "total_orders": total_orders
+        }
+
+# Dùng chung trong toàn ứng dụng
+dashboard_metrics = DashboardMetrics()
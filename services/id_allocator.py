@@ -0,0 +1,87 @@
+# services/id_allocator.py
+# Cấp mã đơn hàng, hóa đơn và nhân viên không trùng lặp và tăng dần.
+# Mỗi quầy giữ trong bộ nhớ một khối số được đặt trước từ bảng id_sequences,
+# nên phần lớn các lần thanh toán không tốn thêm truy vấn nào để lấy mã.
+
+import threading
+
+from database_connection import get_connection
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS id_sequences (
+        name VARCHAR(20) PRIMARY KEY,
+        next_value BIGINT NOT NULL
+    )
+"""
+
+# tên dãy số -> (bảng, tiền tố, số chữ số, kích thước khối đặt trước)
+# Mã phải vừa cột VARCHAR(10): ORD/INV + 7 chữ số
+SEQUENCES = {
+    "orders": ("orders", "ORD", 7, 50),
+    "invoices": ("invoices", "INV", 7, 50),
+    # Đăng ký tài khoản hiếm khi xảy ra, đặt trước từng mã một để mã NV không bị nhảy cóc
+    "users": ("users", "NV", 3, 1),
+}
+
+def ensure_sequences(conn):
+    # Tạo bảng và khởi tạo mỗi dãy số tiếp nối mã lớn nhất đang có trong dữ liệu cũ
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_TABLE)
+        for name, (table, prefix, _, _) in SEQUENCES.items():
+            cursor.execute(f"""
+                INSERT IGNORE INTO id_sequences (name, next_value)
+                SELECT %s, COALESCE(MAX(CAST(SUBSTRING(id, %s) AS UNSIGNED)), 0) + 1
+                FROM {table}
+                WHERE id REGEXP %s
+            """, (name, len(prefix) + 1, f"^{prefix}[0-9]+$"))
+        conn.commit()
+    finally:
+        cursor.close()
+
+class IdAllocator:
+    def __init__(self):
+        self._blocks = {}  # tên dãy số -> [giá trị kế tiếp, giá trị kết thúc (không gồm)]
+        self._lock = threading.Lock()
+
+    def next_value(self, name):
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None or block[0] >= block[1]:
+                block = self._reserve_block(name, SEQUENCES[name][3])
+                self._blocks[name] = block
+            value = block[0]
+            block[0] += 1
+            return value
+
+    def next_id(self, name):
+        _, prefix, width, _ = SEQUENCES[name]
+        return f"{prefix}{self.next_value(name):0{width}d}"
+
+    def _reserve_block(self, name, size):
+        # Tăng bộ đếm một lần cho cả khối trong giao dịch riêng, tách khỏi giao dịch thanh toán,
+        # nên khối số không bị trả lại khi đơn hàng lỗi (chỉ để lại khoảng trống, không trùng mã)
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE id_sequences SET next_value = LAST_INSERT_ID(next_value + %s) WHERE name = %s",
+                (size, name))
+            if cursor.rowcount != 1:
+                raise RuntimeError(f"Chưa khởi tạo dãy số '{name}' trong bảng id_sequences")
+            cursor.execute("SELECT LAST_INSERT_ID()")
+            end = int(cursor.fetchone()[0])
+            conn.commit()
+            cursor.close()
+        return [end - size, end]
+
+# Dùng chung trong toàn ứng dụng
+id_allocator = IdAllocator()
+
+def next_order_id():
+    return id_allocator.next_id("orders")
+
+def next_invoice_id():
+    return id_allocator.next_id("invoices")
+
+def next_user_id():
+    return id_allocator.next_id("users")
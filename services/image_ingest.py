@@ -0,0 +1,76 @@
+# services/image_ingest.py
+# Chuẩn hóa ảnh sản phẩm khi lưu: thu nhỏ về độ phân giải hiển thị tối đa, mã hóa lại gọn nhẹ,
+# sinh sẵn ảnh thu nhỏ và dùng chung một file cho các ảnh giống hệt nhau (theo hash nội dung).
+
+import hashlib
+import os
+
+from services.thumbnail_store import decode_image, generate_thumbnails, remove_thumbnails
+
+IMAGE_FOLDER = "product_images"
+MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT = 1024, 1024
+JPEG_QUALITY = 85
+HASH_LENGTH = 20
+
+class ImageIngestError(Exception):
+    pass
+
+def content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def _existing_copy(image_folder, name):
+    for ext in (".jpg", ".png"):
+        path = os.path.join(image_folder, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+def ingest_image(source_path, image_folder=IMAGE_FOLDER):
+    # Trả về đường dẫn ảnh đã chuẩn hóa trong image_folder; ảnh giống hệt ảnh đã có sẽ dùng lại file cũ
+    try:
+        name = content_hash(source_path)
+    except OSError as e:
+        raise ImageIngestError(f"Không đọc được file ảnh: {str(e)}")
+
+    existing = _existing_copy(image_folder, name)
+    if existing:
+        return existing
+
+    image = decode_image(source_path, MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT)
+    if image is None:
+        raise ImageIngestError("File đã chọn không phải ảnh hợp lệ!")
+
+    # Giữ PNG cho ảnh có nền trong suốt, còn lại mã hóa JPEG
+    if image.hasAlphaChannel():
+        ext, fmt, quality = ".png", "PNG", -1
+    else:
+        ext, fmt, quality = ".jpg", "JPEG", JPEG_QUALITY
+
+    os.makedirs(image_folder, exist_ok=True)
+    destination = os.path.join(image_folder, name + ext)
+    tmp_path = destination + ".tmp"
+    if not image.save(tmp_path, fmt, quality):
+        raise ImageIngestError("Không thể ghi ảnh vào thư mục sản phẩm!")
+    os.replace(tmp_path, destination)
+
+    generate_thumbnails(destination)
+    return destination
+
+def remove_if_unused(cursor, image_path):
+    # Xóa file ảnh khi không còn sản phẩm nào dùng; gọi sau khi đã cập nhật/xóa sản phẩm
+    if not image_path:
+        return False
+    cursor.execute("SELECT COUNT(*) FROM products WHERE image_path = %s", (image_path,))
+    if cursor.fetchone()[0] > 0:
+        return False
+    try:
+        if os.path.exists(image_path):
+            os.remove(image_path)
+        remove_thumbnails(image_path)
+        return True
+    except OSError:
+        return False
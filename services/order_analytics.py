@@ -0,0 +1,115 @@
+# services/order_analytics.py
+# Phân tích chi tiết đơn hàng bằng NumPy: nạp order_items của một khoảng thời gian một lần
+# thành các mảng theo cột, rồi tính top sản phẩm, kích thước giỏ hàng, bản đồ nhiệt doanh thu
+# theo giờ và các cặp sản phẩm hay mua cùng nhau bằng phép toán trên mảng (bincount, unique...)
+# thay vì vòng lặp Python hay một truy vấn riêng cho mỗi biểu đồ.
+#
+# Import khi cần (sales_analytics.load) để NumPy không làm chậm lúc khởi động ứng dụng.
+
+import numpy as np
+
+FETCH_BATCH_SIZE = 5000
+MAX_BASKET_SIZE = 10   # Cột cuối của biểu đồ giỏ hàng gộp mọi đơn từ 10 sản phẩm trở lên
+PAIR_LIMIT = 10
+
+class OrderItems:
+    # Mỗi dòng order_items là một phần tử ở cùng vị trí trong các mảng.
+    # Mã đơn / mã sản phẩm được đổi sang số thứ tự (order_codes, product_codes) để dùng bincount.
+    def __init__(self, order_ids, product_ids, quantity, revenue, weekday, hour):
+        self.order_ids, self.order_codes = np.unique(np.asarray(order_ids, dtype=str), return_inverse=True)
+        self.product_ids, self.product_codes = np.unique(np.asarray(product_ids, dtype=str), return_inverse=True)
+        self.quantity = np.asarray(quantity, dtype=np.int64)
+        self.revenue = np.asarray(revenue, dtype=np.float64)
+        self.weekday = np.asarray(weekday, dtype=np.int64)  # 0 = thứ Hai, như WEEKDAY() của MySQL
+        self.hour = np.asarray(hour, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.quantity)
+
+    @property
+    def order_count(self):
+        return len(self.order_ids)
+
+    @property
+    def product_count(self):
+        return len(self.product_ids)
+
+def load_order_items(conn, since, batch_size=FETCH_BATCH_SIZE):
+    # Một truy vấn cho cả khoảng thời gian; giờ và thứ được MySQL tính sẵn
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT oi.order_id, oi.product_id, oi.quantity, oi.quantity * oi.price,
+               WEEKDAY(o.order_date), HOUR(o.order_date)
+        FROM orders o
+        JOIN order_items oi ON oi.order_id = o.id
+        WHERE o.order_date >= %s
+    """, (since,))
+    columns = [[] for _ in range(6)]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+    cursor.close()
+    return OrderItems(*columns)
+
+def top_sellers(items, limit=5):
+    # [(mã sản phẩm, số lượng bán, doanh thu)] theo doanh thu giảm dần
+    revenue = np.bincount(items.product_codes, weights=items.revenue, minlength=items.product_count)
+    units = np.bincount(items.product_codes, weights=items.quantity, minlength=items.product_count)
+    best = np.argsort(-revenue, kind="stable")[:limit]
+    return [(str(items.product_ids[i]), int(units[i]), float(revenue[i])) for i in best]
+
+def basket_sizes(items, max_size=MAX_BASKET_SIZE):
+    # Phân bố số sản phẩm mỗi đơn: histogram[k] = số đơn có k+1 sản phẩm (cột cuối: từ max_size trở lên)
+    if not len(items):
+        return {'histogram': np.zeros(max_size, dtype=np.int64), 'average_units': 0.0, 'average_value': 0.0}
+    units = np.bincount(items.order_codes, weights=items.quantity, minlength=items.order_count)
+    value = np.bincount(items.order_codes, weights=items.revenue, minlength=items.order_count)
+    sizes = np.clip(units.astype(np.int64), 1, max_size)
+    return {
+        'histogram': np.bincount(sizes - 1, minlength=max_size),
+        'average_units': float(units.mean()),
+        'average_value': float(value.mean()),
+    }
+
+def hourly_heatmap(items):
+    # Ma trận 7 x 24: doanh thu theo thứ trong tuần (hàng) và giờ trong ngày (cột)
+    cells = items.weekday * 24 + items.hour
+    return np.bincount(cells, weights=items.revenue, minlength=7 * 24).reshape(7, 24)
+
+def co_purchases(items, limit=PAIR_LIMIT):
+    # [(mã sản phẩm A, mã sản phẩm B, số đơn có cả hai)] nhiều nhất trước
+    if not len(items):
+        return []
+    # Mỗi cặp (đơn, sản phẩm) một lần, sắp theo đơn rồi theo sản phẩm
+    keys = np.unique(items.order_codes * items.product_count + items.product_codes)
+    orders = keys // items.product_count
+    products = keys % items.product_count
+
+    # Với mỗi phần tử i, ghép với mọi phần tử sau nó trong cùng đơn
+    group_ends = np.searchsorted(orders, orders, side="right")
+    partners = group_ends - np.arange(len(keys)) - 1
+    total = int(partners.sum())
+    if total == 0:
+        return []
+    left = np.repeat(np.arange(len(keys)), partners)
+    offsets = np.arange(total) - np.repeat(np.cumsum(partners) - partners, partners)
+    right = left + offsets + 1
+
+    pairs, counts = np.unique(products[left] * items.product_count + products[right], return_counts=True)
+    best = np.argsort(-counts, kind="stable")[:limit]
+    return [(str(items.product_ids[pairs[i] // items.product_count]),
+             str(items.product_ids[pairs[i] % items.product_count]),
+             int(counts[i])) for i in best]
+
+def analyze(items, top_limit=5, pair_limit=PAIR_LIMIT):
+    # Mọi góc nhìn của tab Thống kê từ cùng một lần nạp dữ liệu
+    return {
+        'top_sellers': top_sellers(items, top_limit),
+        'baskets': basket_sizes(items),
+        'heatmap': hourly_heatmap(items),
+        'pairs': co_purchases(items, pair_limit),
+        'order_count': items.order_count,
+    }
@@ -0,0 +1,191 @@
+# services/order_repository.py
+# Truy vấn danh sách đơn hàng theo trang bằng keyset (order_date, id) thay vì tải toàn bộ khoảng ngày.
+# Mỗi trang là một lần quét chỉ mục idx_orders_order_date bắt đầu từ dòng cuối của trang trước,
+# nên chi phí không tăng theo số trang đã cuộn qua như OFFSET.
+#
+# Tìm theo khách hàng không dùng LIKE '%...%' (quét toàn bảng): số điện thoại tìm theo đầu số
+# (cột phone_digits) hoặc đuôi số (cột phone_reversed), cả hai chỉ giữ chữ số và có chỉ mục;
+# dãy số nằm giữa số điện thoại không được tìm. Tên khách tìm bằng FULLTEXT.
+#
+# Làm mới định kỳ chỉ đọc các đơn mới hơn mốc order_date của danh sách đang hiển thị.
+
+import re
+from datetime import datetime, timedelta
+
+from services.change_log import ORDER, DELETE, record_change
+from services.sales_rollup import remove_order
+
+DEFAULT_PAGE_SIZE = 100
+PAGE_SIZES = [50, 100, 200, 500]
+REFRESH_LIMIT = 200
+# Đơn từ quầy khác có thể mang order_date sớm hơn mốc một chút (lệch đồng hồ, commit muộn)
+# nên đọc chồng lên một khoảng trước mốc; đơn đã có trong danh sách được bỏ qua theo mã
+NEW_ORDERS_OVERLAP = timedelta(minutes=2)
+
+# Độ dài từ tối thiểu của FULLTEXT InnoDB (innodb_ft_min_token_size), từ ngắn hơn tìm theo tiền tố
+FULLTEXT_MIN_WORD = 3
+MIN_PHONE_DIGITS = 3
+
+_PHONE_RE = re.compile(r"^[0-9 .+\-]+$")
+_WORD_RE = re.compile(r"\w+")
+
+ORDER_COLUMNS = "id, customer_name, phone_number, order_date, total_amount, status"
+
+class OrderFilter:
+    def __init__(self, from_date, to_date, search_text="", payment_method=None):
+        # from_date/to_date là date; to_date được tính trọn ngày
+        self.from_date = from_date
+        self.to_date = to_date
+        self.search_text = search_text.strip()
+        self.payment_method = payment_method
+
+    def where_clause(self):
+        start = datetime.combine(self.from_date, datetime.min.time())
+        end = datetime.combine(self.to_date, datetime.min.time()) + timedelta(days=1)
+        conditions = ["order_date >= %s", "order_date < %s"]
+        params = [start, end]
+
+        if self.search_text:
+            condition, search_params = search_condition(self.search_text)
+            conditions.append(condition)
+            params.extend(search_params)
+
+        if self.payment_method:
+            conditions.append("status = %s")
+            params.append(self.payment_method)
+
+        return " AND ".join(conditions), params
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_condition(search_text):
+    # Trả về (điều kiện SQL, tham số) dùng được chỉ mục cho ô tìm kiếm theo tên / số điện thoại
+    text = search_text.strip()
+    digits = re.sub(r"\D", "", text)
+    if _PHONE_RE.match(text) and len(digits) >= MIN_PHONE_DIGITS:
+        # Đầu số hoặc đuôi số: cả hai đều là tìm theo tiền tố trên chỉ mục
+        return ("(phone_digits LIKE %s OR phone_reversed LIKE %s)",
+                [f"{_escape_like(digits)}%", f"{_escape_like(digits[::-1])}%"])
+
+    words = _WORD_RE.findall(text)
+    long_words = [w for w in words if len(w) >= FULLTEXT_MIN_WORD]
+    if long_words:
+        # Mọi từ đều phải có, từ được so theo tiền tố ("nguy" khớp "Nguyễn")
+        return ("MATCH(customer_name) AGAINST (%s IN BOOLEAN MODE)",
+                [" ".join(f"+{w}*" for w in long_words)])
+
+    # Chỉ toàn từ ngắn: tìm theo đầu tên trên idx_orders_customer_name
+    return "customer_name LIKE %s", [f"{_escape_like(text)}%"]
+
+def fetch_order_page(cursor, order_filter, page_size=DEFAULT_PAGE_SIZE, after=None):
+    # after: (order_date, id) của dòng cuối trang trước; trả về (danh sách đơn, còn trang sau hay không)
+    where, params = order_filter.where_clause()
+    if after is not None:
+        where += " AND (order_date < %s OR (order_date = %s AND id < %s))"
+        params.extend([after[0], after[0], after[1]])
+
+    cursor.execute(f"""
+        SELECT {ORDER_COLUMNS}
+        FROM orders
+        WHERE {where}
+        ORDER BY order_date DESC, id DESC
+        LIMIT %s
+    """, params + [page_size + 1])
+    rows = cursor.fetchall()
+    return rows[:page_size], len(rows) > page_size
+
+def page_cursor(rows):
+    # Khóa keyset của dòng cuối cùng đã tải
+    if not rows:
+        return None
+    last = rows[-1]
+    return last[3], last[0]
+
+def newest_order_date(rows):
+    return max((row[3] for row in rows), default=None)
+
+def load_new_orders(conn, order_filter, since, limit=REFRESH_LIMIT):
+    # Đơn trong bộ lọc có order_date từ since - NEW_ORDERS_OVERLAP, mới nhất trước;
+    # trả về (danh sách đơn, có bị cắt ở limit hay không)
+    where, params = order_filter.where_clause()
+    if since is not None:
+        where += " AND order_date >= %s"
+        params.append(since - NEW_ORDERS_OVERLAP)
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT {ORDER_COLUMNS}
+        FROM orders
+        WHERE {where}
+        ORDER BY order_date DESC, id DESC
+        LIMIT %s
+    """, params + [limit + 1])
+    rows = cursor.fetchall()
+    return rows[:limit], len(rows) > limit
+
+def fetch_order_summary(cursor, order_filter):
+    # Tổng số đơn và tổng doanh thu của toàn bộ bộ lọc, không phụ thuộc số trang đã tải
+    where, params = order_filter.where_clause()
+    cursor.execute(f"SELECT COUNT(*), COALESCE(SUM(total_amount), 0) FROM orders WHERE {where}", params)
+    count, revenue = cursor.fetchone()
+    return int(count), float(revenue)
+
+def load_order_summary(conn, order_filter):
+    return fetch_order_summary(conn.cursor(), order_filter)
+
+def load_first_page(conn, order_filter, page_size=DEFAULT_PAGE_SIZE):
+    # Dùng với query_executor: trả về ((số đơn, doanh thu), trang đầu, còn trang sau)
+    cursor = conn.cursor()
+    summary = fetch_order_summary(cursor, order_filter)
+    rows, has_more = fetch_order_page(cursor, order_filter, page_size)
+    return summary, rows, has_more
+
+def load_next_page(conn, order_filter, page_size, after):
+    return fetch_order_page(conn.cursor(), order_filter, page_size, after)
+
+def load_order_details(conn, order_id):
+    # Trả về (customer_name, phone_number, order_date, status, total_amount) và các dòng sản phẩm
+    # (product_id, name, price, quantity, item_total); thông tin đơn là None nếu không tìm thấy
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT customer_name, phone_number, order_date, status, total_amount
+            FROM orders
+            WHERE id = %s
+        """, (order_id,))
+        order_info = cursor.fetchone()
+        if not order_info:
+            return None, []
+        cursor.execute("""
+            SELECT oi.product_id, p.name, oi.price, oi.quantity, (oi.price * oi.quantity) as item_total
+            FROM order_items oi
+            JOIN products p ON p.id = oi.product_id
+            WHERE oi.order_id = %s
+        """, (order_id,))
+        return order_info, cursor.fetchall()
+    finally:
+        cursor.close()
+
+def delete_order(conn, order_id):
+    # Xóa đơn và chi tiết đơn, trừ khỏi bảng cộng dồn doanh thu và ghi nhật ký thay đổi trong một giao dịch
+    cursor = conn.cursor()
+    try:
+        # Khóa dòng đơn hàng và đọc phần cần trừ khỏi sales_rollup
+        cursor.execute("SELECT order_date, total_amount FROM orders WHERE id = %s FOR UPDATE", (order_id,))
+        order_row = cursor.fetchone()
+        cursor.execute("SELECT COALESCE(SUM(quantity), 0) FROM order_items WHERE order_id = %s", (order_id,))
+        units_sold = int(cursor.fetchone()[0])
+
+        # Xóa chi tiết đơn trước (khóa ngoại), rồi tới đơn hàng
+        cursor.execute("DELETE FROM order_items WHERE order_id = %s", (order_id,))
+        cursor.execute("DELETE FROM orders WHERE id = %s", (order_id,))
+
+        if order_row:
+            remove_order(cursor, order_row[0], order_row[1], units_sold)
+            record_change(cursor, ORDER, order_id, DELETE)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
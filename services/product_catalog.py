@@ -0,0 +1,186 @@
+# services/product_catalog.py
+# Danh mục sản phẩm dùng chung trong bộ nhớ: tải một lần, đánh chỉ mục theo mã và tên,
+# được cập nhật tại chỗ khi thêm/sửa/xóa sản phẩm hay thanh toán, rồi phát signal
+# để các tab cập nhật từng dòng thay vì truy vấn lại bảng products.
+#
+# Mỗi sản phẩm là một tuple (id, name, price, stock, image_path, import_date).
+#
+# Thay đổi từ quầy khác (thanh toán, sửa giá...) đến qua nhật ký change_events (services/change_feed.py).
+# Dự phòng cho thay đổi ngoài ứng dụng (sửa tay trong phpMyAdmin...), refresh_scheduler định kỳ
+# đọc các dòng có updated_at sau mốc của lần trước (chỉ mục idx_products_updated_at).
+
+from datetime import timedelta
+
+from PySide6.QtCore import QObject, Signal
+
+from services.query_executor import query_executor
+from services.product_search import ProductSearchIndex
+from services.refresh_scheduler import refresh_scheduler
+
+PRODUCT_COLUMNS = "id, name, price, stock, image_path, import_date"
+ID, NAME, PRICE, STOCK, IMAGE_PATH, IMPORT_DATE = range(6)
+
+REFRESH_INTERVAL_MS = 60000
+# Đọc chồng lên khoảng trước mốc: giao dịch commit muộn hơn updated_at của nó vẫn không bị sót
+CHANGE_OVERLAP = timedelta(seconds=60)
+
+def _server_time(cursor):
+    cursor.execute("SELECT NOW()")
+    return cursor.fetchone()[0]
+
+def fetch_all_products(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products ORDER BY name")
+    return cursor.fetchall()
+
+def load_catalog(conn):
+    # (mốc thời gian của máy chủ, toàn bộ sản phẩm); mốc lấy trước để không sót thay đổi xen giữa
+    since = _server_time(conn.cursor())
+    return since, fetch_all_products(conn)
+
+def fetch_changed_products(conn, since):
+    # (mốc mới, các sản phẩm có updated_at từ since - CHANGE_OVERLAP)
+    cursor = conn.cursor()
+    now = _server_time(cursor)
+    cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE updated_at >= %s",
+                   (since - CHANGE_OVERLAP,))
+    return now, cursor.fetchall()
+
+def fetch_product(cursor, product_id):
+    cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products WHERE id = %s", (product_id,))
+    return cursor.fetchone()
+
+def sort_key(product):
+    # Thứ tự hiển thị danh mục: theo tên (không phân biệt hoa thường), rồi theo mã
+    return (product[NAME].lower(), product[ID])
+
+def _normalize(product):
+    product = tuple(product)
+    return (str(product[ID]),) + product[1:]
+
+class ProductCatalog(QObject):
+    # Danh mục vừa được tải lại toàn bộ
+    reset = Signal()
+    # Sản phẩm được thêm hoặc thay đổi (tuple mới)
+    productChanged = Signal(object)
+    # Sản phẩm bị xóa (mã sản phẩm)
+    productRemoved = Signal(object)
+    loadFailed = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._by_id = {}    # id -> tuple
+        self._by_name = {}  # tên viết thường -> tập id
+        self.search_index = ProductSearchIndex()
+        self._loaded = False
+        self._loading = False
+        self._changes_since = None
+        refresh_scheduler().register("catalog", REFRESH_INTERVAL_MS, self._changesQuery,
+                                     self._onChanges, owner=self)
+
+    def isLoaded(self):
+        return self._loaded
+
+    def ensureLoaded(self):
+        # Tải lần đầu; các tab gọi thoải mái, chỉ có một truy vấn được gửi
+        if not self._loaded and not self._loading:
+            self.reload()
+
+    def reload(self):
+        self._loading = True
+        refresh_scheduler().cancel("catalog")
+        query_executor().submit(load_catalog, owner=self, key="catalog",
+                                on_result=self._onLoaded, on_error=self._onLoadFailed)
+
+    def _onLoaded(self, result):
+        self._changes_since, rows = result
+        self._by_id = {}
+        self._by_name = {}
+        for row in rows:
+            self._index(_normalize(row))
+        self.search_index.rebuild(self._by_id.values())
+        self._loaded = True
+        self._loading = False
+        self.reset.emit()
+
+    def _onLoadFailed(self, error):
+        self._loading = False
+        self.loadFailed.emit(error)
+
+    def _changesQuery(self):
+        # Chưa tải xong lần đầu thì không có mốc để so
+        if not self._loaded or self._loading:
+            return None
+        return fetch_changed_products, self._changes_since
+
+    def _onChanges(self, result):
+        if self._loading:
+            return  # Đang tải lại toàn bộ, kết quả này đã cũ
+        self._changes_since, rows = result
+        for row in rows:
+            product = _normalize(row)
+            if self._by_id.get(product[ID]) != product:
+                self.upsert(product)
+
+    def products(self):
+        return sorted(self._by_id.values(), key=sort_key)
+
+    def get(self, product_id):
+        return self._by_id.get(str(product_id))
+
+    def findByName(self, name):
+        return [self._by_id[pid] for pid in self._by_name.get(name.strip().lower(), ())]
+
+    def search(self, query, limit=None):
+        # Tìm theo tên không phân biệt dấu; trả về [(id, thứ hạng)] đã xếp hạng
+        return self.search_index.search(query, limit)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def upsert(self, product):
+        # Gọi sau khi thêm/sửa sản phẩm đã commit
+        product = _normalize(product)
+        self._unindex(product[ID])
+        self._index(product)
+        self.search_index.add(product)
+        self.productChanged.emit(product)
+
+    def remove(self, product_id):
+        product_id = str(product_id)
+        if self._unindex(product_id) is not None:
+            self.search_index.remove(product_id)
+            self.productRemoved.emit(product_id)
+
+    def setStock(self, stock_levels):
+        # stock_levels: {id: tồn kho mới}, ví dụ sau khi thanh toán
+        for product_id, stock in stock_levels.items():
+            product = self._by_id.get(str(product_id))
+            if product is None or product[STOCK] == stock:
+                continue
+            updated = product[:STOCK] + (stock,) + product[STOCK + 1:]
+            self._by_id[updated[ID]] = updated
+            self.productChanged.emit(updated)
+
+    def _index(self, product):
+        self._by_id[product[ID]] = product
+        self._by_name.setdefault(product[NAME].lower(), set()).add(product[ID])
+
+    def _unindex(self, product_id):
+        product = self._by_id.pop(product_id, None)
+        if product is not None:
+            ids = self._by_name.get(product[NAME].lower())
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._by_name[product[NAME].lower()]
+        return product
+
+_catalog = None
+
+def product_catalog():
+    # Tạo khi cần vì QObject chỉ được tạo sau khi đã có QApplication
+    global _catalog
+    if _catalog is None:
+        _catalog = ProductCatalog()
+    return _catalog
@@ -0,0 +1,118 @@
+# services/product_export.py
+# Xuất danh sách sản phẩm ra Excel (.xlsx) hoặc CSV bằng cách đọc thẳng từ CSDL theo từng lô
+# (cursor không đệm của mysql.connector, fetchmany) và ghi ngay vào writer chỉ-ghi,
+# nên bộ nhớ dùng không phụ thuộc số sản phẩm và không cần dựng lại dữ liệu từ bảng trên giao diện.
+#
+# Dùng với query_executor (with_task=True) để chạy nền, có báo tiến độ và hủy được:
+#   query_executor().submit(export_products, path, with_task=True, timeout=None, ...)
+
+import csv
+import os
+
+from services.product_catalog import PRODUCT_COLUMNS
+
+EXPORT_HEADERS = ["Mã SP", "Tên SP", "Giá", "Tồn Kho", "Hình Ảnh", "Ngày Nhập"]
+BATCH_SIZE = 500
+
+class ExportError(Exception):
+    pass
+
+class _CsvWriter:
+    def __init__(self, path):
+        # utf-8-sig để Excel mở đúng tiếng Việt
+        self._file = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._file)
+
+    def write_row(self, values):
+        self._writer.writerow(values)
+
+    def close(self):
+        self._file.close()
+
+class _XlsxWriter:
+    # xlsxwriter ở chế độ constant_memory: mỗi dòng được ghi xuống file tạm ngay khi sang dòng mới
+    def __init__(self, path):
+        import xlsxwriter
+        self._book = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._sheet = self._book.add_worksheet("Sản phẩm")
+        self._row = 0
+
+    def write_row(self, values):
+        self._sheet.write_row(self._row, 0, values)
+        self._row += 1
+
+    def close(self):
+        self._book.close()
+
+class _OpenpyxlWriter:
+    # Dự phòng khi không có xlsxwriter: workbook write_only của openpyxl cũng ghi theo luồng
+    def __init__(self, path):
+        from openpyxl import Workbook
+        self._path = path
+        self._book = Workbook(write_only=True)
+        self._sheet = self._book.create_sheet("Sản phẩm")
+
+    def write_row(self, values):
+        self._sheet.append(values)
+
+    def close(self):
+        self._book.save(self._path)
+
+def is_csv(path):
+    return path.lower().endswith(".csv")
+
+def open_writer(path, as_csv=False):
+    if as_csv:
+        return _CsvWriter(path)
+    for writer in (_XlsxWriter, _OpenpyxlWriter):
+        try:
+            return writer(path)
+        except ImportError:
+            continue
+    raise ExportError("Cần cài đặt xlsxwriter hoặc openpyxl để xuất file Excel (hoặc chọn định dạng CSV)")
+
+def export_row(product):
+    product_id, name, price, stock, image_path, import_date = product
+    return [
+        product_id,
+        name,
+        float(price) if price is not None else None,
+        stock,
+        "Có hình ảnh" if image_path else "Không có ảnh",
+        import_date.strftime("%d/%m/%Y") if import_date else "",
+    ]
+
+def export_products(task, conn, path, batch_size=BATCH_SIZE):
+    # Chạy ở luồng nền; trả về số sản phẩm đã xuất, hoặc None nếu bị hủy
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM products")
+    total = cursor.fetchone()[0]
+    task.reportProgress(0, total)
+
+    # Ghi ra file tạm rồi đổi tên: hủy giữa chừng hay lỗi không để lại file dở
+    tmp_path = f"{path}.part"
+    writer = open_writer(tmp_path, is_csv(path))
+    done = 0
+    completed = False
+    try:
+        writer.write_row(EXPORT_HEADERS)
+        # Cursor mặc định không đệm: máy chủ gửi dần từng lô, không nạp toàn bộ bảng vào bộ nhớ
+        cursor.execute(f"SELECT {PRODUCT_COLUMNS} FROM products ORDER BY name")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for product in rows:
+                writer.write_row(export_row(product))
+            done += len(rows)
+            task.reportProgress(done, max(total, done))
+            if task.isCancelled():
+                return None
+        completed = True
+    finally:
+        writer.close()
+        if completed:
+            os.replace(tmp_path, path)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return done
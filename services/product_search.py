@@ -0,0 +1,207 @@
+# services/product_search.py
+# Chỉ mục tìm kiếm sản phẩm trong bộ nhớ cho tìm-khi-gõ ở màn hình bán hàng.
+# Tên được chuẩn hóa (chữ thường, bỏ dấu tiếng Việt, đ -> d) và tách thành từ;
+# tra tiền tố bằng bisect trên danh sách từ đã sắp xếp, tra chuỗi con bằng chỉ mục trigram,
+# nên mỗi lần tìm chỉ đụng tới các sản phẩm ứng viên chứ không quét toàn bộ danh mục.
+
+import bisect
+import heapq
+import re
+import unicodedata
+
+# Ngưỡng tỉ lệ trigram trùng khớp khi tìm gần đúng (gõ sai chính tả)
+FUZZY_THRESHOLD = 0.5
+
+# Thứ hạng kết quả: số nhỏ hơn đứng trước
+RANK_EXACT, RANK_NAME_PREFIX, RANK_WORD_PREFIX, RANK_SUBSTRING, RANK_FUZZY = range(5)
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+def fold(text):
+    # "Cà phê Đá" -> "ca phe da"
+    text = (text or "").replace("đ", "d").replace("Đ", "D")
+    text = unicodedata.normalize("NFD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_RE.findall(text.lower()))
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class ProductSearchIndex:
+    def __init__(self):
+        self._docs = {}       # id -> (tên đã chuẩn hóa, tên gốc viết thường, tập từ)
+        self._postings = {}   # từ -> tập id
+        self._tokens = []     # các từ khác nhau, đã sắp xếp để tra tiền tố bằng bisect
+        self._trigrams = {}   # trigram -> tập id
+        self._names = []      # (tên đã chuẩn hóa, id) đã sắp xếp, cập nhật tại chỗ khi thêm / xóa
+
+    def __len__(self):
+        return len(self._docs)
+
+    def clear(self):
+        self._docs = {}
+        self._postings = {}
+        self._tokens = []
+        self._trigrams = {}
+        self._names = []
+
+    def rebuild(self, products):
+        self.clear()
+        for product in products:
+            self._addDoc(str(product[0]), product[1])
+        self._tokens = sorted(self._postings)
+        self._names = sorted((doc[0], pid) for pid, doc in self._docs.items())
+
+    def add(self, product):
+        product_id = str(product[0])
+        doc = self._docs.get(product_id)
+        if doc is not None and doc[1] == (product[1] or "").lower():
+            # Chỉ đổi giá / tồn kho (ví dụ bán ở quầy khác): văn bản tìm kiếm không đổi
+            return
+        self.remove(product_id)
+        for token in self._addDoc(product_id, product[1]):
+            i = bisect.bisect_left(self._tokens, token)
+            if i == len(self._tokens) or self._tokens[i] != token:
+                self._tokens.insert(i, token)
+        bisect.insort(self._names, (self._docs[product_id][0], product_id))
+
+    def remove(self, product_id):
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+        folded, _, tokens = doc
+        i = bisect.bisect_left(self._names, (folded, product_id))
+        if i < len(self._names) and self._names[i] == (folded, product_id):
+            del self._names[i]
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._postings[token]
+                    i = bisect.bisect_left(self._tokens, token)
+                    if i < len(self._tokens) and self._tokens[i] == token:
+                        del self._tokens[i]
+        for gram in trigrams(folded):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(product_id)
+                if not ids:
+                    del self._trigrams[gram]
+
+    def _addDoc(self, product_id, name):
+        folded = fold(name)
+        # Mã sản phẩm cũng tìm được như một từ
+        tokens = set(folded.split()) | {fold(product_id).replace(" ", "")} - {""}
+        self._docs[product_id] = (folded, (name or "").lower(), tokens)
+        for token in tokens:
+            self._postings.setdefault(token, set()).add(product_id)
+        for gram in trigrams(folded):
+            self._trigrams.setdefault(gram, set()).add(product_id)
+        return tokens
+
+    def _prefixMatches(self, prefix):
+        # Các từ bắt đầu bằng prefix nằm liền nhau trong danh sách đã sắp xếp
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + "\uffff", start)
+        if end - start == 1:
+            return self._postings[self._tokens[start]]
+        ids = set()
+        for token in self._tokens[start:end]:
+            ids |= self._postings[token]
+        return ids
+
+    def _substringMatches(self, text, known=frozenset()):
+        # Ứng viên chứa mọi trigram của chuỗi, sau đó kiểm tra lại bằng phép tìm chuỗi con.
+        # known: các id đã khớp (theo tiền tố), không cần kiểm tra lại
+        grams = sorted((self._trigrams.get(g, set()) for g in trigrams(text)), key=len)
+        if not grams or not grams[0]:
+            return set()
+        ids = grams[0] - known
+        for other in grams[1:]:
+            ids &= other
+            if not ids:
+                return ids
+        if len(text) == 3:
+            # Chuỗi đúng 3 ký tự: chứa trigram cũng là chứa chuỗi con
+            return ids
+        return {pid for pid in ids if text in self._docs[pid][0]}
+
+    def _fuzzyMatches(self, text):
+        grams = trigrams(text)
+        if not grams:
+            return {}
+        counts = {}
+        for gram in grams:
+            for pid in self._trigrams.get(gram, ()):
+                counts[pid] = counts.get(pid, 0) + 1
+        needed = FUZZY_THRESHOLD * len(grams)
+        return {pid: count for pid, count in counts.items() if count >= needed}
+
+    def _nameKey(self, pid):
+        # Thứ tự theo tên gốc viết thường như danh mục, rồi theo mã
+        return self._docs[pid][1], pid
+
+    def _namePrefixMatches(self, folded):
+        names = self._names
+        start = bisect.bisect_left(names, (folded, ""))
+        end = bisect.bisect_left(names, (folded + "\uffff", ""), start)
+        exact = set()
+        starts = set()
+        for name, pid in names[start:end]:
+            (exact if name == folded else starts).add(pid)
+        return exact, starts
+
+    def search(self, query, limit=None):
+        # Trả về danh sách (id, thứ hạng) đã sắp xếp theo độ phù hợp rồi theo tên
+        folded = fold(query)
+        if not folded:
+            return []
+        words = folded.split()
+
+        # Mỗi từ của truy vấn phải là tiền tố của một từ trong tên (hoặc chuỗi con nếu đủ dài)
+        prefix_ids = None
+        candidates = None
+        for word in words:
+            ids = self._prefixMatches(word)
+            prefix_ids = ids if prefix_ids is None else prefix_ids & ids
+            if len(word) >= 3:
+                if candidates is not None and len(candidates) < len(ids):
+                    # Ít ứng viên: kiểm tra trực tiếp thay vì tra trigram toàn danh mục
+                    ids = ids | {pid for pid in candidates if word in self._docs[pid][0]}
+                else:
+                    ids = ids | self._substringMatches(word, ids)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                break
+
+        # Chia kết quả theo thứ hạng bằng phép toán tập hợp, mỗi nhóm sắp theo tên
+        if candidates:
+            exact, starts = self._namePrefixMatches(folded)
+            prefix_ids = prefix_ids & candidates
+            groups = [(RANK_EXACT, exact & candidates),
+                      (RANK_NAME_PREFIX, starts & candidates),
+                      (RANK_WORD_PREFIX, prefix_ids - exact - starts),
+                      (RANK_SUBSTRING, candidates - prefix_ids - exact - starts)]
+            order = self._nameKey
+        elif len(folded) >= 3:
+            # Không có kết quả chính xác: thử tìm gần đúng theo trigram, nhiều trigram trùng hơn đứng trước
+            counts = self._fuzzyMatches(folded)
+            groups = [(RANK_FUZZY, counts)]
+            order = lambda pid: (-counts[pid],) + self._nameKey(pid)
+        else:
+            return []
+
+        results = []
+        for rank, ids in groups:
+            if limit is not None and len(results) >= limit:
+                break
+            if not ids:
+                continue
+            remaining = None if limit is None else limit - len(results)
+            if remaining is not None and remaining < len(ids):
+                ordered = heapq.nsmallest(remaining, ids, key=order)
+            else:
+                ordered = sorted(ids, key=order)
+            results.extend((pid, rank) for pid in ordered)
+        return results
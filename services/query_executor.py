@@ -0,0 +1,250 @@
+# services/query_executor.py
+# Chạy truy vấn CSDL trên luồng nền và trả kết quả về luồng giao diện qua signal của Qt,
+# để một truy vấn chậm hay mạng chập chờn không làm đứng cả màn hình bán hàng.
+#
+# Dùng:
+#   query_executor().submit(fetch_products, owner=self, key="products",
+#                           on_result=self.showProducts, on_error=self.showError)
+# trong đó fetch_products(conn) chạy ở luồng nền với một kết nối lấy từ pool.
+# Công việc dài có báo tiến độ dùng with_task=True: fn(task, conn, ...), gọi task.reportProgress(done, total)
+# và kiểm tra task.isCancelled() định kỳ.
+
+import threading
+
+import mysql.connector
+import shiboken6
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal, Slot
+
+from database_connection import get_pool, open_raw_connection
+
+DEFAULT_TIMEOUT = 30   # giây; None để không giới hạn
+MAX_WORKERS = 4        # Không vượt quá số kết nối tối đa của pool
+KILL_WAIT = 5          # giây chờ KILL QUERY xong trước khi trả kết nối về pool
+
+class QueryTimeoutError(Exception):
+    def __init__(self, timeout):
+        super().__init__(f"Truy vấn quá thời gian cho phép ({timeout} giây)")
+        self.timeout = timeout
+
+class QueryTask(QObject):
+    # Kết quả/lỗi luôn được phát trên luồng giao diện
+    finished = Signal(object)
+    failed = Signal(object)
+    cancelled = Signal()
+    progress = Signal(int, int)
+
+    def __init__(self, executor, fn, args, kwargs, with_task, owner=None, key=None):
+        # Không đặt parent: task sống đến khi cả người gọi lẫn luồng nền không còn giữ nó
+        super().__init__()
+        self._executor = executor
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.with_task = with_task
+        self.owner = owner
+        self.key = key
+        self._cancel_event = threading.Event()
+        self._connection_id = None
+        self._state_lock = threading.Lock()
+        self._kill_done = threading.Event()
+        self._kill_done.set()
+
+    def isCancelled(self):
+        # Gọi được từ luồng nền để dừng sớm công việc dài
+        return self._cancel_event.is_set()
+
+    def reportProgress(self, done, total):
+        # Gọi từ luồng nền
+        if not self.isCancelled():
+            self.progress.emit(done, total)
+
+    def cancel(self):
+        # Chỉ gọi trên luồng giao diện
+        self._executor.cancel(task=self)
+
+    def _markCancelled(self):
+        # Đánh dấu hủy và dừng câu lệnh đang chạy (nếu có) bằng KILL QUERY
+        self._cancel_event.set()
+        with self._state_lock:
+            connection_id = self._connection_id
+            if connection_id is None:
+                return
+            # Worker sẽ giữ kết nối đến khi lệnh KILL xong (xem _releaseConnection)
+            self._kill_done.clear()
+        threading.Thread(target=self._killQuery, args=(connection_id,), daemon=True).start()
+
+    def _killQuery(self, connection_id):
+        try:
+            _kill_query(connection_id)
+        finally:
+            self._kill_done.set()
+
+    def _setConnectionId(self, connection_id):
+        with self._state_lock:
+            self._connection_id = connection_id
+
+    def _releaseConnection(self):
+        # Gọi ở luồng nền trước khi trả kết nối về pool. Nếu đang có KILL QUERY nhắm vào kết nối này
+        # thì chờ nó xong, để lệnh KILL không trúng câu lệnh của task khác (ví dụ giao dịch thanh toán)
+        # vừa mượn lại kết nối. Trả về False nếu chờ quá lâu: khi đó kết nối phải bị đóng hẳn
+        with self._state_lock:
+            self._connection_id = None
+        return self._kill_done.wait(KILL_WAIT)
+
+def _kill_query(connection_id):
+    # Dừng câu lệnh đang chạy trên kết nối của worker; kết nối vẫn dùng lại được sau đó.
+    # Dùng kết nối riêng vì pool có thể đang bận hết.
+    try:
+        conn = open_raw_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"KILL QUERY {int(connection_id)}")
+        finally:
+            conn.close()
+    except mysql.connector.Error as e:
+        print(f"Không thể hủy truy vấn {connection_id}: {str(e)}")
+
+class _TaskSignals(QObject):
+    done = Signal(object, object, object)  # (runnable, kết quả, lỗi)
+
+class _QueryRunnable(QRunnable):
+    def __init__(self, task, signals):
+        super().__init__()
+        self.task = task
+        self._signals = signals
+        # Python giữ runnable đến khi worker báo xong
+        self.setAutoDelete(False)
+
+    def run(self):
+        task = self.task
+        result, error = None, None
+        try:
+            if not task.isCancelled():
+                with get_pool().connection() as conn:
+                    task._setConnectionId(getattr(conn, "connection_id", None))
+                    try:
+                        if task.isCancelled():
+                            pass  # Bị hủy trong lúc chờ kết nối
+                        elif task.with_task:
+                            result = task.fn(task, conn, *task.args, **task.kwargs)
+                        else:
+                            result = task.fn(conn, *task.args, **task.kwargs)
+                    finally:
+                        if not task._releaseConnection():
+                            conn.discard()
+        except Exception as e:
+            error = e
+        self._signals.done.emit(self, result, error)
+
+class _ActiveQuery:
+    def __init__(self, runnable, timer, on_result, on_error):
+        self.runnable = runnable
+        self.timer = timer
+        self.on_result = on_result
+        self.on_error = on_error
+
+class QueryExecutor(QObject):
+    # Phát ra khi chuyển giữa trạng thái có/không có truy vấn đang chờ kết quả (cho chỉ báo bận)
+    busyChanged = Signal(bool)
+
+    def __init__(self, max_workers=MAX_WORKERS, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        self._signals = _TaskSignals(self)
+        self._signals.done.connect(self._onWorkerDone)
+        self._active = {}       # task -> _ActiveQuery, các yêu cầu còn chờ kết quả
+        self._running = set()   # runnable còn trong luồng nền (kể cả đã bị hủy)
+
+    def submit(self, fn, *args, owner=None, key=None, on_result=None, on_error=None,
+               timeout=DEFAULT_TIMEOUT, with_task=False, **kwargs):
+        # key: yêu cầu mới cùng (owner, key) sẽ hủy yêu cầu cũ, chỉ kết quả mới nhất được dùng
+        if key is not None:
+            self.cancel(owner=owner, key=key)
+
+        task = QueryTask(self, fn, args, kwargs, with_task, owner, key)
+        runnable = _QueryRunnable(task, self._signals)
+
+        timer = None
+        if timeout:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self._finish(task, error=QueryTimeoutError(timeout), cancel=True))
+            timer.start(int(timeout * 1000))
+
+        was_idle = not self._active
+        self._active[task] = _ActiveQuery(runnable, timer, on_result, on_error)
+        self._running.add(runnable)
+        self._pool.start(runnable)
+        if was_idle:
+            self.busyChanged.emit(True)
+        return task
+
+    def cancel(self, owner=None, key=None, task=None):
+        # Hủy các yêu cầu khớp điều kiện; callback của chúng sẽ không được gọi
+        for active in list(self._active):
+            if task is not None and active is not task:
+                continue
+            if owner is not None and active.owner is not owner:
+                continue
+            if key is not None and active.key != key:
+                continue
+            self._finish(active, cancel=True)
+
+    def isBusy(self):
+        return bool(self._active)
+
+    def activeCount(self):
+        return len(self._active)
+
+    def waitForDone(self, msecs=-1):
+        return self._pool.waitForDone(msecs)
+
+    @Slot(object, object, object)
+    def _onWorkerDone(self, runnable, result, error):
+        self._running.discard(runnable)
+        task = runnable.task
+        if task in self._active:
+            self._finish(task, result, error)
+
+    def _finish(self, task, result=None, error=None, cancel=False):
+        entry = self._active.pop(task, None)
+        if entry is None:
+            return
+        if entry.timer is not None:
+            entry.timer.stop()
+            entry.timer.deleteLater()
+        if cancel:
+            task._markCancelled()
+            # Chưa chạy thì gỡ khỏi hàng đợi luôn
+            if self._pool.tryTake(entry.runnable):
+                self._running.discard(entry.runnable)
+
+        owner = task.owner
+        owner_alive = owner is None or not isinstance(owner, QObject) or shiboken6.isValid(owner)
+        try:
+            if error is not None:
+                task.failed.emit(error)
+                if entry.on_error is not None:
+                    if owner_alive:
+                        entry.on_error(error)
+                else:
+                    print(f"Lỗi truy vấn nền: {str(error)}")
+            elif cancel:
+                task.cancelled.emit()
+            else:
+                task.finished.emit(result)
+                if entry.on_result is not None and owner_alive:
+                    entry.on_result(result)
+        finally:
+            if not self._active:
+                self.busyChanged.emit(False)
+
+_executor = None
+
+def query_executor():
+    # Tạo khi cần vì QObject chỉ được tạo sau khi đã có QApplication
+    global _executor
+    if _executor is None:
+        _executor = QueryExecutor()
+    return _executor
@@ -0,0 +1,172 @@
+# services/refresh_scheduler.py
+# Làm mới định kỳ dữ liệu "sống" (số liệu trang chủ, danh sách đơn hàng, tồn kho) để nhiều quầy
+# thấy đơn hàng của nhau trong vài giây mà không phải bấm tải lại.
+#
+# Mỗi công việc có chu kỳ riêng, chỉ chạy khi ít nhất một widget theo dõi nó đang hiển thị
+# (tab bị ẩn / cửa sổ thu nhỏ thì tạm dừng, hiện lại thì làm mới ngay nếu đã quá hạn).
+# Nhiều yêu cầu làm mới dồn dập được gộp thành một lần; lần trước chưa xong thì chỉ chạy thêm
+# đúng một lần sau khi xong. Truy vấn chạy qua query_executor.
+#
+# Dùng:
+#   refresh_scheduler().register("orders", 5000, self.ordersDeltaQuery, self.onOrdersDelta, owner=self)
+#   refresh_scheduler().watch("orders", self)
+# trong đó ordersDeltaQuery() trả về (fn, *args) để chạy fn(conn, *args) ở luồng nền
+# (thường là truy vấn các dòng mới hơn mốc đã biết), hoặc None để bỏ qua lượt này.
+
+import time
+
+import shiboken6
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+from services.query_executor import query_executor
+
+class RefreshJob:
+    def __init__(self, key, interval_ms, prepare, on_result, on_error, owner):
+        self.key = key
+        self.interval_ms = interval_ms
+        self.prepare = prepare
+        self.on_result = on_result
+        self.on_error = on_error
+        self.owner = owner
+        self.watchers = []
+        self.timer = None
+        self.task = None        # Truy vấn đang chạy
+        self.rerun = False      # Có yêu cầu mới trong lúc truy vấn đang chạy
+        self.stale = False      # Có yêu cầu trong lúc tab bị ẩn
+        self.last_run = 0.0
+
+    def isVisible(self):
+        return any(shiboken6.isValid(w) and w.isVisible() and not w.window().isMinimized()
+                   for w in self.watchers)
+
+    def isDue(self):
+        return (time.monotonic() - self.last_run) * 1000 >= self.interval_ms
+
+class RefreshScheduler(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = {}
+        self._pending = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush)
+
+    def register(self, key, interval_ms, prepare, on_result, on_error=None, owner=None):
+        # Đăng ký lại cùng key thay thế công việc cũ; owner bị hủy thì công việc cũng bị gỡ
+        self.unregister(key)
+        job = RefreshJob(key, interval_ms, prepare, on_result, on_error, owner)
+        job.timer = QTimer(self)
+        job.timer.setInterval(interval_ms)
+        job.timer.timeout.connect(lambda: self.request(key))
+        self._jobs[key] = job
+        if isinstance(owner, QObject):
+            owner.destroyed.connect(lambda *_: self._ownerDestroyed(key, job))
+        return job
+
+    def unregister(self, key):
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return
+        job.timer.stop()
+        job.timer.deleteLater()
+        self._pending.discard(key)
+        if job.task is not None:
+            query_executor().cancel(task=job.task)
+
+    def watch(self, key, widget):
+        # Công việc chỉ chạy khi ít nhất một widget theo dõi đang hiển thị
+        job = self._jobs.get(key)
+        if job is None or widget in job.watchers:
+            return
+        job.watchers.append(widget)
+        widget.installEventFilter(self)
+        widget.destroyed.connect(lambda *_: self._watcherDestroyed(key, widget))
+        if widget.isVisible():
+            self._resume(job)
+
+    def cancel(self, key):
+        # Bỏ lượt làm mới đang chạy, ví dụ khi tab vừa tải lại toàn bộ với bộ lọc khác
+        job = self._jobs.get(key)
+        if job is not None and job.task is not None:
+            job.rerun = False
+            query_executor().cancel(task=job.task)
+
+    def request(self, key=None):
+        # Yêu cầu làm mới (một key hoặc tất cả); gộp các yêu cầu trong cùng một vòng sự kiện
+        self._pending.update([key] if key is not None else self._jobs)
+        self._flush_timer.start()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Type.Show, QEvent.Type.Hide):
+            for job in self._jobs.values():
+                if obj in job.watchers:
+                    if job.isVisible():
+                        self._resume(job)
+                    else:
+                        job.timer.stop()
+        return False
+
+    def _resume(self, job):
+        if not job.timer.isActive():
+            job.timer.start()
+        if job.stale or job.isDue():
+            self.request(job.key)
+
+    def _flush(self):
+        pending, self._pending = self._pending, set()
+        for key in pending:
+            job = self._jobs.get(key)
+            if job is None:
+                continue
+            if not job.isVisible():
+                job.stale = True  # Tab ẩn: làm mới ngay khi hiện lại
+                continue
+            if job.task is not None:
+                job.rerun = True
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        query = job.prepare()
+        if query is None:
+            return
+        fn, *args = query
+        job.last_run = time.monotonic()
+        job.rerun = False
+        job.stale = False
+        job.task = query_executor().submit(
+            fn, *args, owner=job.owner, key=f"refresh:{job.key}",
+            on_result=job.on_result,
+            on_error=job.on_error or (lambda e: print(f"Lỗi làm mới {job.key}: {str(e)}"))
+        )
+        # finished/failed/cancelled được phát trước callback, kể cả khi bị hủy vì quá thời gian
+        for signal in (job.task.finished, job.task.failed, job.task.cancelled):
+            signal.connect(lambda *_, task=job.task: self._taskDone(job, task))
+
+    def _taskDone(self, job, task):
+        if job.task is not task:
+            return
+        job.task = None
+        if job.rerun and self._jobs.get(job.key) is job:
+            self.request(job.key)
+
+    def _ownerDestroyed(self, key, job):
+        if self._jobs.get(key) is job:
+            self.unregister(key)
+
+    def _watcherDestroyed(self, key, widget):
+        job = self._jobs.get(key)
+        if job is not None and widget in job.watchers:
+            job.watchers.remove(widget)
+            if not job.isVisible():
+                job.timer.stop()
+
+_scheduler = None
+
+def refresh_scheduler():
+    # Tạo khi cần vì QObject chỉ được tạo sau khi đã có QApplication
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RefreshScheduler()
+    return _scheduler
@@ -0,0 +1,156 @@
+# services/report_jobs.py
+# Chạy công việc dựng báo cáo nặng (định dạng hàng nghìn ô Excel) trong tiến trình con,
+# để luồng giao diện - và cả GIL - không bị chiếm khi thu ngân vẫn đang bán hàng.
+# Tiến độ được gửi về qua multiprocessing.Queue và được đọc bằng QTimer trên luồng giao diện.
+#
+# Dùng:
+#   job = report_jobs().start(build_statistics_report, path, summary, top_products)
+#   job.progress.connect(...); job.finished.connect(...); job.failed.connect(...)
+# trong đó hàm công việc nhận progress(done, total, message) làm tham số đầu tiên,
+# phải là hàm cấp module (để tiến trình con import được) và không dùng Qt.
+# Nếu công việc ghi ra file tạm, truyền partial=<đường dẫn file tạm>: tiến trình con bị dừng
+# (hủy, chết giữa chừng) không kịp tự dọn nên file này được xóa ở tiến trình chính.
+
+import multiprocessing
+import os
+import queue
+import traceback
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+POLL_INTERVAL_MS = 100
+# Chờ thêm thông điệp cuối khi tiến trình con vừa thoát (hàng đợi được ghi qua luồng nền của con)
+FINAL_READ_TIMEOUT = 1.0
+
+def _worker_main(messages, fn, args, kwargs):
+    # Chạy trong tiến trình con
+    def progress(done, total, message=""):
+        messages.put(("progress", done, total, message))
+    try:
+        result = fn(progress, *args, **kwargs)
+        messages.put(("done", result))
+    except Exception as e:
+        traceback.print_exc()
+        messages.put(("error", str(e)))
+
+class ReportJob(QObject):
+    progress = Signal(int, int, str)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, runner, process, messages, partial=None):
+        super().__init__(runner)
+        self._runner = runner
+        self._process = process
+        self._messages = messages
+        self._partial = partial
+        self._done = False
+        self._timer = QTimer(self)
+        self._timer.setInterval(POLL_INTERVAL_MS)
+        self._timer.timeout.connect(self._poll)
+        self._timer.start()
+
+    def isRunning(self):
+        return not self._done
+
+    def cancel(self):
+        if self._done:
+            return
+        self._process.terminate()
+        self._finish()
+        self._discardPartial()
+        self.cancelled.emit()
+
+    def _poll(self):
+        if self._drain(timeout=None):
+            return
+        if not self._process.is_alive():
+            # Con có thể đã gửi kết quả rồi thoát ngay sau lần đọc trên: đọc lại một lần nữa
+            if self._drain(timeout=FINAL_READ_TIMEOUT):
+                return
+            # Tiến trình con chết mà không báo kết quả (bị kill, lỗi import...)
+            self._finish()
+            self._discardPartial()
+            self.failed.emit(f"Tiến trình dựng báo cáo kết thúc bất thường (mã {self._process.exitcode})")
+
+    def _drain(self, timeout):
+        # Xử lý các thông điệp đang có; trả về True nếu đã nhận kết quả cuối.
+        # timeout: chờ tối đa bấy nhiêu giây cho mỗi thông điệp thay vì dừng ngay khi hàng đợi rỗng
+        while True:
+            try:
+                if timeout is None:
+                    message = self._messages.get_nowait()
+                else:
+                    message = self._messages.get(timeout=timeout)
+            except queue.Empty:
+                return False
+            kind = message[0]
+            if kind == "progress":
+                self.progress.emit(*message[1:])
+            elif kind == "done":
+                self._finish()
+                self.finished.emit(message[1])
+                return True
+            elif kind == "error":
+                self._finish()
+                self._discardPartial()
+                self.failed.emit(message[1])
+                return True
+
+    def _discardPartial(self):
+        if self._partial and os.path.exists(self._partial):
+            try:
+                os.remove(self._partial)
+            except OSError as e:
+                print(f"Không xóa được file tạm {self._partial}: {str(e)}")
+
+    def _finish(self):
+        self._done = True
+        self._timer.stop()
+        self._process.join(1)
+        self._runner._jobFinished(self)
+
+class ReportJobRunner(QObject):
+    # Phát ra khi chuyển giữa có/không có báo cáo đang dựng
+    busyChanged = Signal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # spawn: tiến trình con sạch, không kế thừa trạng thái Qt / kết nối CSDL của tiến trình chính
+        self._context = multiprocessing.get_context("spawn")
+        self._jobs = []
+
+    def start(self, fn, *args, partial=None, **kwargs):
+        # partial: file tạm công việc ghi dở, được xóa nếu công việc bị hủy hoặc thất bại
+        messages = self._context.Queue()
+        process = self._context.Process(target=_worker_main, args=(messages, fn, args, kwargs), daemon=True)
+        process.start()
+        job = ReportJob(self, process, messages, partial)
+        self._jobs.append(job)
+        if len(self._jobs) == 1:
+            self.busyChanged.emit(True)
+        return job
+
+    def isBusy(self):
+        return bool(self._jobs)
+
+    def cancelAll(self):
+        for job in list(self._jobs):
+            job.cancel()
+
+    def _jobFinished(self, job):
+        if job in self._jobs:
+            self._jobs.remove(job)
+            job.deleteLater()
+            if not self._jobs:
+                self.busyChanged.emit(False)
+
+_runner = None
+
+def report_jobs():
+    # Tạo khi cần vì QObject chỉ được tạo sau khi đã có QApplication
+    global _runner
+    if _runner is None:
+        _runner = ReportJobRunner()
+    return _runner
@@ -0,0 +1,136 @@
+# services/sales_analytics.py
+# Số liệu bán hàng thật cho tab Thống kê: doanh thu, số đơn và số sản phẩm bán ra theo ngày/tuần/tháng
+# (đọc từ bảng cộng dồn sales_rollup, vài chục dòng bất kể lịch sử dài bao lâu), cùng các góc nhìn
+# chi tiết của khoảng thời gian đang xem - top sản phẩm, giỏ hàng, giờ bán, cặp sản phẩm mua cùng -
+# tính bằng NumPy từ một lần nạp order_items (services/order_analytics.py).
+# Kết quả được cache theo từng loại kỳ để đổi qua lại giữa các biểu đồ không tốn truy vấn.
+
+import threading
+import time
+from datetime import date, timedelta
+
+from services.sales_rollup import ALL_TIME, period_start
+
+# Thời gian sống của cache (giây)
+ANALYTICS_TTL = 60
+TOP_PRODUCTS_LIMIT = 5
+
+# Số kỳ hiển thị trên biểu đồ cho từng loại kỳ
+SERIES_LENGTH = {
+    "day": 30,
+    "week": 12,
+    "month": 12,
+}
+
+PERIOD_LABELS = {
+    "day": "Ngày",
+    "week": "Tuần",
+    "month": "Tháng",
+}
+
+def previous_period(start, period_type):
+    if period_type == "day":
+        return start - timedelta(days=1)
+    if period_type == "week":
+        return start - timedelta(days=7)
+    return (start - timedelta(days=1)).replace(day=1)
+
+def period_starts(period_type, count, today=None):
+    # count kỳ gần nhất, cũ nhất trước
+    start = period_start(today or date.today(), period_type)
+    starts = [start]
+    for _ in range(count - 1):
+        start = previous_period(start, period_type)
+        starts.append(start)
+    starts.reverse()
+    return starts
+
+def fetch_revenue_series(cursor, period_type, count, today=None):
+    # [(ngày đầu kỳ, số đơn, số sản phẩm bán ra, doanh thu)], kỳ không có đơn được điền 0
+    starts = period_starts(period_type, count, today)
+    cursor.execute("""
+        SELECT period_start, order_count, units_sold, revenue
+        FROM sales_rollup
+        WHERE period_type = %s AND period_start >= %s
+        ORDER BY period_start
+    """, (period_type, starts[0]))
+    rows = {row[0]: row for row in cursor.fetchall()}
+    series = []
+    for start in starts:
+        _, order_count, units_sold, revenue = rows.get(start, (start, 0, 0, 0))
+        series.append((start, int(order_count or 0), int(units_sold or 0), float(revenue or 0)))
+    return series
+
+def fetch_sales_totals(cursor):
+    # Tổng toàn thời gian: (số đơn, số sản phẩm bán ra, doanh thu)
+    cursor.execute("""
+        SELECT order_count, units_sold, revenue
+        FROM sales_rollup
+        WHERE period_type = 'all' AND period_start = %s
+    """, (ALL_TIME,))
+    row = cursor.fetchone()
+    if row is None:
+        return 0, 0, 0.0
+    return int(row[0] or 0), int(row[1] or 0), float(row[2] or 0)
+
+def fetch_product_names(cursor, product_ids):
+    # {mã: tên}; sản phẩm đã bị xóa giữ nguyên mã làm tên
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return {}
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    cursor.execute(f"SELECT id, name FROM products WHERE id IN ({placeholders})", product_ids)
+    names = {pid: pid for pid in product_ids}
+    names.update((str(pid), name) for pid, name in cursor.fetchall())
+    return names
+
+class SalesAnalytics:
+    def __init__(self, ttl=ANALYTICS_TTL):
+        self.ttl = ttl
+        self._cache = {}   # loại kỳ -> (ngày tính, thời điểm tính, kết quả)
+        self._lock = threading.Lock()
+
+    def cached(self, period_type):
+        # Kết quả còn hạn của loại kỳ hoặc None
+        with self._lock:
+            entry = self._cache.get(period_type)
+            if entry is None:
+                return None
+            computed_for, fetched_at, result = entry
+            if computed_for != date.today() or time.monotonic() - fetched_at >= self.ttl:
+                return None
+            return result
+
+    def load(self, conn, period_type):
+        # Dùng được từ luồng nền (query_executor); kết quả được lưu vào cache
+        today = date.today()
+        cursor = conn.cursor()
+        # NumPy chỉ được nạp khi tab Thống kê thực sự cần số liệu
+        from services.order_analytics import load_order_items, analyze
+
+        series = fetch_revenue_series(cursor, period_type, SERIES_LENGTH[period_type], today)
+        order_count, units_sold, revenue = fetch_sales_totals(cursor)
+        views = analyze(load_order_items(conn, series[0][0]), TOP_PRODUCTS_LIMIT)
+        names = fetch_product_names(cursor, [p[0] for p in views['top_sellers']] +
+                                    [pid for pair in views['pairs'] for pid in pair[:2]])
+        result = {
+            "period_type": period_type,
+            "series": series,
+            "top_products": [(pid, names[pid], units, amount) for pid, units, amount in views['top_sellers']],
+            "baskets": views['baskets'],
+            "heatmap": views['heatmap'],
+            "pairs": [(names[a], names[b], count) for a, b, count in views['pairs']],
+            "total_orders": order_count,
+            "total_units": units_sold,
+            "total_revenue": revenue,
+        }
+        with self._lock:
+            self._cache[period_type] = (today, time.monotonic(), result)
+        return result
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+# Dùng chung trong toàn ứng dụng
+sales_analytics = SalesAnalytics()
@@ -0,0 +1,177 @@
+# services/sales_rollup.py
+# Bảng cộng dồn doanh thu, số đơn và số sản phẩm bán ra theo ngày, tuần, tháng và toàn thời gian.
+# Được cập nhật ngay trong giao dịch thanh toán / xóa đơn, nên trang chủ và thống kê
+# chỉ cần đọc vài dòng thay vì quét toàn bộ bảng orders.
+#
+# Dựng lại toàn bộ từ bảng orders:
+#     python -m services.sales_rollup --rebuild
+
+import argparse
+from datetime import date, datetime, timedelta
+
+from database_connection import get_connection
+
+ALL_TIME = date(1970, 1, 1)  # period_start của dòng tổng toàn thời gian
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS sales_rollup (
+        period_type VARCHAR(5) NOT NULL,
+        period_start DATE NOT NULL,
+        order_count INT NOT NULL DEFAULT 0,
+        revenue DECIMAL(15,2) NOT NULL DEFAULT 0,
+        units_sold INT NOT NULL DEFAULT 0,
+        PRIMARY KEY (period_type, period_start)
+    )
+"""
+
+PERIOD_TYPES = ("day", "week", "month", "all")
+
+UPSERT = """
+    INSERT INTO sales_rollup (period_type, period_start, order_count, revenue, units_sold)
+    VALUES ('day', %s, %s, %s, %s), ('week', %s, %s, %s, %s), ('month', %s, %s, %s, %s),
+           ('all', %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        order_count = order_count + VALUES(order_count),
+        revenue = revenue + VALUES(revenue),
+        units_sold = units_sold + VALUES(units_sold)
+"""
+
+def _as_date(value):
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def period_start(value, period_type):
+    # Ngày đầu kỳ chứa value; tuần bắt đầu từ thứ Hai (giống WEEKDAY() của MySQL)
+    day = _as_date(value)
+    if period_type == "week":
+        return day - timedelta(days=day.weekday())
+    if period_type == "month":
+        return day.replace(day=1)
+    if period_type == "all":
+        return ALL_TIME
+    return day
+
+def record_order(cursor, order_date, total_amount, units_sold=0, sign=1):
+    # Cộng một đơn hàng vào các dòng ngày/tuần/tháng/toàn thời gian; sign=-1 để trừ ra
+    count = sign
+    amount = sign * total_amount
+    units = sign * units_sold
+    params = []
+    for period_type in PERIOD_TYPES:
+        params.extend([period_start(order_date, period_type), count, amount, units])
+    cursor.execute(UPSERT, params)
+
+def remove_order(cursor, order_date, total_amount, units_sold=0):
+    record_order(cursor, order_date, total_amount, units_sold, sign=-1)
+
+def read_totals(cursor, today=None):
+    today = today or date.today()
+    cursor.execute("""
+        SELECT period_type, order_count, revenue
+        FROM sales_rollup
+        WHERE (period_type = 'day' AND period_start = %s)
+           OR (period_type = 'month' AND period_start = %s)
+           OR (period_type = 'all' AND period_start = %s)
+    """, (today, today.replace(day=1), ALL_TIME))
+    totals = {period: (0, 0) for period in ("day", "month", "all")}
+    for period_type, order_count, revenue in cursor.fetchall():
+        totals[period_type] = (int(order_count or 0), revenue or 0)
+    return totals
+
+def rebuild(conn):
+    # Tính lại toàn bộ bảng cộng dồn từ orders / order_items trong một giao dịch
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM sales_rollup")
+        cursor.execute("""
+            INSERT INTO sales_rollup (period_type, period_start, order_count, revenue, units_sold)
+            SELECT 'day', DATE(o.order_date), COUNT(*), COALESCE(SUM(o.total_amount), 0),
+                   COALESCE(SUM(items.units), 0)
+            FROM orders o
+            LEFT JOIN (
+                SELECT order_id, SUM(quantity) AS units
+                FROM order_items
+                GROUP BY order_id
+            ) items ON items.order_id = o.id
+            GROUP BY DATE(o.order_date)
+        """)
+        # Tuần và tháng gộp từ các dòng ngày vừa tính, không quét lại orders
+        cursor.execute("""
+            INSERT INTO sales_rollup (period_type, period_start, order_count, revenue, units_sold)
+            SELECT 'week', period_start - INTERVAL WEEKDAY(period_start) DAY AS week_start,
+                   SUM(order_count), SUM(revenue), SUM(units_sold)
+            FROM sales_rollup
+            WHERE period_type = 'day'
+            GROUP BY week_start
+        """)
+        cursor.execute("""
+            INSERT INTO sales_rollup (period_type, period_start, order_count, revenue, units_sold)
+            SELECT 'month', period_start - INTERVAL (DAYOFMONTH(period_start) - 1) DAY AS month_start,
+                   SUM(order_count), SUM(revenue), SUM(units_sold)
+            FROM sales_rollup
+            WHERE period_type = 'day'
+            GROUP BY month_start
+        """)
+        cursor.execute("""
+            INSERT INTO sales_rollup (period_type, period_start, order_count, revenue, units_sold)
+            SELECT 'all', %s, COALESCE(SUM(order_count), 0), COALESCE(SUM(revenue), 0),
+                   COALESCE(SUM(units_sold), 0)
+            FROM sales_rollup
+            WHERE period_type = 'day'
+        """, (ALL_TIME,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def ensure_rollup_table(conn, rebuild_data=False):
+    # Tạo bảng nếu chưa có và dựng dữ liệu từ lịch sử đơn hàng khi bảng mới tạo hoặc rebuild_data=True.
+    # CREATE TABLE tự commit nên bảng vẫn còn dù lần dựng trước lỗi: migration luôn truyền rebuild_data=True
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SHOW TABLES LIKE 'sales_rollup'")
+        exists = cursor.fetchone() is not None
+        if not exists:
+            cursor.execute(CREATE_TABLE)
+    finally:
+        cursor.close()
+    if rebuild_data or not exists:
+        rebuild(conn)
+    return not exists
+
+def ensure_units_column(conn):
+    # Bảng tạo từ phiên bản cũ chưa có units_sold / dòng tuần: thêm cột rồi dựng lại số liệu
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SHOW COLUMNS FROM sales_rollup LIKE 'units_sold'")
+        exists = cursor.fetchone() is not None
+        if not exists:
+            cursor.execute("ALTER TABLE sales_rollup ADD COLUMN units_sold INT NOT NULL DEFAULT 0")
+    finally:
+        cursor.close()
+    rebuild(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description="Quản lý bảng cộng dồn doanh thu (sales_rollup)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Xóa và tính lại toàn bộ bảng cộng dồn từ bảng orders")
+    args = parser.parse_args()
+
+    with get_connection() as conn:
+        created = ensure_rollup_table(conn)
+        if args.rebuild and not created:
+            rebuild(conn)
+        cursor = conn.cursor()
+        totals = read_totals(cursor)
+        cursor.close()
+
+    order_count, revenue = totals["all"]
+    print(f"sales_rollup: {order_count:,} đơn hàng, doanh thu {int(revenue):,} VNĐ")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# services/statistics_report.py
+# Dựng file Excel báo cáo thống kê (tổng quan, sản phẩm bán chạy, doanh thu theo ngày / tháng).
+# Chạy trong tiến trình con của ReportJobRunner nên không được import PySide6;
+# doanh thu theo kỳ được đọc từ bảng cộng dồn sales_rollup bằng kết nối riêng của tiến trình.
+
+import os
+from datetime import date, timedelta
+
+from database_connection import open_raw_connection
+from services.sales_rollup import ALL_TIME
+
+DAILY_REPORT_DAYS = 31
+
+def partial_path(path):
+    return f"{path}.part"
+
+def fetch_period_revenue(cursor, period_type, since):
+    cursor.execute("""
+        SELECT period_start, order_count, units_sold, revenue
+        FROM sales_rollup
+        WHERE period_type = %s AND period_start >= %s
+        ORDER BY period_start
+    """, (period_type, since))
+    return cursor.fetchall()
+
+def _formats(workbook):
+    return {
+        'header': workbook.add_format({
+            'bold': True,
+            'bg_color': '#4CAF50',
+            'color': 'white',
+            'align': 'center',
+            'valign': 'vcenter',
+            'border': 1
+        }),
+        'number': workbook.add_format({'num_format': '#,##0', 'align': 'right'}),
+        'currency': workbook.add_format({'num_format': '#,##0 "VNĐ"', 'align': 'right'}),
+        'percent': workbook.add_format({'num_format': '0.0%', 'align': 'right'}),
+        'date': workbook.add_format({'num_format': 'dd/mm/yyyy', 'align': 'center'}),
+        'month': workbook.add_format({'num_format': 'mm/yyyy', 'align': 'center'}),
+    }
+
+def _write_sheet(workbook, formats, name, columns, rows):
+    # columns: [(tiêu đề, độ rộng, tên định dạng hoặc None)]
+    sheet = workbook.add_worksheet(name)
+    for col, (title, width, _) in enumerate(columns):
+        sheet.set_column(col, col, width)
+        sheet.write(0, col, title, formats['header'])
+    for row_num, row in enumerate(rows, start=1):
+        for col, value in enumerate(row):
+            fmt = columns[col][2]
+            sheet.write(row_num, col, value, formats[fmt] if fmt else None)
+    return sheet
+
+def build_statistics_report(progress, path, summary, top_products, today=None):
+    # progress(bước, tổng số bước, mô tả); ghi ra file tạm rồi đổi tên khi xong
+    import xlsxwriter
+
+    today = today or date.today()
+    steps = 5
+    tmp_path = partial_path(path)
+    workbook = xlsxwriter.Workbook(tmp_path)
+    completed = False
+    try:
+        formats = _formats(workbook)
+
+        progress(0, steps, "Tổng quan")
+        # Cột giá trị có định dạng khác nhau theo từng dòng
+        sheet = _write_sheet(workbook, formats, 'Tổng Quan',
+                             [('Chỉ số', 20, None), ('Giá trị', 15, None), ('Đơn vị', 15, None)], [])
+        summary_rows = [
+            ('Tổng số sản phẩm', summary['total_products'], 'sản phẩm', 'number'),
+            ('Tổng hàng tồn kho', summary['total_inventory'], 'sản phẩm', 'number'),
+            ('Tổng số khách hàng', summary['total_customers'], 'khách hàng', 'number'),
+            ('Tổng số đơn hàng', summary.get('total_orders', 0), 'đơn hàng', 'number'),
+            ('Sản phẩm đã bán', summary.get('total_units', 0), 'sản phẩm', 'number'),
+            ('Tổng doanh thu', float(summary['total_revenue']), 'VNĐ', 'currency'),
+        ]
+        for i, (label, value, unit, fmt) in enumerate(summary_rows, start=1):
+            sheet.write(i, 0, label)
+            sheet.write(i, 1, value, formats[fmt])
+            sheet.write(i, 2, unit)
+
+        progress(1, steps, "Sản phẩm bán chạy")
+        if top_products:
+            # top_products: [(mã, tên, số lượng bán, doanh thu)] như sales_analytics trả về
+            total_rev = sum(float(p[3]) for p in top_products) or 1
+            _write_sheet(workbook, formats, 'Sản Phẩm Bán Chạy',
+                         [('Mã SP', 12, None), ('Tên sản phẩm', 30, None), ('Đã bán', 15, 'number'),
+                          ('Doanh thu', 20, 'currency'), ('Tỷ lệ', 15, 'percent')],
+                         [(pid, name, int(units), float(revenue), float(revenue) / total_rev)
+                          for pid, name, units, revenue in top_products])
+
+        progress(2, steps, "Đọc doanh thu theo kỳ")
+        conn = open_raw_connection()
+        try:
+            cursor = conn.cursor()
+            daily = fetch_period_revenue(cursor, 'day', today - timedelta(days=DAILY_REPORT_DAYS - 1))
+            monthly = fetch_period_revenue(cursor, 'month', ALL_TIME)
+            cursor.close()
+        finally:
+            conn.close()
+
+        progress(3, steps, "Doanh thu theo ngày")
+        _write_sheet(workbook, formats, 'Doanh Thu Theo Ngày',
+                     [('Ngày', 15, 'date'), ('Số đơn', 12, 'number'), ('Đã bán', 12, 'number'),
+                      ('Doanh thu', 20, 'currency')],
+                     [(day, int(count), int(units), float(revenue))
+                      for day, count, units, revenue in daily])
+
+        progress(4, steps, "Doanh thu theo tháng")
+        _write_sheet(workbook, formats, 'Doanh Thu Theo Tháng',
+                     [('Tháng', 15, 'month'), ('Số đơn', 12, 'number'), ('Đã bán', 12, 'number'),
+                      ('Doanh thu', 20, 'currency')],
+                     [(month, int(count), int(units), float(revenue))
+                      for month, count, units, revenue in monthly])
+
+        workbook.close()
+        completed = True
+        os.replace(tmp_path, path)
+        progress(steps, steps, "Hoàn tất")
+    finally:
+        if not completed:
+            try:
+                workbook.close()
+            except Exception:
+                pass
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return path
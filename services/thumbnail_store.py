@@ -0,0 +1,146 @@
+# services/thumbnail_store.py
+# Ảnh thu nhỏ trên đĩa (product_images/.thumbs): mỗi ảnh gốc chỉ được giải mã một lần để sinh
+# mọi kích thước chuẩn. Chỉ dùng QImage nên gọi được từ luồng nền và từ services/image_ingest;
+# cache QPixmap trong bộ nhớ cho giao diện nằm ở ui/thumbnail_cache.
+
+import hashlib
+import os
+import threading
+
+from PySide6.QtGui import QImage, QImageReader
+from PySide6.QtCore import Qt
+
+THUMBNAIL_DIR = os.path.join("product_images", ".thumbs")
+
+# Các kích thước đang được dùng trong ứng dụng
+STANDARD_SIZES = [
+    (300, 300),  # Xem trước trong Quản Lý Sản Phẩm
+    (200, 200),  # ui/product_card
+    (180, 140),  # Thẻ sản phẩm trong tab Oder
+    (90, 90),    # Giỏ hàng
+    (75, 75),    # Bảng sản phẩm
+    (50, 50),    # Bảng kết quả tìm kiếm sản phẩm
+]
+
+_disk_lock = threading.Lock()
+# Khóa theo từng ảnh gốc để hai luồng không cùng giải mã một file
+_source_locks = {}
+_source_locks_guard = threading.Lock()
+
+def source_key(path):
+    # (đường dẫn tuyệt đối, mtime) hoặc None nếu file không tồn tại
+    try:
+        return os.path.abspath(path), os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+def _source_lock(abs_path):
+    with _source_locks_guard:
+        return _source_locks.setdefault(abs_path, threading.Lock())
+
+def _read_thumbnail(thumb_path):
+    if os.path.exists(thumb_path):
+        image = QImage(thumb_path)
+        if not image.isNull():
+            return image
+    return None
+
+def _thumbnail_path(abs_path, mtime_ns, width, height):
+    digest = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(THUMBNAIL_DIR, f"{digest}_{mtime_ns}_{width}x{height}.png")
+
+def _remove_stale(abs_path, mtime_ns=None):
+    # Xóa ảnh thu nhỏ của các phiên bản cũ của cùng file gốc (mtime_ns=None: xóa tất cả)
+    digest = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:16]
+    prefix = f"{digest}_"
+    current = f"{digest}_{mtime_ns}_"
+    try:
+        for name in os.listdir(THUMBNAIL_DIR):
+            if name.startswith(prefix) and (mtime_ns is None or not name.startswith(current)):
+                try:
+                    os.remove(os.path.join(THUMBNAIL_DIR, name))
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+def _fit(source, width, height):
+    # Kích thước giữ tỉ lệ khung hình (tương đương KeepAspectRatio)
+    return source.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio)
+
+def _scale(image, width, height):
+    return image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio,
+                        Qt.TransformationMode.SmoothTransformation)
+
+def _save(image, destination):
+    tmp_path = destination + ".tmp"
+    if image.save(tmp_path, "PNG"):
+        os.replace(tmp_path, destination)
+
+def decode_image(path, max_width=None, max_height=None):
+    # Giải mã ảnh; nếu có kích thước tối đa thì để bộ giải mã thu nhỏ ngay khi đọc (nhanh hơn nhiều với JPEG)
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    if max_width and max_height:
+        original = reader.size()
+        if original.isValid() and (original.width() > max_width or original.height() > max_height):
+            reader.setScaledSize(_fit(original, max_width, max_height))
+    image = reader.read()
+    return None if image.isNull() else image
+
+def generate_thumbnails(path, sizes=STANDARD_SIZES):
+    # Giải mã ảnh gốc một lần và ghi mọi kích thước chuẩn xuống đĩa; trả về {(w, h): QImage}
+    key = source_key(path)
+    if key is None:
+        return {}
+    abs_path, mtime_ns = key
+    largest = max(sizes)
+    source = decode_image(path, *largest)
+    if source is None:
+        return {}
+
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    thumbnails = {}
+    with _disk_lock:
+        for width, height in sizes:
+            image = _scale(source, width, height)
+            _save(image, _thumbnail_path(abs_path, mtime_ns, width, height))
+            thumbnails[(width, height)] = image
+        _remove_stale(abs_path, mtime_ns)
+    return thumbnails
+
+def load_thumbnail_image(path, width, height):
+    # Trả về QImage đã thu nhỏ (an toàn khi gọi từ luồng khác), None nếu không có ảnh
+    key = source_key(path)
+    if key is None:
+        return None
+    abs_path, mtime_ns = key
+
+    thumb_path = _thumbnail_path(abs_path, mtime_ns, width, height)
+    image = _read_thumbnail(thumb_path)
+    if image is not None:
+        return image
+
+    with _source_lock(abs_path):
+        # Luồng khác có thể vừa sinh xong trong lúc chờ khóa
+        image = _read_thumbnail(thumb_path)
+        if image is not None:
+            return image
+
+        if (width, height) in STANDARD_SIZES:
+            return generate_thumbnails(path).get((width, height))
+
+        # Kích thước không chuẩn: thu nhỏ riêng rồi lưu lại
+        source = decode_image(path, width, height)
+        if source is None:
+            return None
+        image = _scale(source, width, height)
+        os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+        with _disk_lock:
+            _save(image, thumb_path)
+        return image
+
+def remove_thumbnails(path):
+    # Gọi khi file ảnh gốc bị xóa
+    with _disk_lock:
+        _remove_stale(os.path.abspath(path))
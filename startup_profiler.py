@@ -0,0 +1,209 @@
+# startup_profiler.py
+# Đo thời gian khởi động: import module, dựng form đăng nhập, lấy thông tin người dùng,
+# khởi tạo từng tab và lần vẽ đầu tiên. Bật bằng biến môi trường CAFE_PROFILE_STARTUP=1
+# hoặc chạy: python main.py --profile-startup
+# Báo cáo (JSON + tóm tắt dạng text) được ghi vào thư mục startup_reports/.
+
+import atexit
+import importlib.machinery
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+ENV_VAR = "CAFE_PROFILE_STARTUP"
+CLI_FLAG = "--profile-startup"
+REPORT_DIR = "startup_reports"
+TOP_IMPORTS = 25
+
+# Loader tạo riêng cho từng module nên có thể bọc exec_module trên instance
+_TIMED_LOADERS = (importlib.machinery.SourceFileLoader,
+                  importlib.machinery.SourcelessFileLoader,
+                  importlib.machinery.ExtensionFileLoader)
+
+class _ImportTimingFinder:
+    # Meta path finder không tự tìm module, chỉ bọc exec_module của loader mà các finder khác trả về
+    def __init__(self, profiler):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "searching", False):
+            return None
+        self._local.searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.searching = False
+
+        loader = spec.loader
+        if isinstance(loader, _TIMED_LOADERS) and "exec_module" not in loader.__dict__:
+            original = loader.exec_module
+
+            def exec_module(module):
+                with self._profiler.import_span(fullname):
+                    original(module)
+
+            loader.exec_module = exec_module
+        return spec
+
+class StartupProfiler:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.started_at = datetime.now()
+        self.enabled = False
+        self.spans = []
+        self.marks = []
+        self._local = threading.local()
+        self._finder = None
+        self._lock = threading.Lock()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._finder = _ImportTimingFinder(self)
+        sys.meta_path.insert(0, self._finder)
+        atexit.register(self.write_report)
+
+    def _now_ms(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name, category="startup"):
+        if not self.enabled:
+            yield
+            return
+        stack = self._stack()
+        frame = [0.0]  # Tổng thời gian của các span con
+        start = self._now_ms()
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            duration = self._now_ms() - start
+            if stack:
+                stack[-1][0] += duration
+            with self._lock:
+                self.spans.append({
+                    "name": name,
+                    "category": category,
+                    "start_ms": round(start, 3),
+                    "duration_ms": round(duration, 3),
+                    "self_ms": round(duration - frame[0], 3),
+                    "depth": len(stack),
+                    "thread": threading.current_thread().name,
+                })
+
+    def import_span(self, module_name):
+        return self.span(module_name, "import")
+
+    def mark(self, name):
+        # Mốc thời gian tính từ lúc tiến trình bắt đầu import main.py
+        if self.enabled:
+            with self._lock:
+                self.marks.append({"name": name, "at_ms": round(self._now_ms(), 3)})
+
+    def watch_first_paint(self, widget, name, write_report=False):
+        # Ghi mốc khi widget được vẽ lần đầu
+        if not self.enabled:
+            return
+        from PySide6.QtCore import QObject, QEvent
+
+        profiler = self
+
+        class _FirstPaintFilter(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Type.Paint:
+                    obj.removeEventFilter(self)
+                    profiler.mark(name)
+                    if write_report:
+                        profiler.write_report()
+                    self.deleteLater()
+                return False
+
+        widget._first_paint_filter = _FirstPaintFilter(widget)
+        widget.installEventFilter(widget._first_paint_filter)
+
+    def report(self):
+        with self._lock:
+            spans = list(self.spans)
+            marks = list(self.marks)
+        imports = [s for s in spans if s["category"] == "import"]
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "argv": sys.argv,
+            "marks": marks,
+            "spans": sorted((s for s in spans if s["category"] != "import"), key=lambda s: s["start_ms"]),
+            "imports": {
+                "count": len(imports),
+                "total_self_ms": round(sum(s["self_ms"] for s in imports), 3),
+                "modules": sorted(imports, key=lambda s: s["duration_ms"], reverse=True),
+            },
+        }
+
+    def summary(self, report):
+        lines = [f"Báo cáo khởi động {report['started_at']} (Python {report['python']})", ""]
+        lines.append("Mốc thời gian:")
+        for mark in report["marks"]:
+            lines.append(f"  {mark['at_ms']:>10.1f} ms  {mark['name']}")
+        lines.append("")
+        lines.append("Các bước khởi động:")
+        for span in report["spans"]:
+            indent = "  " * span["depth"]
+            lines.append(f"  {span['duration_ms']:>10.1f} ms  {indent}{span['name']} [{span['category']}]")
+        lines.append("")
+        imports = report["imports"]
+        lines.append(f"Import: {imports['count']} module, tổng {imports['total_self_ms']:.1f} ms")
+        lines.append(f"{TOP_IMPORTS} module import lâu nhất (gồm cả module con / riêng module):")
+        for span in imports["modules"][:TOP_IMPORTS]:
+            lines.append(f"  {span['duration_ms']:>10.1f} ms / {span['self_ms']:>8.1f} ms  {span['name']}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, directory=REPORT_DIR):
+        if not self.enabled:
+            return None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            report = self.report()
+            base = os.path.join(directory, f"startup-{self.started_at:%Y%m%d-%H%M%S}")
+            with open(base + ".json", "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(self.summary(report))
+            return base + ".json"
+        except Exception as e:
+            print(f"Không thể ghi báo cáo khởi động: {str(e)}")
+            return None
+
+# Dùng chung trong toàn ứng dụng
+profiler = StartupProfiler()
+
+def enable_from_args(argv):
+    # Gọi ở đầu main.py, trước mọi import khác
+    if CLI_FLAG in argv:
+        argv.remove(CLI_FLAG)
+        profiler.enable()
+    elif os.environ.get(ENV_VAR, "").strip() not in ("", "0"):
+        profiler.enable()
+    return profiler.enabled
@@ -1,13 +1,28 @@
-import os
+import shiboken6
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QFrame, QGridLayout, QScrollArea,
                              QSizePolicy, QSpacerItem, QMessageBox)
-from PySide6.QtGui import QFont, QPixmap, QIcon, QColor
+from PySide6.QtGui import QFont, QIcon, QColor
 from PySide6.QtCore import Qt, Signal, Slot
-from database_connection import connect_db
+from services.query_executor import query_executor
+from services.checkout import place_order, CheckoutError, OutOfStockError
+from services.product_catalog import product_catalog
+from services.id_allocator import next_order_id, next_invoice_id
 from form.invoice_form import InvoiceForm
+from ui.image_loader import image_loader
 from datetime import datetime
 
+def submit_order(conn, cart_items, customer_name, phone_number, payment_method, total_amount):
+    # Chạy ở luồng nền; trả về (mã đơn hàng, tồn kho còn lại của các sản phẩm đã bán)
+    # Mã đơn hàng / hóa đơn lấy từ khối số đã đặt trước, không trùng giữa các quầy
+    order_id = next_order_id()
+    invoice_id = next_invoice_id()
+    
+    # Toàn bộ đơn hàng được ghi trong một giao dịch với số truy vấn cố định
+    remaining = place_order(conn, cart_items, order_id, invoice_id, customer_name,
+                            phone_number, payment_method, total_amount, datetime.now())
+    return order_id, remaining
+
 class CartItem:
     def __init__(self, product_id, name, price, quantity=1, image_path=None):
         self.product_id = product_id
@@ -216,6 +231,7 @@ class CartTab(QWidget):
         clear_cart_btn.clicked.connect(self.clearCart)
         
         checkout_btn = QPushButton("Thanh Toán")
+        self.checkout_btn = checkout_btn
         checkout_btn.setStyleSheet("""
             QPushButton {
                 background-color: #2ecc71;
@@ -239,7 +255,8 @@ class CartTab(QWidget):
         main_layout.addWidget(summary_container)
         
     def refreshCart(self):
-        # Xóa các item hiện tại
+        # Xóa các item hiện tại và bỏ các ảnh đang chờ nạp của chúng
+        image_loader().cancelGroup(self)
         while self.items_layout.count():
             item = self.items_layout.takeAt(0)
             widget = item.widget()
@@ -270,6 +287,11 @@ class CartTab(QWidget):
         self.total_items_label.setText(f"{total_items} sản phẩm")
         self.total_price_label.setText(f"{format(total_price, ',.0f')} VNĐ")
     
+    def setItemImage(self, image_label, pixmap):
+        if pixmap and shiboken6.isValid(image_label):
+            image_label.setStyleSheet("")
+            image_label.setPixmap(pixmap)
+
     def createItemWidget(self, cart_item, index):
         item_frame = QFrame()
         item_frame.setStyleSheet("""
@@ -308,19 +330,17 @@ class CartTab(QWidget):
         image_layout.setContentsMargins(0, 0, 0, 0)
         
         image_label = QLabel()
-        if cart_item.image_path and os.path.exists(cart_item.image_path):
-            pixmap = QPixmap(cart_item.image_path)
-            scaled_pixmap = pixmap.scaled(
-                90, 90,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            image_label.setPixmap(scaled_pixmap)
+        pixmap = image_loader().cached(cart_item.image_path, 90, 90)
+        if pixmap:
+            image_label.setPixmap(pixmap)
         else:
+            # Hiện biểu tượng thay thế ngay, ảnh thật được thay vào khi nạp xong
             image_label.setText("🖼️")
             image_label.setFont(QFont("Arial", 36))
             image_label.setStyleSheet("color: #dee2e6;")
             image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            image_loader().request(cart_item.image_path, 90, 90,
+                                   lambda pixmap: self.setItemImage(image_label, pixmap), group=self)
         
         image_layout.addWidget(image_label)
         layout.addWidget(image_container)
@@ -535,122 +555,88 @@ class CartTab(QWidget):
             )
     
     def saveOrder(self, total_amount, customer_name, phone_number, payment_method):
-        conn = connect_db()
-        if not conn:
-            QMessageBox.critical(self, "Lỗi kết nối", "Không thể kết nối đến cơ sở dữ liệu!")
+        # Kiểm tra dữ liệu đầu vào trước khi mở giao dịch
+        if not customer_name or not phone_number:
+            QMessageBox.warning(self, "Thông tin thiếu", "Vui lòng nhập đầy đủ thông tin khách hàng!")
             return False
-    
-        try:
-            cursor = conn.cursor()
-    
-            # Tạo ID đơn hàng duy nhất với format ORD + số
-            import uuid
-            import datetime
-        
-            # Tạo ID đơn hàng dạng ORD + ngày tháng năm + số ngẫu nhiên
-            today = datetime.datetime.now().strftime("%y%m%d")
-            random_suffix = str(uuid.uuid4().int)[:4]
-            order_id = f"ORD{today}{random_suffix}"
         
-            # Lấy ngày hiện tại
-            current_date = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-            # Kiểm tra dữ liệu đầu vào
-            if not customer_name or not phone_number:
-                QMessageBox.warning(self, "Thông tin thiếu", "Vui lòng nhập đầy đủ thông tin khách hàng!")
-                return False
-        
-            # Kiểm tra số lượng sản phẩm có đủ trong kho
-            for item in self.cart_items:
-                cursor.execute("SELECT stock FROM products WHERE id = %s", (item.product_id,))
-                result = cursor.fetchone()
-                if not result:
-                    QMessageBox.warning(self, "Lỗi", f"Sản phẩm {item.name} không tồn tại trong hệ thống!")
-                    return False
-            
-                current_stock = result[0]
-                if current_stock < item.quantity:
-                    QMessageBox.warning(self, "Hết hàng", 
-                        f"Sản phẩm '{item.name}' chỉ còn {current_stock} sản phẩm trong kho, không đủ số lượng {item.quantity}!")
-                    return False
-    
-            # Tạo đơn hàng không sử dụng user_id để tránh lỗi khóa ngoại
-            cursor.execute("""
-                INSERT INTO orders (id, customer_name, phone_number, total_amount, order_date, status)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (order_id, customer_name, phone_number, total_amount, current_date, payment_method))
-    
-            # Thêm các sản phẩm vào đơn hàng
-            for item in self.cart_items:
-                cursor.execute("""
-                    INSERT INTO order_items (order_id, product_id, quantity, price)
-                    VALUES (%s, %s, %s, %s)
-                """, (order_id, item.product_id, item.quantity, item.price))
-    
-            # Cập nhật số lượng tồn kho
-            for item in self.cart_items:
-                cursor.execute("""
-                    UPDATE products
-                    SET stock = stock - %s
-                    WHERE id = %s
-                """, (item.quantity, item.product_id))
-    
-            # Tạo hóa đơn
-            import random
-            invoice_id = f"INV{today}{random.randint(1000, 9999)}"
-        
-            cursor.execute("""
-                INSERT INTO invoices (id, order_id, customer_name, phone_number, total_amount, payment_method, invoice_date)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """, (invoice_id, order_id, customer_name, phone_number, total_amount, payment_method, current_date))
-        
-            conn.commit()
-    
-            # Thông báo thành công với thiết kế mới
-            success_box = QMessageBox(self)
-            success_box.setWindowTitle("Thành công")
-            success_box.setText("Đơn hàng của bạn đã được thanh toán thành công!")
-            success_box.setInformativeText(f"Mã đơn hàng: #{order_id}")
-            success_box.setIcon(QMessageBox.Icon.Information)
-            success_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-    
-            success_box.setStyleSheet("""
-                QMessageBox {
-                    background-color: white;
-                }
-                QPushButton {
-                    background-color: #28a745;
-                    color: white;
-                    padding: 8px 16px;
-                    border-radius: 4px;
-                }
-            """)
+        # Giao dịch chạy ở luồng nền; khóa nút thanh toán để không gửi trùng đơn
+        # Không đặt timeout phía client: giao dịch có thể vẫn commit sau khi hết giờ chờ
+        # Chụp lại giỏ hàng để thay đổi trong lúc chờ không ảnh hưởng đơn đang ghi
+        cart_snapshot = [CartItem(item.product_id, item.name, item.price, item.quantity)
+                         for item in self.cart_items]
+        self.checkout_btn.setEnabled(False)
+        query_executor().submit(
+            submit_order, cart_snapshot, customer_name, phone_number, payment_method, total_amount,
+            owner=self, timeout=None,
+            on_result=lambda result: self.onOrderSaved(result, cart_snapshot),
+            on_error=self.onOrderFailed
+        )
+        return True
     
-            success_box.exec()
+    def onOrderSaved(self, result, cart_snapshot):
+        order_id, remaining = result
+        self.checkout_btn.setEnabled(True)
+        # Cập nhật tồn kho trong danh mục dùng chung, các tab khác tự cập nhật theo
+        product_catalog().setStock(remaining)
+        
+        # Thông báo thành công với thiết kế mới
+        success_box = QMessageBox(self)
+        success_box.setWindowTitle("Thành công")
+        success_box.setText("Đơn hàng của bạn đã được thanh toán thành công!")
+        success_box.setInformativeText(f"Mã đơn hàng: #{order_id}")
+        success_box.setIcon(QMessageBox.Icon.Information)
+        success_box.setStandardButtons(QMessageBox.StandardButton.Ok)
     
-            # Xóa giỏ hàng sau khi đặt hàng thành công
-            self.cart_items.clear()
-            self.refreshCart()
+        success_box.setStyleSheet("""
+            QMessageBox {
+                background-color: white;
+            }
+            QPushButton {
+                background-color: #28a745;
+                color: white;
+                padding: 8px 16px;
+                border-radius: 4px;
+            }
+        """)
     
-            # Phát tín hiệu đơn hàng đã được đặt
-            self.orderPlaced.emit()
+        success_box.exec()
     
-            return True
+        # Bỏ khỏi giỏ đúng số lượng đã bán; hàng thêm vào trong lúc chờ vẫn được giữ lại
+        sold = {}
+        for item in cart_snapshot:
+            sold[item.product_id] = sold.get(item.product_id, 0) + item.quantity
+        remaining_items = []
+        for item in self.cart_items:
+            taken = min(sold.get(item.product_id, 0), item.quantity)
+            if taken:
+                sold[item.product_id] -= taken
+                item.quantity -= taken
+            if item.quantity > 0:
+                remaining_items.append(item)
+        self.cart_items[:] = remaining_items
+        self.refreshCart()
     
-        except Exception as e:
-            conn.rollback()
-            error_message = str(e)
-            print(f"Lỗi khi tạo đơn hàng: {error_message}")
+        # Phát tín hiệu đơn hàng đã được đặt
+        self.orderPlaced.emit()
     
-            # Hiển thị thông báo lỗi chi tiết hơn
-            error_box = QMessageBox(self)
-            error_box.setWindowTitle("Lỗi khi tạo đơn hàng")
-            error_box.setText("Không thể tạo đơn hàng do lỗi hệ thống.")
-            error_box.setDetailedText(f"Chi tiết lỗi: {error_message}")
-            error_box.setIcon(QMessageBox.Icon.Critical)
-            error_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-            error_box.exec()
+    def onOrderFailed(self, e):
+        self.checkout_btn.setEnabled(True)
+        if isinstance(e, CheckoutError):
+            if isinstance(e, OutOfStockError) and e.product_id is not None:
+                product_catalog().setStock({e.product_id: e.available})
+            title = "Hết hàng" if isinstance(e, OutOfStockError) else "Lỗi"
+            QMessageBox.warning(self, title, str(e))
+            return
+        
+        error_message = str(e)
+        print(f"Lỗi khi tạo đơn hàng: {error_message}")
     
-            return False
-        finally:
-            conn.close()
\ No newline at end of file
+        # Hiển thị thông báo lỗi chi tiết hơn
+        error_box = QMessageBox(self)
+        error_box.setWindowTitle("Lỗi khi tạo đơn hàng")
+        error_box.setText("Không thể tạo đơn hàng do lỗi hệ thống.")
+        error_box.setDetailedText(f"Chi tiết lỗi: {error_message}")
+        error_box.setIcon(QMessageBox.Icon.Critical)
+        error_box.setStandardButtons(QMessageBox.StandardButton.Ok)
+        error_box.exec()
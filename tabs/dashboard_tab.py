@@ -3,13 +3,23 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PySide6.QtGui import QFont, QIcon
 from PySide6.QtCore import Qt
 
-from database_connection import connect_db
+from services.dashboard_metrics import dashboard_metrics
+from services.refresh_scheduler import refresh_scheduler
+
+# Số liệu chỉ là vài dòng của sales_rollup nên làm mới thường xuyên cũng rẻ
+REFRESH_INTERVAL_MS = 10000
 
 class DashboardTab(QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
         
+        scheduler = refresh_scheduler()
+        scheduler.register("dashboard", REFRESH_INTERVAL_MS, lambda: (dashboard_metrics.load,),
+                           self.showStats, owner=self,
+                           on_error=lambda e: print(f"Error getting dashboard metrics: {str(e)}"))
+        scheduler.watch("dashboard", self)
+        
     def initUI(self):
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 20, 20, 20)
@@ -46,19 +56,19 @@ class DashboardTab(QWidget):
         stats_grid.setSpacing(20)
         
         # Tạo các widget thống kê
-        self.stats_widgets = []
+        self.value_labels = {}
         stats_info = [
-            ("💰 Doanh Thu Hôm Nay", "0 VND", self.getDailyRevenue),
-            ("📦 Đơn Hàng Hôm Nay", "0", self.getDailyOrders),
-            ("📊 Doanh Thu Tháng Này", "0 VND", self.getMonthlyRevenue),
-            ("🛒 Tổng Đơn Hàng", "0", self.getTotalOrders)
+            ("💰 Doanh Thu Hôm Nay", "0 VND", "daily_revenue"),
+            ("📦 Đơn Hàng Hôm Nay", "0", "daily_orders"),
+            ("📊 Doanh Thu Tháng Này", "0 VND", "monthly_revenue"),
+            ("🛒 Tổng Đơn Hàng", "0", "total_orders")
         ]
         
         row, col = 0, 0
-        for title, default_value, update_func in stats_info:
+        for title, default_value, key in stats_info:
             stats_widget = self.createStatsWidget(title, default_value)
             stats_grid.addWidget(stats_widget, row, col)
-            self.stats_widgets.append((stats_widget, update_func))
+            self.value_labels[key] = stats_widget.findChild(QLabel, "valueLabel")
             
             col += 1
             if col > 1:
@@ -93,6 +103,7 @@ class DashboardTab(QWidget):
         layout.addWidget(title_label)
         
         value_label = QLabel(value)
+        value_label.setObjectName("valueLabel")
         value_label.setFont(QFont("Arial", 22, QFont.Weight.Bold))
         value_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         value_label.setStyleSheet("color: #1976D2; margin-top: 10px;")
@@ -100,87 +111,23 @@ class DashboardTab(QWidget):
         
         return widget
     
-    def updateStats(self):
-        # Cập nhật giá trị cho từng widget thống kê
-        for widget, update_func in self.stats_widgets:
-            value = update_func()
-            value_label = widget.findChild(QLabel, "", Qt.FindChildOption.FindDirectChildrenOnly)
-            if value_label and value_label.font().pointSize() > 20:  # Xác định đúng label giá trị
-                value_label.setText(value)
-    
-    def getDailyRevenue(self):
-        # Lấy doanh thu hôm nay từ CSDL
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT COALESCE(SUM(total_amount), 0) 
-                    FROM orders 
-                    WHERE DATE(order_date) = CURDATE()
-                """)
-                result = cursor.fetchone()
-                if result and result[0]:
-                    return f"{int(result[0]):,} VND"
-            except Exception as e:
-                print(f"Error getting daily revenue: {str(e)}")
-            finally:
-                conn.close()
-        return "0 VND"
-    
-    def getMonthlyRevenue(self):
-        # Lấy doanh thu tháng này từ CSDL
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT COALESCE(SUM(total_amount), 0) 
-                    FROM orders 
-                    WHERE YEAR(order_date) = YEAR(CURDATE()) 
-                    AND MONTH(order_date) = MONTH(CURDATE())
-                """)
-                result = cursor.fetchone()
-                if result and result[0]:
-                    return f"{int(result[0]):,} VND"
-            except Exception as e:
-                print(f"Error getting monthly revenue: {str(e)}")
-            finally:
-                conn.close()
-        return "0 VND"
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Số liệu được lấy từ cache nên quay lại trang chủ không tốn truy vấn
+        self.updateStats()
     
-    def getDailyOrders(self):
-        # Lấy số đơn hàng hôm nay từ CSDL
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT COUNT(*) 
-                    FROM orders 
-                    WHERE DATE(order_date) = CURDATE()
-                """)
-                result = cursor.fetchone()
-                if result:
-                    return str(result[0])
-            except Exception as e:
-                print(f"Error getting daily orders: {str(e)}")
-            finally:
-                conn.close()
-        return "0"
+    def updateStats(self):
+        # Cache còn hạn thì hiện ngay, nếu không thì nhờ bộ lập lịch đọc lại ở luồng nền
+        # (gộp chung với lượt làm mới định kỳ nếu cả hai cùng đến lúc hiện tab)
+        stats = dashboard_metrics.cached()
+        if stats is not None:
+            self.showStats(stats)
+            return
+        refresh_scheduler().request("dashboard")
     
-    def getTotalOrders(self):
-        # Lấy tổng số đơn hàng từ CSDL
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM orders")
-                result = cursor.fetchone()
-                if result:
-                    return str(result[0])
-            except Exception as e:
-                print(f"Error getting total orders: {str(e)}")
-            finally:
-                conn.close()
-        return "0"
\ No newline at end of file
+    def showStats(self, stats):
+        # Một ảnh chụp số liệu cho cả bốn widget thống kê
+        self.value_labels["daily_revenue"].setText(f"{stats['daily_revenue']:,} VND")
+        self.value_labels["daily_orders"].setText(str(stats["daily_orders"]))
+        self.value_labels["monthly_revenue"].setText(f"{stats['monthly_revenue']:,} VND")
+        self.value_labels["total_orders"].setText(str(stats["total_orders"]))
@@ -5,16 +5,79 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, QLine
                              QApplication, QSplitter)
 from PySide6.QtGui import QFont, QColor, QIcon
 from PySide6.QtCore import Qt, QDate, QSize
-from database_connection import connect_db
+from services.query_executor import query_executor
+from services.change_log import EMPLOYEE, DELETE, record_change
+from services.change_feed import change_feed
 import sys
 
+EMPLOYEE_COLUMNS = "employee_id, name, phone, address, position, salary, DATE_FORMAT(start_date, '%d/%m/%Y')"
+
+def fetch_employees(conn):
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT {EMPLOYEE_COLUMNS} FROM employees")
+    return cursor.fetchall()
+
+def insert_employee(conn, employee_id, name, phone, address, position, salary, start_date):
+    # Chạy ở luồng nền; trả về False nếu mã nhân viên đã tồn tại
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT employee_id FROM employees WHERE employee_id = %s", (employee_id,))
+        if cursor.fetchone():
+            return False
+        cursor.execute("""
+            INSERT INTO employees (employee_id, name, phone, address, position, salary, start_date) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (employee_id, name, phone, address, position, salary, start_date))
+        record_change(cursor, EMPLOYEE, employee_id)
+        conn.commit()
+        return True
+    finally:
+        cursor.close()
+
+def update_employee(conn, employee_id, name, phone, address, position, salary, start_date):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE employees 
+            SET name = %s, phone = %s, address = %s, position = %s, salary = %s, start_date = %s
+            WHERE employee_id = %s
+        """, (name, phone, address, position, salary, start_date, employee_id))
+        record_change(cursor, EMPLOYEE, employee_id)
+        conn.commit()
+    finally:
+        cursor.close()
+
+def remove_employee(conn, employee_id):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM employees WHERE employee_id = %s", (employee_id,))
+        record_change(cursor, EMPLOYEE, employee_id, DELETE)
+        conn.commit()
+    finally:
+        cursor.close()
+
+def search_employees(conn, keyword):
+    # Tìm kiếm nhân viên trong database
+    query = f"""
+        SELECT {EMPLOYEE_COLUMNS}
+        FROM employees
+        WHERE LOWER(employee_id) LIKE %s
+        OR LOWER(name) LIKE %s
+        OR LOWER(phone) LIKE %s
+        OR LOWER(address) LIKE %s
+        OR LOWER(position) LIKE %s
+    """
+    search_param = f"%{keyword}%"
+    cursor = conn.cursor()
+    cursor.execute(query, (search_param, search_param, search_param, search_param, search_param))
+    return cursor.fetchall()
+
 class EmployeeDialog(QDialog):
     def __init__(self, parent=None, employee_data=None):
         super().__init__(parent)
         self.setWindowTitle("Thông tin nhân viên")
         self.setModal(True)
         self.setMinimumWidth(400)
-        self.connectDB()
         
         layout = QVBoxLayout(self)
         
@@ -114,13 +177,6 @@ class EmployeeDialog(QDialog):
         button_layout.addWidget(self.cancel_button)
         layout.addLayout(button_layout)
 
-    def connectDB(self):
-        self.conn = connect_db()
-        if self.conn is None:
-            QMessageBox.critical(self, "Lỗi", "Không thể kết nối database!")
-            return
-        self.cursor = self.conn.cursor()
-
     def get_employee_data(self):
         return [
             self.id_input.text(),
@@ -137,47 +193,35 @@ class EmployeeManagementTab(QWidget):
         super().__init__()
         self.setup_ui()
         self.setup_connections()
-        self.connectDB()
         self.load_employees()
-        
-    def connectDB(self):
-        self.conn = connect_db()
-        if self.conn is None:
-            QMessageBox.critical(self, "Lỗi", "Không thể kết nối database!")
-            return False
-        self.cursor = self.conn.cursor()
-        return True
+        # Nhân viên được thêm/sửa/xóa ở máy khác: tải lại (giữ nguyên từ khóa tìm kiếm)
+        change_feed().employeesChanged.connect(self.search_employees)
 
     def load_employees(self):
-        if not hasattr(self, 'conn') or self.conn is None:
-            if not self.connectDB():
-                return
-            
+        # Truy vấn tất cả nhân viên ở luồng nền
+        query_executor().submit(
+            fetch_employees, owner=self, key="employees",
+            on_result=self.fill_table,
+            on_error=lambda e: QMessageBox.critical(self, "Lỗi", f"Không thể tải danh sách nhân viên: {str(e)}")
+        )
+
+    def fill_table(self, employees):
         # Xóa dữ liệu cũ trong bảng
         self.employee_table.setRowCount(0)
     
-        try:
-            # Truy vấn tất cả nhân viên
-            self.cursor.execute("SELECT employee_id, name, phone, address, position, salary, DATE_FORMAT(start_date, '%d/%m/%Y') FROM employees")
+        # Đổ dữ liệu vào table
+        for row_data in employees:
+            row = self.employee_table.rowCount()
+            self.employee_table.insertRow(row)
+            for col, value in enumerate(row_data):
+                if col == 5:  # Cột lương
+                    formatted_salary = f"{value:,} VNĐ"
+                    item = QTableWidgetItem(formatted_salary)
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                else:
+                    item = QTableWidgetItem(str(value))
+                self.employee_table.setItem(row, col, item)
 
-            employees = self.cursor.fetchall()
-        
-            # Đổ dữ liệu vào table
-            for row_data in employees:
-                row = self.employee_table.rowCount()
-                self.employee_table.insertRow(row)
-                for col, value in enumerate(row_data):
-                    if col == 5:  # Cột lương
-                        formatted_salary = f"{value:,} VNĐ"
-                        item = QTableWidgetItem(formatted_salary)
-                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                    else:
-                        item = QTableWidgetItem(str(value))
-                    self.employee_table.setItem(row, col, item)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi", f"Không thể tải danh sách nhân viên: {str(e)}")
-        
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
         
@@ -337,23 +381,12 @@ class EmployeeManagementTab(QWidget):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             employee_data = dialog.get_employee_data()
         
-            # Kiểm tra kết nối
-            if not hasattr(self, 'conn') or self.conn is None:
-                if not self.connectDB():
-                    return
-                
             try:
                 # Kiểm tra dữ liệu nhập vào
                 if not employee_data[0] or not employee_data[1]:
                     QMessageBox.warning(self, "Cảnh báo", "Mã nhân viên và tên nhân viên không được để trống!")
                     return
                 
-                # Kiểm tra mã nhân viên đã tồn tại chưa
-                self.cursor.execute("SELECT employee_id FROM employees WHERE employee_id = %s", (employee_data[0],))
-                if self.cursor.fetchone():
-                    QMessageBox.warning(self, "Cảnh báo", f"Mã nhân viên {employee_data[0]} đã tồn tại!")
-                    return
-                
                 # Chuyển đổi định dạng ngày
                 date_parts = employee_data[6].split('/')
                 mysql_date = f"{date_parts[2]}-{date_parts[1]}-{date_parts[0]}"
@@ -361,25 +394,24 @@ class EmployeeManagementTab(QWidget):
                 # Chuyển đổi định dạng lương
                 salary = int(employee_data[5].replace(" VNĐ", "").replace(",", ""))
             
-                # Thêm nhân viên vào database
-                query = """
-                    INSERT INTO employees (employee_id, name, phone, address, position, salary, start_date) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """
-                self.cursor.execute(query, (
-                    employee_data[0], employee_data[1], employee_data[2], 
-                    employee_data[3], employee_data[4], salary, mysql_date
-                ))
-                self.conn.commit()
-            
-                # Tải lại danh sách nhân viên
-                self.load_employees()
-                self.status_label.setText(f"Đã thêm nhân viên {employee_data[1]} thành công!")
-                QMessageBox.information(self, "Thành công", "Đã thêm nhân viên mới thành công!")
+                self.submit_change(
+                    insert_employee, employee_data[0], employee_data[1], employee_data[2],
+                    employee_data[3], employee_data[4], salary, mysql_date,
+                    on_done=lambda created: self.on_employee_added(created, employee_data),
+                    failure="Không thể thêm nhân viên"
+                )
                 
             except Exception as e:
-                self.conn.rollback()
                 QMessageBox.critical(self, "Lỗi", f"Không thể thêm nhân viên: {str(e)}")
+    
+    def on_employee_added(self, created, employee_data):
+        if not created:
+            QMessageBox.warning(self, "Cảnh báo", f"Mã nhân viên {employee_data[0]} đã tồn tại!")
+            return
+        # Tải lại danh sách nhân viên
+        self.load_employees()
+        self.status_label.setText(f"Đã thêm nhân viên {employee_data[1]} thành công!")
+        QMessageBox.information(self, "Thành công", "Đã thêm nhân viên mới thành công!")
             
     def edit_employee(self):
         current_row = self.employee_table.currentRow()
@@ -397,11 +429,6 @@ class EmployeeManagementTab(QWidget):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             new_data = dialog.get_employee_data()
         
-            # Kiểm tra kết nối
-            if not hasattr(self, 'conn') or self.conn is None:
-                if not self.connectDB():
-                    return
-                
             try:
                 # Kiểm tra dữ liệu nhập vào
                 if not new_data[1]:
@@ -416,24 +443,16 @@ class EmployeeManagementTab(QWidget):
                 salary = int(new_data[5].replace(" VNĐ", "").replace(",", ""))
             
                 # Cập nhật nhân viên trong database
-                query = """
-                    UPDATE employees 
-                    SET name = %s, phone = %s, address = %s, position = %s, salary = %s, start_date = %s
-                    WHERE employee_id = %s
-                """
-                self.cursor.execute(query, (
-                    new_data[1], new_data[2], new_data[3], 
-                    new_data[4], salary, mysql_date, new_data[0]
-                ))
-                self.conn.commit()
-            
-                # Tải lại danh sách nhân viên
-                self.load_employees()
-                self.status_label.setText(f"Đã cập nhật thông tin nhân viên {new_data[1]} thành công!")
-                QMessageBox.information(self, "Thành công", "Đã cập nhật thông tin nhân viên thành công!")
+                self.submit_change(
+                    update_employee, new_data[0], new_data[1], new_data[2],
+                    new_data[3], new_data[4], salary, mysql_date,
+                    on_done=lambda _: self.on_employee_changed(
+                        f"Đã cập nhật thông tin nhân viên {new_data[1]} thành công!",
+                        "Đã cập nhật thông tin nhân viên thành công!"),
+                    failure="Không thể cập nhật thông tin nhân viên"
+                )
                 
             except Exception as e:
-                self.conn.rollback()
                 QMessageBox.critical(self, "Lỗi", f"Không thể cập nhật thông tin nhân viên: {str(e)}")
             
     def delete_employee(self):
@@ -454,24 +473,38 @@ class EmployeeManagementTab(QWidget):
         )
     
         if reply == QMessageBox.StandardButton.Yes:
-            # Kiểm tra kết nối
-            if not hasattr(self, 'conn') or self.conn is None:
-                if not self.connectDB():
-                    return
-                
-            try:
-                # Xóa nhân viên
-                self.cursor.execute("DELETE FROM employees WHERE employee_id = %s", (employee_id,))
-                self.conn.commit()
-            
-                # Tải lại danh sách nhân viên
-                self.load_employees()
-                self.status_label.setText(f"Đã xóa nhân viên {employee_name} thành công!")
-                QMessageBox.information(self, "Thành công", "Đã xóa nhân viên thành công!")
-                
-            except Exception as e:
-                self.conn.rollback()
-                QMessageBox.critical(self, "Lỗi", f"Không thể xóa nhân viên: {str(e)}")
+            # Xóa nhân viên
+            self.submit_change(
+                remove_employee, employee_id,
+                on_done=lambda _: self.on_employee_changed(
+                    f"Đã xóa nhân viên {employee_name} thành công!",
+                    "Đã xóa nhân viên thành công!"),
+                failure="Không thể xóa nhân viên"
+            )
+
+    def submit_change(self, fn, *args, on_done, failure):
+        # Ghi CSDL ở luồng nền; khóa các nút sửa dữ liệu đến khi xong
+        self.set_actions_enabled(False)
+        
+        def done(result):
+            self.set_actions_enabled(True)
+            on_done(result)
+        
+        def failed(e):
+            self.set_actions_enabled(True)
+            QMessageBox.critical(self, "Lỗi", f"{failure}: {str(e)}")
+        
+        query_executor().submit(fn, *args, owner=self, timeout=None, on_result=done, on_error=failed)
+
+    def set_actions_enabled(self, enabled):
+        for button in (self.add_button, self.edit_button, self.delete_button):
+            button.setEnabled(enabled)
+
+    def on_employee_changed(self, status, message):
+        # Tải lại danh sách nhân viên
+        self.load_employees()
+        self.status_label.setText(status)
+        QMessageBox.information(self, "Thành công", message)
 
     def search_employees(self):
         keyword = self.search_input.text().lower()
@@ -479,47 +512,16 @@ class EmployeeManagementTab(QWidget):
             self.load_employees()
             return
         
-        # Kiểm tra kết nối
-        if not hasattr(self, 'conn') or self.conn is None:
-            if not self.connectDB():
-                return
-            
-        try:
-            # Tìm kiếm nhân viên trong database
-            query = """
-                SELECT employee_id, name, phone, address, position, salary, DATE_FORMAT(start_date, '%d/%m/%Y')
-                FROM employees
-                WHERE LOWER(employee_id) LIKE %s
-                OR LOWER(name) LIKE %s
-                OR LOWER(phone) LIKE %s
-                OR LOWER(address) LIKE %s
-                OR LOWER(position) LIKE %s
-            """
-            search_param = f"%{keyword}%"
-            self.cursor.execute(query, (search_param, search_param, search_param, search_param, search_param))
-            employees = self.cursor.fetchall()
-        
-            # Xóa dữ liệu cũ trong bảng
-            self.employee_table.setRowCount(0)
-        
-            # Đổ dữ liệu vào table
-            for row_data in employees:
-                row = self.employee_table.rowCount()
-                self.employee_table.insertRow(row)
-                for col, value in enumerate(row_data):
-                    if col == 5:  # Cột lương
-                        formatted_salary = f"{value:,} VNĐ"
-                        item = QTableWidgetItem(formatted_salary)
-                        item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                    else:
-                        item = QTableWidgetItem(str(value))
-                    self.employee_table.setItem(row, col, item)
-            
-            count = self.employee_table.rowCount()
-            self.status_label.setText(f"Tìm thấy {count} nhân viên phù hợp với từ khóa '{keyword}'")
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Lỗi", f"Không thể tìm kiếm nhân viên: {str(e)}")
+        query_executor().submit(
+            search_employees, keyword, owner=self, key="employees",
+            on_result=lambda employees: self.show_search_result(employees, keyword),
+            on_error=lambda e: QMessageBox.critical(self, "Lỗi", f"Không thể tìm kiếm nhân viên: {str(e)}")
+        )
+
+    def show_search_result(self, employees, keyword):
+        self.fill_table(employees)
+        count = self.employee_table.rowCount()
+        self.status_label.setText(f"Tìm thấy {count} nhân viên phù hợp với từ khóa '{keyword}'")
 
     def print_employee_list(self):
         try:
@@ -1,10 +1,22 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, QLineEdit, 
                               QPushButton, QHBoxLayout, QTableWidgetItem, QHeaderView,
                               QComboBox, QDateEdit, QMessageBox, QDialog, QGridLayout)
-from PySide6.QtGui import QFont, QColor
-from PySide6.QtCore import Qt, QDate
-from database_connection import connect_db
-from datetime import datetime, timedelta
+from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, QDate, QTimer
+from services.dashboard_metrics import dashboard_metrics
+from services.sales_analytics import sales_analytics
+from ui.order_table import OrderTableView
+from services.order_repository import (OrderFilter, load_first_page, load_next_page, load_new_orders,
+                                       load_order_summary, load_order_details, delete_order, page_cursor, newest_order_date, DEFAULT_PAGE_SIZE, PAGE_SIZES)
+from services.refresh_scheduler import refresh_scheduler
+from services.change_feed import change_feed
+from services.query_executor import query_executor
+from datetime import datetime
+
+# Bắt đầu tải trang tiếp theo khi còn cách cuối bảng khoảng chừng này dòng
+SCROLL_PREFETCH_ROWS = 20
+# Chu kỳ kiểm tra đơn mới khi tab đang mở (ms); đơn từ quầy khác thường đến sớm hơn qua change_feed
+REFRESH_INTERVAL_MS = 60000
 
 class OrderDetailDialog(QDialog):
     def __init__(self, order_id, parent=None):
@@ -102,6 +114,7 @@ class OrderDetailDialog(QDialog):
         
         # Delete button
         delete_button = QPushButton("Xóa")
+        self.delete_button = delete_button
         delete_button.setStyleSheet("""
             background-color: #F44336;
             color: white;
@@ -129,79 +142,58 @@ class OrderDetailDialog(QDialog):
         layout.addWidget(button_container)
         
     def loadOrderDetails(self):
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                
-                # Get order information
-                cursor.execute("""
-                    SELECT customer_name, phone_number, order_date, status, total_amount
-                    FROM orders
-                    WHERE id = %s
-                """, (self.order_id,))
-                
-                order_info = cursor.fetchone()
-                if not order_info:
-                    QMessageBox.warning(self, "Lỗi", "Không tìm thấy thông tin đơn hàng!")
-                    self.close()
-                    return
-                
-                customer_name, phone, date, status, total = order_info
-                
-                # Format date
-                date_obj = date
-                if isinstance(date, str):
-                    date_obj = datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
-                formatted_date = date_obj.strftime("%d/%m/%Y %H:%M")
-                
-                # Update labels
-                self.customer_label.setText(f"Khách hàng: {customer_name}")
-                self.phone_label.setText(f"Số điện thoại: {phone}")
-                self.date_label.setText(f"Ngày đặt: {formatted_date}")
-                self.status_label.setText(f"Phương thức thanh toán: {status}")
-                self.total_label.setText(f"Tổng tiền: {format(total, ',.0f')} VNĐ")
-                
-                # Get order items - FIX: Thay đổi oi.unit_price thành oi.price (hoặc tên cột chính xác)
-                cursor.execute("""
-                    SELECT oi.product_id, p.name, oi.price, oi.quantity, (oi.price * oi.quantity) as item_total
-                    FROM order_items oi
-                    JOIN products p ON p.id = oi.product_id
-                    WHERE oi.order_id = %s
-                """, (self.order_id,))
-                
-                items = cursor.fetchall()
-                
-                # Populate items table
-                self.items_table.setRowCount(len(items))
-                
-                for row_idx, item in enumerate(items):
-                    product_id, name, price, quantity, item_total = item
-                    
-                    # Create table items
-                    id_item = QTableWidgetItem(str(product_id))
-                    name_item = QTableWidgetItem(name)
-                    price_item = QTableWidgetItem(f"{format(price, ',.0f')} VNĐ")
-                    quantity_item = QTableWidgetItem(str(quantity))
-                    total_item = QTableWidgetItem(f"{format(item_total, ',.0f')} VNĐ")
-                    
-                    # Set alignment
-                    id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    price_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                    quantity_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    total_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                    
-                    # Set items to table
-                    self.items_table.setItem(row_idx, 0, id_item)
-                    self.items_table.setItem(row_idx, 1, name_item)
-                    self.items_table.setItem(row_idx, 2, price_item)
-                    self.items_table.setItem(row_idx, 3, quantity_item)
-                    self.items_table.setItem(row_idx, 4, total_item)
-                
-            except Exception as e:
-                QMessageBox.warning(self, "Lỗi", f"Không thể tải chi tiết đơn hàng: {str(e)}")
-            finally:
-                conn.close()
+        query_executor().submit(load_order_details, self.order_id, owner=self, key="details",
+                                on_result=self.showOrderDetails,
+                                on_error=lambda e: QMessageBox.warning(
+                                    self, "Lỗi", f"Không thể tải chi tiết đơn hàng: {str(e)}"))
+    
+    def showOrderDetails(self, result):
+        order_info, items = result
+        if not order_info:
+            QMessageBox.warning(self, "Lỗi", "Không tìm thấy thông tin đơn hàng!")
+            self.close()
+            return
+        
+        customer_name, phone, date, status, total = order_info
+        
+        # Format date
+        date_obj = date
+        if isinstance(date, str):
+            date_obj = datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
+        formatted_date = date_obj.strftime("%d/%m/%Y %H:%M")
+        
+        # Update labels
+        self.customer_label.setText(f"Khách hàng: {customer_name}")
+        self.phone_label.setText(f"Số điện thoại: {phone}")
+        self.date_label.setText(f"Ngày đặt: {formatted_date}")
+        self.status_label.setText(f"Phương thức thanh toán: {status}")
+        self.total_label.setText(f"Tổng tiền: {format(total, ',.0f')} VNĐ")
+        
+        # Populate items table
+        self.items_table.setRowCount(len(items))
+        
+        for row_idx, item in enumerate(items):
+            product_id, name, price, quantity, item_total = item
+            
+            # Create table items
+            id_item = QTableWidgetItem(str(product_id))
+            name_item = QTableWidgetItem(name)
+            price_item = QTableWidgetItem(f"{format(price, ',.0f')} VNĐ")
+            quantity_item = QTableWidgetItem(str(quantity))
+            total_item = QTableWidgetItem(f"{format(item_total, ',.0f')} VNĐ")
+            
+            # Set alignment
+            id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            price_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            quantity_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            total_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            
+            # Set items to table
+            self.items_table.setItem(row_idx, 0, id_item)
+            self.items_table.setItem(row_idx, 1, name_item)
+            self.items_table.setItem(row_idx, 2, price_item)
+            self.items_table.setItem(row_idx, 3, quantity_item)
+            self.items_table.setItem(row_idx, 4, total_item)
                 
     # Implement edit function
     def editOrder(self):
@@ -218,42 +210,54 @@ class OrderDetailDialog(QDialog):
                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         
         if reply == QMessageBox.StandardButton.Yes:
-            conn = connect_db()
-            if conn:
-                try:
-                    cursor = conn.cursor()
-                    
-                    # First delete order items (foreign key constraint)
-                    cursor.execute("DELETE FROM order_items WHERE order_id = %s", (self.order_id,))
-                    
-                    # Then delete the order
-                    cursor.execute("DELETE FROM orders WHERE id = %s", (self.order_id,))
-                    
-                    # Commit the transaction
-                    conn.commit()
-                    
-                    QMessageBox.information(self, "Thành công", 
-                                           f"Đã xóa đơn hàng #{self.order_id}")
-                    
-                    # Refresh the order list in parent widget
-                    if self.parent and hasattr(self.parent, 'refreshAfterPayment'):
-                        self.parent.refreshAfterPayment()
-                    
-                    # Close dialog
-                    self.accept()
-                    
-                except Exception as e:
-                    conn.rollback()
-                    QMessageBox.warning(self, "Lỗi", f"Không thể xóa đơn hàng: {str(e)}")
-                finally:
-                    conn.close()
+            # Giao dịch chạy ở luồng nền; không đặt timeout vì giao dịch có thể vẫn commit sau khi hết giờ chờ
+            self.delete_button.setEnabled(False)
+            query_executor().submit(delete_order, self.order_id, owner=self, timeout=None,
+                                    on_result=self.onOrderDeleted,
+                                    on_error=self.onDeleteFailed)
+    
+    def onOrderDeleted(self, _):
+        dashboard_metrics.invalidate()
+        sales_analytics.invalidate()
+        
+        QMessageBox.information(self, "Thành công", 
+                               f"Đã xóa đơn hàng #{self.order_id}")
+        
+        # Refresh the order list in parent widget
+        if self.parent and hasattr(self.parent, 'refreshAfterPayment'):
+            self.parent.refreshAfterPayment()
+        
+        # Close dialog
+        self.accept()
+    
+    def onDeleteFailed(self, e):
+        self.delete_button.setEnabled(True)
+        QMessageBox.warning(self, "Lỗi", f"Không thể xóa đơn hàng: {str(e)}")
 
 class OrderManagementTab(QWidget):
     def __init__(self):
         super().__init__()
+        self.page_size = DEFAULT_PAGE_SIZE
+        self.order_filter = None
+        self.next_cursor = None
+        self.has_more = False
+        self.loading_page = False
+        self.loading_first_page = False
+        self.total_orders = 0
+        self.total_revenue = 0.0
+        self.newest_order_date = None
         self.initUI()
         self.loadOrders()
         
+        # Đơn mới từ các quầy khác được chèn vào đầu danh sách khi tab đang mở
+        scheduler = refresh_scheduler()
+        scheduler.register("orders", REFRESH_INTERVAL_MS, self.newOrdersQuery, self.onNewOrders,
+                           owner=self)
+        scheduler.watch("orders", self)
+        feed = change_feed()
+        feed.ordersChanged.connect(self.onOrdersChanged)
+        feed.ordersRemoved.connect(self.onOrdersRemoved)
+        
     def initUI(self):
         layout = QVBoxLayout(self)
         
@@ -277,7 +281,7 @@ class OrderManagementTab(QWidget):
         search_layout = QHBoxLayout()
         
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Tìm kiếm theo tên hoặc số điện thoại...")
+        self.search_input.setPlaceholderText("Tìm theo tên khách, đầu hoặc đuôi số điện thoại...")
         self.search_input.setStyleSheet("padding: 8px;")
         
         self.payment_filter = QComboBox()
@@ -317,6 +321,15 @@ class OrderManagementTab(QWidget):
         """)
         reset_button.clicked.connect(self.resetFilters)
         
+        # Số đơn tải mỗi lần cuộn
+        date_layout.addStretch()
+        date_layout.addWidget(QLabel("Số dòng mỗi trang:"))
+        self.page_size_combo = QComboBox()
+        self.page_size_combo.addItems([str(size) for size in PAGE_SIZES])
+        self.page_size_combo.setCurrentText(str(DEFAULT_PAGE_SIZE))
+        self.page_size_combo.currentTextChanged.connect(self.changePageSize)
+        date_layout.addWidget(self.page_size_combo)
+        
         search_layout.addWidget(self.search_input)
         search_layout.addWidget(self.payment_filter)
         search_layout.addWidget(search_button)
@@ -327,14 +340,15 @@ class OrderManagementTab(QWidget):
         
         layout.addWidget(filter_container)
         
-        # Order table
-        self.order_table = QTableWidget(0, 7)  # Added one more column for detail button
-        self.order_table.setHorizontalHeaderLabels([
-            "Mã ĐH", "Tên KH", "Số điện thoại", "Ngày Đặt", "Tổng Tiền", "Trạng Thái", "Chi tiết"
-        ])
+        # Order table: model/view, mỗi dòng chỉ là một tuple, nút "Xem" được vẽ bởi delegate
+        self.order_table = OrderTableView()
+        self.order_model = self.order_table.order_model
+        self.order_table.detailRequested.connect(self.showOrderDetail)
         
         # Adjust column widths
         header = self.order_table.horizontalHeader()
+        # Chỉ đo một phần các dòng khi tự co giãn cột, không duyệt toàn bộ model
+        header.setResizeContentsPrecision(100)
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)  # ID
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)           # Name
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)  # Phone
@@ -344,12 +358,12 @@ class OrderManagementTab(QWidget):
         header.setSectionResizeMode(6, QHeaderView.ResizeMode.ResizeToContents)  # Detail button
         
         self.order_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: 1px solid #E0E0E0;
                 border-radius: 5px;
                 padding: 5px;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 5px;
             }
             QHeaderView::section {
@@ -360,6 +374,9 @@ class OrderManagementTab(QWidget):
             }
         """)
         
+        # Cuộn gần cuối bảng thì tải trang tiếp theo
+        self.order_table.verticalScrollBar().valueChanged.connect(self.onTableScrolled)
+        
         layout.addWidget(self.order_table)
         
         # Summary section
@@ -375,7 +392,11 @@ class OrderManagementTab(QWidget):
         self.total_revenue_label = QLabel("Tổng doanh thu: 0 VNĐ")
         self.total_revenue_label.setStyleSheet("font-weight: bold; color: #2E7D32;")
         
+        self.loaded_label = QLabel("")
+        self.loaded_label.setStyleSheet("color: #757575;")
+        
         summary_layout.addWidget(self.total_orders_label)
+        summary_layout.addWidget(self.loaded_label)
         summary_layout.addStretch()
         summary_layout.addWidget(self.total_revenue_label)
         
@@ -388,121 +409,145 @@ class OrderManagementTab(QWidget):
         self.to_date.setDate(QDate.currentDate())
         self.loadOrders()
     
-    def loadOrders(self):
-        # Clear current table
-        self.order_table.setRowCount(0)
-        
-        # Get filter values
-        search_text = self.search_input.text().strip()
+    def currentFilter(self):
         payment_method = self.payment_filter.currentText()
-        from_date = self.from_date.date().toString("yyyy-MM-dd")
-        to_date = self.to_date.date().toString("yyyy-MM-dd")
-        
-        # Add one day to to_date to include the entire day
-        to_date_obj = datetime.strptime(to_date, "%Y-%m-%d") + timedelta(days=1)
-        to_date = to_date_obj.strftime("%Y-%m-%d")
-        
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                
-                # Build query with filters
-                query = """
-                    SELECT id, customer_name, phone_number, order_date, total_amount, status
-                    FROM orders
-                    WHERE order_date BETWEEN %s AND %s
-                """
-                params = [from_date, to_date]
-                
-                # Add search filter if provided
-                if search_text:
-                    query += " AND (customer_name ILIKE %s OR phone_number ILIKE %s)"
-                    search_pattern = f"%{search_text}%"
-                    params.extend([search_pattern, search_pattern])
-                
-                # Add payment method filter if not "All"
-                if payment_method != "Tất cả":
-                    query += " AND status = %s"
-                    params.append(payment_method)
-                
-                # Order by date descending (newest first)
-                query += " ORDER BY order_date DESC"
-                
-                cursor.execute(query, params)
-                orders = cursor.fetchall()
-                
-                # Populate table
-                self.order_table.setRowCount(len(orders))
-                
-                total_revenue = 0
-                
-                for row_idx, order in enumerate(orders):
-                    order_id, name, phone, date, amount, status = order
-                    
-                    # Format date
-                    date_obj = date
-                    if isinstance(date, str):
-                        date_obj = datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
-                    formatted_date = date_obj.strftime("%d/%m/%Y %H:%M")
-                    
-                    # Add to total revenue
-                    total_revenue += float(amount)
-                    
-                    # Create table items
-                    id_item = QTableWidgetItem(str(order_id))
-                    name_item = QTableWidgetItem(name)
-                    phone_item = QTableWidgetItem(phone)
-                    date_item = QTableWidgetItem(formatted_date)
-                    amount_item = QTableWidgetItem(f"{format(amount, ',.0f')} VNĐ")
-                    status_item = QTableWidgetItem(status)
-                    
-                    # Set alignment
-                    id_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    amount_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                    date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                    
-                    # Set background color based on payment method
-                    if status == "Tiền mặt":
-                        status_item.setBackground(QColor("#E8F5E9"))  # Light green
-                    else:
-                        status_item.setBackground(QColor("#E3F2FD"))  # Light blue
-                    
-                    # Set items to table
-                    self.order_table.setItem(row_idx, 0, id_item)
-                    self.order_table.setItem(row_idx, 1, name_item)
-                    self.order_table.setItem(row_idx, 2, phone_item)
-                    self.order_table.setItem(row_idx, 3, date_item)
-                    self.order_table.setItem(row_idx, 4, amount_item)
-                    self.order_table.setItem(row_idx, 5, status_item)
-                    
-                    # Add detail button
-                    detail_btn = QPushButton("Xem")
-                    detail_btn.setStyleSheet("""
-                        QPushButton {
-                            background-color: #1976D2;
-                            color: white;
-                            border-radius: 3px;
-                            padding: 3px 8px;
-                        }
-                        QPushButton:hover {
-                            background-color: #1565C0;
-                        }
-                    """)
-                    # Using lambda to pass the order_id to the function
-                    detail_btn.clicked.connect(lambda checked, oid=order_id: self.showOrderDetail(oid))
-                    
-                    self.order_table.setCellWidget(row_idx, 6, detail_btn)
-                
-                # Update summary labels
-                self.total_orders_label.setText(f"Tổng số đơn hàng: {len(orders)}")
-                self.total_revenue_label.setText(f"Tổng doanh thu: {format(total_revenue, ',.0f')} VNĐ")
-                
-            except Exception as e:
-                QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu đơn hàng: {str(e)}")
-            finally:
-                conn.close()
+        return OrderFilter(
+            self.from_date.date().toPython(),
+            self.to_date.date().toPython(),
+            self.search_input.text(),
+            None if payment_method == "Tất cả" else payment_method
+        )
+    
+    def loadOrders(self):
+        # Tải lại từ đầu: trang đầu tiên + tổng số đơn/doanh thu của cả bộ lọc, chạy ở luồng nền
+        self.order_filter = self.currentFilter()
+        self.next_cursor = None
+        self.has_more = False
+        self.loading_page = False
+        self.loading_first_page = True
+        self.newest_order_date = None
+        self.order_model.clear()
+        self.loaded_label.setText("Đang tải...")
+        
+        refresh_scheduler().cancel("orders")
+        executor = query_executor()
+        executor.cancel(owner=self, key="next_page")
+        executor.cancel(owner=self, key="summary")
+        executor.submit(load_first_page, self.order_filter, self.page_size,
+                        owner=self, key="orders",
+                        on_result=self.onFirstPageLoaded,
+                        on_error=lambda e: self.onLoadFailed("Không thể tải dữ liệu đơn hàng", e))
+    
+    def onFirstPageLoaded(self, result):
+        (self.total_orders, self.total_revenue), orders, self.has_more = result
+        self.loading_first_page = False
+        self.newest_order_date = newest_order_date(orders)
+        self.updateSummaryLabels()
+        
+        self.appendOrders(orders)
+        self.fillViewport()
+    
+    def updateSummaryLabels(self):
+        self.total_orders_label.setText(f"Tổng số đơn hàng: {self.total_orders}")
+        self.total_revenue_label.setText(f"Tổng doanh thu: {format(self.total_revenue, ',.0f')} VNĐ")
+    
+    def newOrdersQuery(self):
+        # Chỉ hỏi các đơn mới hơn mốc của danh sách đang hiển thị
+        if self.order_filter is None or self.loading_first_page:
+            return None
+        return load_new_orders, self.order_filter, self.newest_order_date
+    
+    def onNewOrders(self, result):
+        orders, truncated = result
+        if truncated:
+            # Quá nhiều đơn mới: tải lại từ đầu rẻ hơn chèn từng dòng
+            self.loadOrders()
+            return
+        new_orders = [order for order in orders if not self.order_model.containsOrder(order[0])]
+        if not new_orders:
+            return
+        self.total_orders += len(new_orders)
+        self.total_revenue += sum(float(order[4] or 0) for order in new_orders)
+        self.newest_order_date = max(filter(None, [self.newest_order_date, newest_order_date(new_orders)]))
+        self.updateSummaryLabels()
+        
+        # Đơn cũ hơn dòng cuối đã tải thuộc các trang chưa cuộn tới, sẽ được tải theo trang
+        if self.has_more and self.next_cursor is not None:
+            new_orders = [order for order in new_orders if (order[3], order[0]) > self.next_cursor]
+        self.order_model.insertOrders(new_orders)
+        self.updateLoadedLabel()
+    
+    def onOrdersChanged(self, order_ids):
+        # Đơn mới ở quầy nào đó: chạy ngay truy vấn đơn mới theo mốc (đúng bộ lọc đang xem)
+        refresh_scheduler().request("orders")
+    
+    def onOrdersRemoved(self, order_ids):
+        unloaded = [order_id for order_id in order_ids if not self.order_model.containsOrder(order_id)]
+        removed = self.order_model.removeOrders(order_ids)
+        if unloaded and self.order_filter is not None and not self.loading_first_page:
+            # Đơn bị xóa có thể nằm ở trang chưa cuộn tới: tính lại tổng của cả bộ lọc
+            self.reloadSummary()
+        elif removed:
+            self.total_orders -= len(removed)
+            self.total_revenue -= sum(float(order[4] or 0) for order in removed)
+            self.updateSummaryLabels()
+        self.updateLoadedLabel()
+    
+    def reloadSummary(self):
+        query_executor().submit(load_order_summary, self.order_filter,
+                                owner=self, key="summary",
+                                on_result=self.onSummaryLoaded,
+                                on_error=lambda e: print(f"Lỗi tính tổng đơn hàng: {str(e)}"))
+    
+    def onSummaryLoaded(self, summary):
+        self.total_orders, self.total_revenue = summary
+        self.updateSummaryLabels()
+        self.updateLoadedLabel()
+    
+    def loadNextPage(self):
+        if not self.has_more or self.loading_page:
+            return
+        self.loading_page = True
+        query_executor().submit(load_next_page, self.order_filter, self.page_size, self.next_cursor,
+                                owner=self, key="next_page",
+                                on_result=self.onNextPageLoaded,
+                                on_error=lambda e: self.onLoadFailed("Không thể tải thêm đơn hàng", e))
+    
+    def onNextPageLoaded(self, result):
+        orders, self.has_more = result
+        self.loading_page = False
+        self.appendOrders(orders)
+        self.fillViewport()
+    
+    def onLoadFailed(self, message, error):
+        self.has_more = False
+        self.loading_page = False
+        self.loading_first_page = False
+        self.updateLoadedLabel()
+        QMessageBox.warning(self, "Lỗi", f"{message}: {str(error)}")
+    
+    def fillViewport(self):
+        # Nếu trang vừa tải chưa đủ lấp đầy bảng thì không có thanh cuộn để kích hoạt tải tiếp
+        if self.has_more and self.order_table.verticalScrollBar().maximum() == 0:
+            QTimer.singleShot(0, self.loadNextPage)
+    
+    def onTableScrolled(self, value):
+        scroll_bar = self.order_table.verticalScrollBar()
+        if value >= scroll_bar.maximum() - SCROLL_PREFETCH_ROWS * self.order_table.verticalHeader().defaultSectionSize():
+            self.loadNextPage()
+    
+    def changePageSize(self):
+        self.page_size = int(self.page_size_combo.currentText())
+        self.loadOrders()
+    
+    def appendOrders(self, orders):
+        if orders:
+            self.next_cursor = page_cursor(orders)
+            self.order_model.appendOrders(orders)
+        self.updateLoadedLabel()
+    
+    def updateLoadedLabel(self):
+        self.loaded_label.setText(f"Đang hiển thị {self.order_model.rowCount()}/{self.total_orders} đơn")
     
     def showOrderDetail(self, order_id):
         detail_dialog = OrderDetailDialog(order_id, self)
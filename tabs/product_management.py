@@ -1,29 +1,136 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, 
     QLineEdit, QPushButton, QHBoxLayout, QTableWidgetItem, QMessageBox,
-    QFileDialog, QDateEdit, QScrollArea, QGridLayout)
-from PySide6.QtGui import QFont, QPixmap, QImage
+    QFileDialog, QDateEdit, QScrollArea, QGridLayout, QProgressDialog)
+from PySide6.QtGui import QFont, QImage
 from PySide6.QtCore import Qt, QDate
+import bisect
 import os
-import shutil
-import pandas as pd
-from database_connection import connect_db
+from services.product_catalog import product_catalog, fetch_product, sort_key
+from services.product_export import export_products
+from services.query_executor import query_executor
+from services.refresh_scheduler import refresh_scheduler
+from services.change_log import PRODUCT, DELETE, record_change
+from ui.image_loader import image_loader
+from services.image_ingest import ingest_image, remove_if_unused, ImageIngestError
 from datetime import datetime
 
+def _ingest(source_image, image_folder):
+    # Thu nhỏ, mã hóa lại và sinh sẵn ảnh thu nhỏ ở luồng nền; ảnh trùng nội dung dùng chung một file
+    return ingest_image(source_image, image_folder) if source_image else None
+
+def _discard_image(conn, cursor, image_path):
+    # Giao dịch lỗi: bỏ thay đổi rồi xóa file vừa nhập nếu không sản phẩm nào dùng
+    conn.rollback()
+    if image_path:
+        remove_if_unused(cursor, image_path)
+
+def insert_product(conn, product_id, name, price, stock, source_image, import_date, image_folder):
+    # Chạy ở luồng nền; source_image là file ảnh người dùng chọn (hoặc None). Trả về dòng sản phẩm vừa thêm
+    image_path = _ingest(source_image, image_folder)
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.execute("""
+                INSERT INTO products (id, name, price, stock, image_path, import_date)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (product_id, name, price, stock, image_path, import_date))
+            record_change(cursor, PRODUCT, product_id)
+            conn.commit()
+        except Exception:
+            _discard_image(conn, cursor, image_path)
+            raise
+        return fetch_product(cursor, product_id)
+    finally:
+        cursor.close()
+
+def update_product(conn, product_id, name, price, stock, source_image, import_date, image_folder):
+    # Chạy ở luồng nền; source_image None thì giữ ảnh cũ. Trả về dòng sản phẩm sau khi sửa
+    image_path = _ingest(source_image, image_folder)
+    cursor = conn.cursor()
+    try:
+        old_image_path = None
+        try:
+            if image_path:
+                cursor.execute("SELECT image_path FROM products WHERE id = %s", (product_id,))
+                result = cursor.fetchone()
+                old_image_path = result[0] if result else None
+                cursor.execute("""
+                    UPDATE products 
+                    SET name = %s, price = %s, stock = %s, image_path = %s, import_date = %s
+                    WHERE id = %s
+                """, (name, price, stock, image_path, import_date, product_id))
+            else:
+                cursor.execute("""
+                    UPDATE products 
+                    SET name = %s, price = %s, stock = %s, import_date = %s
+                    WHERE id = %s
+                """, (name, price, stock, import_date, product_id))
+                
+            record_change(cursor, PRODUCT, product_id)
+            conn.commit()
+        except Exception:
+            _discard_image(conn, cursor, image_path)
+            raise
+        product = fetch_product(cursor, product_id)
+        
+        # Ảnh cũ chỉ bị xóa khi không còn sản phẩm nào dùng chung
+        if old_image_path and old_image_path != image_path:
+            remove_if_unused(cursor, old_image_path)
+        return product
+    finally:
+        cursor.close()
+
+def delete_product(conn, product_id):
+    # Chạy ở luồng nền
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT image_path FROM products WHERE id = %s", (product_id,))
+        result = cursor.fetchone()
+        
+        cursor.execute("DELETE FROM products WHERE id = %s", (product_id,))
+        record_change(cursor, PRODUCT, product_id, DELETE)
+        conn.commit()
+        
+        # File ảnh có thể dùng chung với sản phẩm khác (trùng nội dung)
+        if result and result[0]:
+            remove_if_unused(cursor, result[0])
+    finally:
+        cursor.close()
+
+def matches_keyword(product, keyword):
+    # Giống LIKE '%keyword%' trên mã và tên (không phân biệt hoa thường)
+    keyword = keyword.lower()
+    return keyword in product[0].lower() or keyword in product[1].lower()
+
 class ProductManagementTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.conn = None
-        self.cursor = None
         self.selected_image_path = None
         self.image_folder = "product_images"
         self.is_image_section_visible = False
+        self.search_keyword = ""
+        self.thumbnail_size = 75
+        self._row_ids = []
+        self._keys = []
+        self._rows = {}
         
         if not os.path.exists(self.image_folder):
             os.makedirs(self.image_folder)
             
         self.initUI()
-        self.connectDB()
-        self.loadProducts()
+        
+        # Bảng lấy dữ liệu từ danh mục dùng chung và chỉ sửa dòng thay đổi
+        catalog = product_catalog()
+        catalog.reset.connect(self.refreshTable)
+        catalog.productChanged.connect(self.onProductChanged)
+        catalog.productRemoved.connect(self.onProductRemoved)
+        catalog.loadFailed.connect(
+            lambda err: QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu: {str(err)}"))
+        if catalog.isLoaded():
+            self.loadProducts()
+        else:
+            catalog.ensureLoaded()
+        refresh_scheduler().watch("catalog", self)
 
     def initUI(self):
         # Create main scroll area
@@ -106,6 +213,8 @@ class ProductManagementTab(QWidget):
             ("Xóa form", "#607D8B")
         ]
         
+        # Các nút ghi CSDL bị khóa trong lúc giao dịch chạy ở luồng nền
+        self.action_buttons = []
         for text, color in buttons:
             btn = QPushButton(text)
             btn.setStyleSheet(f"""
@@ -124,10 +233,13 @@ class ProductManagementTab(QWidget):
             
             if text == "Thêm":
                 btn.clicked.connect(self.addProduct)
+                self.action_buttons.append(btn)
             elif text == "Sửa":
                 btn.clicked.connect(self.editProduct)
+                self.action_buttons.append(btn)
             elif text == "Xóa":
                 btn.clicked.connect(self.deleteProduct)
+                self.action_buttons.append(btn)
             else:
                 btn.clicked.connect(self.clearForm)
         
@@ -277,49 +389,88 @@ class ProductManagementTab(QWidget):
         self.product_table.itemClicked.connect(self.tableItemClicked)
 
     def loadProducts(self):
-        if not self.cursor:
-            return
-            
-        try:
-            self.cursor.execute("SELECT id, name, price, stock, image_path, import_date FROM products")
-            products = self.cursor.fetchall()
-            
-            self.product_table.setRowCount(len(products))
-            for i, product in enumerate(products):
-                for j, value in enumerate(product):
-                    if j == 4:  # Cột hình ảnh
-                        if value and os.path.exists(value):
-                            # Tạo QLabel để hiển thị hình ảnh
-                            image_label = QLabel()
-                            pixmap = QPixmap(value)
-                            scaled_pixmap = pixmap.scaled(
-                                75, 75,  # Kích thước thumbnail trong bảng
-                                Qt.AspectRatioMode.KeepAspectRatio,
-                                Qt.TransformationMode.SmoothTransformation
-                            )
-                            image_label.setPixmap(scaled_pixmap)
-                            image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                            self.product_table.setCellWidget(i, j, image_label)
-                        else:
-                            self.product_table.setItem(i, j, QTableWidgetItem("Không có ảnh"))
-                    elif j == 5 and value:  # Định dạng ngày nhập
-                        formatted_date = value.strftime("%d/%m/%Y")
-                        self.product_table.setItem(i, j, QTableWidgetItem(formatted_date))
-                    else:
-                        self.product_table.setItem(i, j, QTableWidgetItem(str(value) if value is not None else ""))
-                        
-            # Tự động điều chỉnh kích thước cột
-            self.product_table.resizeColumnsToContents()
-        except Exception as err:
-            QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu: {str(err)}")
+        # Hiển thị toàn bộ danh mục
+        self.search_keyword = ""
+        self.thumbnail_size = 75  # Kích thước thumbnail trong bảng
+        self.refreshTable()
+
+    def refreshTable(self):
+        products = product_catalog().products()
+        if self.search_keyword:
+            products = [p for p in products if matches_keyword(p, self.search_keyword)]
+        self.populateTable(products, self.thumbnail_size)
+
+    def populateTable(self, products, thumbnail_size):
+        # Bỏ các ảnh đang chờ nạp của bảng cũ
+        image_loader().cancelGroup(self.product_table)
+        self.product_table.setRowCount(len(products))
+        self._row_ids = [p[0] for p in products]
+        self._keys = [sort_key(p) for p in products]  # Khóa sắp xếp song song với các dòng
+        self._rows = {}                               # Mã sản phẩm -> dòng
+        self._reindex(0)
+        for i, product in enumerate(products):
+            self.fillRow(i, product, thumbnail_size)
+                    
+        # Tự động điều chỉnh kích thước cột
+        self.product_table.resizeColumnsToContents()
+
+    def fillRow(self, i, product, thumbnail_size):
+        # Dòng có thể đang hiển thị sản phẩm cũ: bỏ ảnh/chữ của ô hình ảnh trước
+        self.product_table.removeCellWidget(i, 4)
+        self.product_table.takeItem(i, 4)
+        for j, value in enumerate(product):
+            if j == 4:  # Cột hình ảnh
+                # Tạo QLabel để hiển thị hình ảnh, ảnh được nạp nền rồi gán vào sau
+                image_label = QLabel()
+                image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                if image_loader().loadInto(image_label, value, thumbnail_size, thumbnail_size,
+                                           group=self.product_table, missing_text="Không có ảnh"):
+                    self.product_table.setCellWidget(i, j, image_label)
+                else:
+                    self.product_table.setItem(i, j, QTableWidgetItem("Không có ảnh"))
+            elif j == 5 and value:  # Định dạng ngày nhập
+                formatted_date = value.strftime("%d/%m/%Y")
+                self.product_table.setItem(i, j, QTableWidgetItem(formatted_date))
+            else:
+                self.product_table.setItem(i, j, QTableWidgetItem(str(value) if value is not None else ""))
+
+    def _reindex(self, start):
+        # Đánh lại số dòng từ start trở đi sau khi chèn / xóa
+        for row in range(start, len(self._row_ids)):
+            self._rows[self._row_ids[row]] = row
+
+    def findRow(self, product_id):
+        return self._rows.get(product_id, -1)
 
-    # All other methods remain the same
-    def connectDB(self):
-        self.conn = connect_db()
-        if self.conn is None:
-            QMessageBox.critical(self, "Lỗi", "Không thể kết nối database!")
+    def removeTableRow(self, row):
+        self.product_table.removeRow(row)
+        del self._rows[self._row_ids[row]]
+        del self._row_ids[row]
+        del self._keys[row]
+        self._reindex(row)
+
+    def onProductChanged(self, product):
+        row = self.findRow(product[0])
+        if self.search_keyword and not matches_keyword(product, self.search_keyword):
+            if row >= 0:
+                self.removeTableRow(row)
             return
-        self.cursor = self.conn.cursor()
+        key = sort_key(product)
+        if row < 0 or self._keys[row] != key:
+            # Sản phẩm mới hoặc đổi tên: chèn vào đúng vị trí theo thứ tự của danh mục
+            if row >= 0:
+                self.removeTableRow(row)
+            row = bisect.bisect_left(self._keys, key)
+            self.product_table.insertRow(row)
+            self._row_ids.insert(row, product[0])
+            self._keys.insert(row, key)
+            self._reindex(row)
+        self.fillRow(row, product, self.thumbnail_size)
+
+    def onProductRemoved(self, product_id):
+        row = self.findRow(product_id)
+        if row >= 0:
+            self.removeTableRow(row)
 
     def selectImage(self):
         file_dialog = QFileDialog()
@@ -332,15 +483,9 @@ class ProductManagementTab(QWidget):
             self.displayImage(file_path)
 
     def displayImage(self, image_path):
-        if image_path and os.path.exists(image_path):
-            pixmap = QPixmap(image_path)
-            scaled_pixmap = pixmap.scaled(
-                300, 300,  # Fixed size
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.image_preview.setPixmap(scaled_pixmap)
-        else:
+        image_loader().cancelGroup(self.image_preview)
+        if not image_loader().loadInto(self.image_preview, image_path, 300, 300,  # Fixed size
+                                       group=self.image_preview, missing_text="Chưa có hình ảnh"):
             self.image_preview.setText("Chưa có hình ảnh")
 
     def toggleImageSection(self):
@@ -350,101 +495,53 @@ class ProductManagementTab(QWidget):
             "Ẩn phần hình ảnh" if self.is_image_section_visible else "Hiển thị phần hình ảnh"
         )
 
-    def saveImage(self, product_id):
-        if not self.selected_image_path:
-            return None
-            
-        _, ext = os.path.splitext(self.selected_image_path)
-        new_filename = f"{product_id}{ext}"
-        destination = os.path.join(self.image_folder, new_filename)
-        
-        try:
-            shutil.copy2(self.selected_image_path, destination)
-            return destination
-        except Exception as e:
-            QMessageBox.warning(self, "Lỗi", f"Không thể lưu hình ảnh: {str(e)}")
-            return None
-
     def searchProducts(self):
-        if not self.cursor:
-            return
-            
-        keyword = self.search_input.text().strip()
-        try:
-            self.cursor.execute("""
-                SELECT id, name, price, stock, image_path, import_date 
-                FROM products 
-                WHERE id LIKE %s OR name LIKE %s
-            """, (f"%{keyword}%", f"%{keyword}%"))
-            products = self.cursor.fetchall()
-            
-            self.product_table.setRowCount(len(products))
-            for i, product in enumerate(products):
-                for j, value in enumerate(product):
-                    if j == 4:  # Cột hình ảnh
-                        if value and os.path.exists(value):
-                            image_label = QLabel()
-                            pixmap = QPixmap(value)
-                            scaled_pixmap = pixmap.scaled(
-                                50, 50,
-                                Qt.AspectRatioMode.KeepAspectRatio,
-                                Qt.TransformationMode.SmoothTransformation
-                            )
-                            image_label.setPixmap(scaled_pixmap)
-                            image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                            self.product_table.setCellWidget(i, j, image_label)
-                        else:
-                            self.product_table.setItem(i, j, QTableWidgetItem("Không có ảnh"))
-                    elif j == 5 and value:  # Định dạng ngày nhập
-                        formatted_date = value.strftime("%d/%m/%Y")
-                        self.product_table.setItem(i, j, QTableWidgetItem(formatted_date))
-                    else:
-                        self.product_table.setItem(i, j, QTableWidgetItem(str(value) if value is not None else ""))
-            
-            self.product_table.resizeColumnsToContents()
-        except Exception as err:
-            QMessageBox.warning(self, "Lỗi", f"Lỗi tìm kiếm: {str(err)}")
+        # Lọc trên danh mục trong bộ nhớ, không truy vấn lại CSDL
+        self.search_keyword = self.search_input.text().strip()
+        self.thumbnail_size = 50
+        self.refreshTable()
 
     def exportToExcel(self):
-        try:
-            data = []
-            headers = []
-            for j in range(self.product_table.columnCount()):
-                headers.append(self.product_table.horizontalHeaderItem(j).text())
-            
-            for i in range(self.product_table.rowCount()):
-                row_data = []
-                for j in range(self.product_table.columnCount()):
-                    if j == 4:  # Cột hình ảnh
-                        cell_widget = self.product_table.cellWidget(i, j)
-                        if isinstance(cell_widget, QLabel) and cell_widget.pixmap():
-                            row_data.append("Có hình ảnh")
-                        else:
-                            row_data.append("Không có ảnh")
-                    else:
-                        item = self.product_table.item(i, j)
-                        row_data.append(item.text() if item else "")
-                data.append(row_data)
-            
-            df = pd.DataFrame(data, columns=headers)
-            
-            file_path, _ = QFileDialog.getSaveFileName(
-                self, "Lưu File Excel", "", "Excel Files (*.xlsx)"
-            )
-            
-            if file_path:
-                if not file_path.endswith('.xlsx'):
-                    file_path += '.xlsx'
-                
-                df.to_excel(file_path, index=False)
-                QMessageBox.information(self, "Thành công", "Xuất file Excel thành công!")
-        except Exception as e:
-            QMessageBox.warning(self, "Lỗi", f"Không thể xuất file Excel: {str(e)}")
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Lưu File Excel", "", "Excel Files (*.xlsx);;CSV Files (*.csv)"
+        )
+        if not file_path:
+            return
+        if not file_path.lower().endswith(('.xlsx', '.csv')):
+            file_path += '.csv' if selected_filter.startswith("CSV") else '.xlsx'
+        
+        # Đọc thẳng từ CSDL theo lô và ghi dần ra file ở luồng nền, không dựng lại dữ liệu từ bảng
+        progress = QProgressDialog("Đang xuất danh sách sản phẩm...", "Hủy", 0, 0, self)
+        progress.setWindowTitle("Xuất file")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        
+        def finish(done):
+            progress.close()
+            if done is not None:
+                QMessageBox.information(self, "Thành công", f"Đã xuất {done:,} sản phẩm ra file!")
+        
+        def fail(error):
+            progress.close()
+            QMessageBox.warning(self, "Lỗi", f"Không thể xuất file: {str(error)}")
+        
+        def update(done, total):
+            progress.setMaximum(total)
+            progress.setValue(done)
+        
+        task = query_executor().submit(
+            export_products, file_path, owner=self, key="export",
+            with_task=True, timeout=None,
+            on_result=finish, on_error=fail
+        )
+        task.progress.connect(update)
+        task.cancelled.connect(progress.close)
+        # Hộp thoại chỉ hiện nếu xuất lâu hơn minimumDuration
+        progress.canceled.connect(task.cancel)
 
     def addProduct(self):
-        if not self.cursor:
-            return
-            
         try:
             product_id = self.id_input.text().strip()
             name = self.name_input.text().strip()
@@ -471,24 +568,14 @@ class ProductManagementTab(QWidget):
                 
             import_date = self.import_date.date().toString("yyyy-MM-dd")
             
-            image_path = self.saveImage(product_id)
-            
-            self.cursor.execute("""
-                INSERT INTO products (id, name, price, stock, image_path, import_date)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            """, (product_id, name, price, stock, image_path, import_date))
-            self.conn.commit()
-            
-            QMessageBox.information(self, "Thành công", "Thêm sản phẩm thành công!")
-            self.loadProducts()
-            self.clearForm()
+            self.submitProductChange(insert_product, product_id, name, price, stock,
+                                     self.selected_image_path, import_date, self.image_folder,
+                                     success="Thêm sản phẩm thành công!",
+                                     failure="Không thể thêm sản phẩm")
         except Exception as err:
             QMessageBox.warning(self, "Lỗi", f"Không thể thêm sản phẩm: {str(err)}")
 
     def editProduct(self):
-        if not self.cursor:
-            return
-            
         try:
             product_id = self.id_input.text().strip()
             name = self.name_input.text().strip()
@@ -515,33 +602,14 @@ class ProductManagementTab(QWidget):
                 
             import_date = self.import_date.date().toString("yyyy-MM-dd")
             
-            if self.selected_image_path:
-                image_path = self.saveImage(product_id)
-                
-                self.cursor.execute("""
-                    UPDATE products 
-                    SET name = %s, price = %s, stock = %s, image_path = %s, import_date = %s
-                    WHERE id = %s
-                """, (name, price, stock, image_path, import_date, product_id))
-            else:
-                self.cursor.execute("""
-                    UPDATE products 
-                    SET name = %s, price = %s, stock = %s, import_date = %s
-                    WHERE id = %s
-                """, (name, price, stock, import_date, product_id))
-                
-            self.conn.commit()
-            
-            QMessageBox.information(self, "Thành công", "Cập nhật sản phẩm thành công!")
-            self.loadProducts()
-            self.clearForm()
+            self.submitProductChange(update_product, product_id, name, price, stock,
+                                     self.selected_image_path, import_date, self.image_folder,
+                                     success="Cập nhật sản phẩm thành công!",
+                                     failure="Không thể cập nhật sản phẩm")
         except Exception as err:
             QMessageBox.warning(self, "Lỗi", f"Không thể cập nhật sản phẩm: {str(err)}")
 
     def deleteProduct(self):
-        if not self.cursor:
-            return
-            
         try:
             product_id = self.id_input.text().strip()
             
@@ -554,24 +622,49 @@ class ProductManagementTab(QWidget):
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
                 
             if reply == QMessageBox.StandardButton.Yes:
-                self.cursor.execute("SELECT image_path FROM products WHERE id = %s", (product_id,))
-                result = self.cursor.fetchone()
-                
-                if result and result[0] and os.path.exists(result[0]):
-                    try:
-                        os.remove(result[0])
-                    except:
-                        pass
-                
-                self.cursor.execute("DELETE FROM products WHERE id = %s", (product_id,))
-                self.conn.commit()
-                
-                QMessageBox.information(self, "Thành công", "Xóa sản phẩm thành công!")
-                self.loadProducts()
-                self.clearForm()
+                self.setActionsEnabled(False)
+                query_executor().submit(
+                    delete_product, product_id, owner=self, timeout=None,
+                    on_result=lambda _: self.onProductDeleted(product_id),
+                    on_error=lambda e: self.onProductActionFailed("Không thể xóa sản phẩm", e)
+                )
         except Exception as err:
             QMessageBox.warning(self, "Lỗi", f"Không thể xóa sản phẩm: {str(err)}")
 
+    def setActionsEnabled(self, enabled):
+        for btn in self.action_buttons:
+            btn.setEnabled(enabled)
+
+    def submitProductChange(self, fn, *args, success, failure):
+        # Giao dịch chạy ở luồng nền; không đặt timeout vì giao dịch có thể vẫn commit sau khi hết giờ chờ
+        self.setActionsEnabled(False)
+        query_executor().submit(
+            fn, *args, owner=self, timeout=None,
+            on_result=lambda product: self.onProductSaved(product, success),
+            on_error=lambda e: self.onProductActionFailed(failure, e)
+        )
+
+    def onProductSaved(self, product, message):
+        self.setActionsEnabled(True)
+        # Cập nhật danh mục dùng chung, các tab tự cập nhật dòng tương ứng
+        if product:
+            product_catalog().upsert(product)
+        QMessageBox.information(self, "Thành công", message)
+        self.clearForm()
+
+    def onProductDeleted(self, product_id):
+        self.setActionsEnabled(True)
+        product_catalog().remove(product_id)
+        QMessageBox.information(self, "Thành công", "Xóa sản phẩm thành công!")
+        self.clearForm()
+
+    def onProductActionFailed(self, message, error):
+        self.setActionsEnabled(True)
+        if isinstance(error, ImageIngestError):
+            QMessageBox.warning(self, "Lỗi", str(error))
+            return
+        QMessageBox.warning(self, "Lỗi", f"{message}: {str(error)}")
+
     def tableItemClicked(self):
         current_row = self.product_table.currentRow()
         if current_row < 0:
@@ -584,15 +677,14 @@ class ProductManagementTab(QWidget):
         
         # Get image path and display image
         image_widget = self.product_table.cellWidget(current_row, 4)
-        if isinstance(image_widget, QLabel) and image_widget.pixmap():
-            self.cursor.execute("SELECT image_path FROM products WHERE id = %s", 
-                              (self.product_table.item(current_row, 0).text(),))
-            result = self.cursor.fetchone()
-            if result and result[0]:
-                self.displayImage(result[0])
+        if isinstance(image_widget, QLabel):
+            product = product_catalog().get(self.product_table.item(current_row, 0).text())
+            if product and product[4]:
+                self.displayImage(product[4])
                 if not self.is_image_section_visible:
                     self.toggleImageSection()
         else:
+            image_loader().cancelGroup(self.image_preview)
             self.image_preview.setText("Chưa có hình ảnh")
         
         self.selected_image_path = None
@@ -612,6 +704,7 @@ class ProductManagementTab(QWidget):
         self.name_input.clear()
         self.price_input.clear()
         self.stock_input.clear()
+        image_loader().cancelGroup(self.image_preview)
         self.image_preview.setText("Chưa có hình ảnh")
         self.selected_image_path = None
         self.import_date.setDate(QDate.currentDate())
\ No newline at end of file
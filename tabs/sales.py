@@ -1,128 +1,33 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton, 
-                             QHBoxLayout, QScrollArea, QGridLayout, QFrame, QMessageBox,
-                             QSizePolicy, QSpacerItem)
-from PySide6.QtGui import QFont, QPixmap
-from PySide6.QtCore import Qt, Signal
-import os
-from database_connection import connect_db
-
-class ProductCard(QFrame):
-    add_to_cart_signal = Signal(str, str, float)
-    
-    def __init__(self, product_id, name, price, image_path):
-        super().__init__()
-        self.product_id = product_id
-        self.product_name = name
-        self.product_price = price
-        self.image_path = image_path  # Lưu lại image_path
-        
-        self.setFixedSize(200, 280)  # Tăng kích thước thẻ sản phẩm
-        self.setFrameShape(QFrame.Shape.Box)
-        self.setFrameShadow(QFrame.Shadow.Raised)
-        self.setStyleSheet("""
-            ProductCard {
-                border: 1px solid #ddd;
-                border-radius: 10px;
-                background-color: white;
-            }
-            ProductCard:hover {
-                border: 1px solid #2196F3;
-                box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-                transform: translateY(-2px);
-                transition: all 0.3s ease;
-            }
-        """)
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(10, 10, 10, 10)
-        layout.setSpacing(8)
-        
-        # Hình ảnh
-        self.image_label = QLabel()
-        self.image_label.setFixedSize(180, 140)  # Kích thước hình ảnh lớn hơn
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.image_label.setStyleSheet("border: 1px solid #eee; border-radius: 5px; background-color: #f9f9f9;")
-        
-        if image_path and os.path.exists(image_path):
-            pixmap = QPixmap(image_path)
-            scaled_pixmap = pixmap.scaled(
-                180, 140,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            self.image_label.setPixmap(scaled_pixmap)
-        else:
-            no_image_label = QLabel("Không có\nhình ảnh")
-            no_image_label.setFont(QFont("Arial", 10))
-            no_image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            no_image_label.setStyleSheet("color: #999;")
-            no_image_layout = QVBoxLayout(self.image_label)
-            no_image_layout.addWidget(no_image_label)
-        
-        layout.addWidget(self.image_label)
-        
-        # Tên sản phẩm
-        name_label = QLabel(name)
-        name_label.setFont(QFont("Arial", 10, QFont.Weight.Bold))
-        name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        name_label.setWordWrap(True)
-        name_label.setFixedHeight(42)  # Chiều cao cố định cho tên
-        name_label.setStyleSheet("color: #333;")
-        layout.addWidget(name_label)
-        
-        # Đường kẻ ngăn cách
-        separator = QFrame()
-        separator.setFrameShape(QFrame.Shape.HLine)
-        separator.setFrameShadow(QFrame.Shadow.Sunken)
-        separator.setStyleSheet("background-color: #eee;")
-        layout.addWidget(separator)
-        
-        # Giá
-        price_label = QLabel(f"{price:,.0f} VNĐ")
-        price_label.setFont(QFont("Arial", 11, QFont.Weight.Bold))
-        price_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        price_label.setStyleSheet("color: #e53935;")  # Màu đỏ cho giá
-        layout.addWidget(price_label)
-        
-        # Nút thêm vào giỏ hàng
-        add_button = QPushButton("+ Thêm vào giỏ hàng")
-        add_button.setCursor(Qt.CursorShape.PointingHandCursor)
-        add_button.setStyleSheet("""
-            QPushButton {
-                padding: 8px;
-                background-color: #4CAF50;
-                color: white;
-                border-radius: 5px;
-                font-weight: bold;
-                font-size: 9pt;
-                border: none;
-            }
-            QPushButton:hover {
-                background-color: #388E3C;
-            }
-            QPushButton:pressed {
-                background-color: #2E7D32;
-            }
-        """)
-        add_button.clicked.connect(self.add_to_cart)
-        layout.addWidget(add_button)
-    
-    def add_to_cart(self):
-        self.add_to_cart_signal.emit(self.product_id, self.product_name, self.product_price)
+                             QHBoxLayout, QFrame, QMessageBox)
+from PySide6.QtGui import QFont
+from PySide6.QtCore import Qt, QTimer
+from services.product_catalog import product_catalog
+from services.refresh_scheduler import refresh_scheduler
+from ui.product_grid import ProductGridView
 
+# Tìm khi gõ: chờ người dùng ngừng gõ một chút rồi mới tìm
+SEARCH_DEBOUNCE_MS = 150
 
 class SalesTab(QWidget):
     def __init__(self, cart_tab=None):
         super().__init__()
-        self.conn = None
-        self.cursor = None
         self.cart_tab = cart_tab
-        self.products = []
-        self.filtered_products = []
         
         self.initUI()
-        self.connectDB()
-        self.loadProducts()
+        
+        # Danh mục dùng chung: lưới chỉ cập nhật dòng thay đổi, không truy vấn lại
+        catalog = product_catalog()
+        catalog.reset.connect(self.loadProducts)
+        catalog.productChanged.connect(self.onProductChanged)
+        catalog.productRemoved.connect(self.onProductRemoved)
+        catalog.loadFailed.connect(self.onCatalogLoadFailed)
+        if catalog.isLoaded():
+            self.loadProducts()
+        else:
+            catalog.ensureLoaded()
+        # Tồn kho thay đổi ở quầy khác được kéo về định kỳ khi tab đang mở
+        refresh_scheduler().watch("catalog", self)
     
     # Thêm phương thức mới này
     def setCartTab(self, cart_tab):
@@ -197,6 +102,13 @@ class SalesTab(QWidget):
             }
         """)
         search_button.clicked.connect(self.searchProducts)
+        
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.runSearch)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.searchProducts)
     
         # Nút "Tất cả sản phẩm"
         reset_button = QPushButton("Tất cả sản phẩm")
@@ -228,13 +140,10 @@ class SalesTab(QWidget):
     
         main_layout.addWidget(search_container)
     
-        # Tạo scroll area
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        self.scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.scroll_area.setStyleSheet("""
-            QScrollArea {
+        # Lưới sản phẩm ảo hóa: thẻ được vẽ theo model, chỉ phần đang hiển thị mới được vẽ
+        self.product_grid = ProductGridView()
+        self.product_grid.setStyleSheet("""
+            QListView {
                 border: none;
                 background-color: transparent;
             }
@@ -257,33 +166,22 @@ class SalesTab(QWidget):
                 height: 0px;
             }
         """)
-    
-         # Container cho sản phẩm - cố định width cho chính xác 5 sản phẩm
-        self.products_container = QWidget()
-        # Thiết lập kích thước tối thiểu để đảm bảo có thể hiển thị 5 sản phẩm trên một hàng
-        min_width = 5 * 200 + 4 * 20  # 5 sản phẩm (200px) + 4 khoảng cách (20px)
-        self.products_container.setMinimumWidth(min_width)
-    
-        # Container wrapper để căn giữa
-        self.wrapper_container = QWidget()
-        wrapper_layout = QHBoxLayout(self.wrapper_container)
-        wrapper_layout.setContentsMargins(0, 0, 0, 0)
-        wrapper_layout.setSpacing(0)
-        # Thêm stretch bên trái để đẩy từ bên trái
-        wrapper_layout.addStretch(1)
-        wrapper_layout.addWidget(self.products_container)
-        # Thêm stretch bên phải để đẩy từ bên phải
-        wrapper_layout.addStretch(1)
-    
-        # Layout grid cho sản phẩm
-        self.products_layout = QGridLayout(self.products_container)
-        self.products_layout.setSpacing(20)  # Tăng khoảng cách giữa sản phẩm
-        self.products_layout.setContentsMargins(0, 0, 0, 20)  # Thêm padding ở dưới
-        # Thay đổi căn lề từ AlignLeft sang AlignHCenter
-        self.products_layout.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
-    
-        self.scroll_area.setWidget(self.wrapper_container)
-        main_layout.addWidget(self.scroll_area, 1)
+        self.product_grid.addToCartRequested.connect(self.onAddToCartRequested)
+        
+        # Thông báo khi không có sản phẩm
+        self.no_products_label = QLabel("Không có sản phẩm nào")
+        self.no_products_label.setStyleSheet("""
+            font-size: 14pt;
+            color: #757575;
+            background-color: #f5f5f5;
+            border-radius: 10px;
+            padding: 20px;
+        """)
+        self.no_products_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.no_products_label.setVisible(False)
+        
+        main_layout.addWidget(self.no_products_label)
+        main_layout.addWidget(self.product_grid, 1)
     
         # Thêm thông tin dưới chân
         footer = QLabel("Heloo Anh Chị Em - Mời ANh Chị Em Lựa Hàng")
@@ -291,82 +189,52 @@ class SalesTab(QWidget):
         footer.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(footer)
     
-    def connectDB(self):
-        self.conn = connect_db()
-        if self.conn is None:
-            QMessageBox.critical(self, "Lỗi", "Không thể kết nối database!")
-            return
-        self.cursor = self.conn.cursor()
-    
     def loadProducts(self):
-        if not self.cursor:
-            return
-            
-        try:
-            self.cursor.execute("SELECT id, name, price, stock, image_path FROM products ORDER BY name")
-            self.products = self.cursor.fetchall()
-            self.filtered_products = self.products.copy()
-            self.displayProducts()
-        except Exception as err:
-            QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu sản phẩm: {str(err)}")
+        self.product_grid.setProducts(product_catalog().products())
+        if self.product_grid.isSearching():
+            self.runSearch()
+        self.updateEmptyState()
     
-    def displayProducts(self):
-        # Xóa sản phẩm hiện tại
-        for i in reversed(range(self.products_layout.count())):
-            item = self.products_layout.itemAt(i)
-            if item.widget():
-                item.widget().setParent(None)
-            elif item.spacerItem():
-                self.products_layout.removeItem(item)
-        
-        # Cố định 5 sản phẩm mỗi hàng
-        products_per_row = 5
-        
-        # Hiển thị sản phẩm trong grid
-        for i, product in enumerate(self.filtered_products):
-            product_id, name, price, stock, image_path = product
-            
-            row = i // products_per_row
-            col = i % products_per_row
-            
-            product_card = ProductCard(product_id, name, price, image_path)
-            product_card.add_to_cart_signal.connect(self.addToCart)
-            
-            self.products_layout.addWidget(product_card, row, col)
-        
-        # Thêm thông báo nếu không có sản phẩm
-        if not self.filtered_products:
-            no_products_label = QLabel("Không có sản phẩm nào")
-            no_products_label.setStyleSheet("""
-                font-size: 14pt;
-                color: #757575;
-                background-color: #f5f5f5;
-                border-radius: 10px;
-                padding: 20px;
-            """)
-            no_products_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.products_layout.addWidget(no_products_label, 0, 0, 1, 5)
-        
-        # Thêm spacer ở cuối để đẩy tất cả lên trên
-        self.products_layout.addItem(QSpacerItem(20, 20, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding), 
-                               (len(self.filtered_products) - 1) // products_per_row + 1, 0)
+    def onProductChanged(self, product):
+        # Sản phẩm mới chưa có trong kết quả tìm kiếm đang hiển thị: tìm lại
+        if not self.product_grid.upsertProduct(product):
+            self.search_timer.start()
+        self.updateEmptyState()
     
-    def searchProducts(self):
-        search_term = self.search_input.text().strip().lower()
-        
+    def onProductRemoved(self, product_id):
+        self.product_grid.removeProduct(product_id)
+        self.updateEmptyState()
+    
+    def onCatalogLoadFailed(self, err):
+        QMessageBox.warning(self, "Lỗi", f"Không thể tải dữ liệu sản phẩm: {str(err)}")
+    
+    def updateEmptyState(self):
+        self.no_products_label.setText("Không tìm thấy sản phẩm nào phù hợp!"
+                                       if self.product_grid.isSearching() else "Không có sản phẩm nào")
+        self.no_products_label.setVisible(self.product_grid.visibleCount() == 0)
+    
+    def runSearch(self):
+        # Tra chỉ mục của danh mục (không phân biệt dấu), kết quả đã xếp hạng theo độ phù hợp
+        self.search_timer.stop()
+        search_term = self.search_input.text().strip()
         if not search_term:
+            self.product_grid.clearSearch()
+        else:
+            catalog = product_catalog()
+            results = [catalog.get(product_id) for product_id, _ in catalog.search(search_term)]
+            self.product_grid.setSearchResults([p for p in results if p is not None])
+        self.updateEmptyState()
+    
+    def searchProducts(self):
+        # Nhấn nút / Enter: tìm ngay, không chờ hết thời gian debounce
+        if not self.search_input.text().strip():
             self.resetSearch()
             return
         
-        self.filtered_products = [
-            product for product in self.products 
-            if search_term in product[1].lower()  # product[1] là tên sản phẩm
-        ]
-        
-        self.displayProducts()
+        self.runSearch()
         
         # Hiển thị thông báo nếu không tìm thấy sản phẩm
-        if not self.filtered_products:
+        if self.product_grid.visibleCount() == 0:
             no_result_msg = QMessageBox()
             no_result_msg.setIcon(QMessageBox.Icon.Information)
             no_result_msg.setWindowTitle("Thông báo")
@@ -392,17 +260,19 @@ class SalesTab(QWidget):
     
     def resetSearch(self):
         self.search_input.clear()
-        self.filtered_products = self.products.copy()
-        self.displayProducts()
+        self.search_timer.stop()
+        self.product_grid.clearSearch()
+        self.updateEmptyState()
+    
+    def onAddToCartRequested(self, product):
+        product_id, name, price, stock, image_path = product[:5]
+        self.addToCart(str(product_id), name, float(price))
     
     # Trong phương thức addToCart, cần truyền cả image_path
     def addToCart(self, product_id, name, price):
-        # Tìm sản phẩm trong danh sách để lấy image_path
-        image_path = None
-        for product in self.products:
-            if str(product[0]) == product_id:
-                image_path = product[4]  # Giả sử vị trí thứ 5 là image_path
-                break
+        # Lấy image_path từ danh mục dùng chung
+        product = product_catalog().get(product_id)
+        image_path = product[4] if product else None
                 
         if self.cart_tab:
             self.cart_tab.addToCart(product_id, name, price, 1, image_path)
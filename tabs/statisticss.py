@@ -1,15 +1,42 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, 
     QTableWidgetItem, QHBoxLayout, QFrame, QGridLayout, QScrollArea, QPushButton,
-    QFileDialog, QMessageBox, QSizePolicy)
+    QFileDialog, QMessageBox, QSizePolicy, QProgressDialog, QComboBox)
 from PySide6.QtGui import QFont, QIcon
-from PySide6.QtCore import Qt, QSize
-from database_connection import connect_db
+from PySide6.QtCore import Qt, QSize, QTimer
+from services.query_executor import query_executor
+from services.product_catalog import product_catalog
+from services.report_jobs import report_jobs
+from services.sales_analytics import sales_analytics, PERIOD_LABELS, SERIES_LENGTH
+from ui.chart_layer import ChartLayer, update_pie, update_bars, fit_ylim
+from services.statistics_report import build_statistics_report, partial_path
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import pandas as pd
 from datetime import datetime
-from decimal import Decimal
+
+WEEKDAY_LABELS = ["T2", "T3", "T4", "T5", "T6", "T7", "CN"]
+
+# Gộp các thay đổi liên tiếp của danh mục (ví dụ thanh toán nhiều sản phẩm) thành một lần vẽ lại
+REFRESH_DELAY_MS = 500
+
+def fetch_customer_count(conn):
+    # Tổng số khách hàng từ bảng users
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'user'")
+    return int(cursor.fetchone()[0] or 0)
+
+def product_statistics(products):
+    # Số liệu sản phẩm tính trên danh mục trong bộ nhớ, không truy vấn bảng products
+    total_stock = sum(p[3] or 0 for p in products)
+    return {
+        'total_products': len(products),
+        'total_inventory': int(total_stock),
+    }
+
+def period_label(start, period_type):
+    if period_type == "month":
+        return start.strftime("%m/%Y")
+    return start.strftime("%d/%m")
 
 class StatisticsCard(QFrame):
     def __init__(self, title, value, unit=""):
@@ -45,7 +72,20 @@ class StatisticsTab(QWidget):
         super().__init__()
         self.top_products = []
         self.summary_data = {}
+        self.customer_count = None
+        self.analytics = None
+        self.period_type = "day"
         self.initUI()
+        
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DELAY_MS)
+        self.refresh_timer.timeout.connect(self.updateStatistics)
+        catalog = product_catalog()
+        catalog.reset.connect(self.refresh_timer.start)
+        catalog.productChanged.connect(self.refresh_timer.start)
+        catalog.productRemoved.connect(self.refresh_timer.start)
+        
         self.loadStatistics()
     
     def initUI(self):
@@ -74,6 +114,14 @@ class StatisticsTab(QWidget):
         title.setStyleSheet("color: #333;")
         header_layout.addWidget(title)
         
+        # Chọn kỳ thống kê doanh thu
+        self.period_combo = QComboBox()
+        for period_type, label in PERIOD_LABELS.items():
+            self.period_combo.addItem(f"Theo {label.lower()}", period_type)
+        self.period_combo.setMinimumWidth(120)
+        self.period_combo.currentIndexChanged.connect(self.onPeriodChanged)
+        header_layout.addWidget(self.period_combo)
+        
         # Export button
         self.export_btn = QPushButton("Xuất Excel")
         self.export_btn.setStyleSheet("""
@@ -139,14 +187,82 @@ class StatisticsTab(QWidget):
         self.figure1 = Figure(figsize=(12, 8), dpi=100)  # Increased figure size
         self.ax1 = self.figure1.add_subplot(121)
         self.ax2 = self.figure1.add_subplot(122)
+        self.ax2_units = self.ax2.twinx()  # Trục phải: số sản phẩm bán ra
         
         self.canvas1 = FigureCanvas(self.figure1)
         self.canvas1.setMinimumHeight(400)  # Set minimum height for charts
         self.canvas1.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         charts_layout.addWidget(self.canvas1)
+        self.chart_layer = ChartLayer(self.canvas1)
+        self.pie_artists = None
+        self.revenue_bars = None
+        self.units_line = None
+        self.series_labels = None
         
         self.container_layout.addWidget(charts_frame)
         
+        # Phân tích giỏ hàng: giờ bán, kích thước giỏ, cặp sản phẩm mua cùng
+        basket_frame = QFrame()
+        basket_frame.setFrameShape(QFrame.Shape.StyledPanel)
+        basket_frame.setStyleSheet("""
+            QFrame {
+                background-color: white;
+                border-radius: 10px;
+                border: 1px solid #E0E0E0;
+            }
+            QTableWidget {
+                border: none;
+                gridline-color: #E0E0E0;
+            }
+            QHeaderView::section {
+                background-color: #4CAF50;
+                color: white;
+                padding: 6px;
+                font-weight: bold;
+                border: none;
+            }
+        """)
+        basket_layout = QVBoxLayout(basket_frame)
+        basket_layout.setContentsMargins(15, 15, 15, 15)
+        
+        basket_title = QLabel("Phân Tích Giỏ Hàng")
+        basket_title.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+        basket_layout.addWidget(basket_title)
+        
+        self.basket_summary = QLabel("")
+        self.basket_summary.setStyleSheet("color: #666;")
+        basket_layout.addWidget(self.basket_summary)
+        
+        self.figure2 = Figure(figsize=(12, 5), dpi=100)
+        self.ax3 = self.figure2.add_subplot(121)
+        self.ax4 = self.figure2.add_subplot(122)
+        self.heatmap_image = None
+        self.heatmap_colorbar = None
+        self.basket_bars = None
+        
+        self.canvas2 = FigureCanvas(self.figure2)
+        self.canvas2.setMinimumHeight(320)
+        self.canvas2.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        basket_layout.addWidget(self.canvas2)
+        self.basket_layer = ChartLayer(self.canvas2)
+        
+        pairs_label = QLabel("Sản Phẩm Thường Được Mua Cùng")
+        pairs_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        basket_layout.addWidget(pairs_label)
+        
+        self.pairs_table = QTableWidget()
+        self.pairs_table.setColumnCount(3)
+        self.pairs_table.setHorizontalHeaderLabels(["Sản Phẩm", "Mua Cùng Với", "Số Đơn"])
+        self.pairs_table.setMinimumHeight(200)
+        self.pairs_table.setAlternatingRowColors(True)
+        self.pairs_table.setStyleSheet("alternate-background-color: #f5f5f5;")
+        self.pairs_table.horizontalHeader().setStretchLastSection(True)
+        self.pairs_table.setColumnWidth(0, 250)
+        self.pairs_table.setColumnWidth(1, 250)
+        basket_layout.addWidget(self.pairs_table)
+        
+        self.container_layout.addWidget(basket_frame)
+        
         # Detailed Statistics Table in a frame
         table_frame = QFrame()
         table_frame.setFrameShape(QFrame.Shape.StyledPanel)
@@ -171,14 +287,14 @@ class StatisticsTab(QWidget):
         table_layout = QVBoxLayout(table_frame)
         table_layout.setContentsMargins(15, 15, 15, 15)
         
-        table_label = QLabel("Chi Tiết Top 5 Sản Phẩm")
+        table_label = QLabel("Top 5 Sản Phẩm Bán Chạy")
         table_label.setFont(QFont("Arial", 14, QFont.Weight.Bold))
         table_layout.addWidget(table_label)
         
         self.stats_table = QTableWidget()
         self.stats_table.setColumnCount(4)
         self.stats_table.setHorizontalHeaderLabels([
-            "Danh Mục", "Số Lượng", "Doanh Thu", "Tỷ Lệ (%)"
+            "Sản Phẩm", "Đã Bán", "Doanh Thu", "Tỷ Lệ (%)"
         ])
         self.stats_table.setMinimumHeight(200)  # Ensure table has minimum height
         self.stats_table.setAlternatingRowColors(True)
@@ -198,118 +314,112 @@ class StatisticsTab(QWidget):
         main_layout.addWidget(self.scroll_area)
     
     def loadStatistics(self):
-        conn = connect_db()
-        if not conn:
+        # Số liệu sản phẩm lấy từ danh mục dùng chung; chỉ số khách hàng cần truy vấn nền
+        product_catalog().ensureLoaded()
+        query_executor().submit(
+            fetch_customer_count, owner=self, key="statistics",
+            on_result=self.onCustomerCountLoaded,
+            on_error=lambda e: print(f"Lỗi khi tải thống kê: {str(e)}")
+        )
+        self.loadAnalytics()
+    
+    def loadAnalytics(self):
+        # Doanh thu theo kỳ và top sản phẩm: dùng cache nếu còn hạn, không thì truy vấn nền
+        cached = sales_analytics.cached(self.period_type)
+        if cached is not None:
+            self.onAnalyticsLoaded(cached)
             return
+        query_executor().submit(
+            sales_analytics.load, self.period_type, owner=self, key="statistics_analytics",
+            on_result=self.onAnalyticsLoaded,
+            on_error=lambda e: print(f"Lỗi khi tải doanh thu: {str(e)}")
+        )
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Đơn hàng mới làm mất hiệu lực cache; mở lại tab là thấy số liệu mới
+        if self.analytics is not None:
+            self.loadAnalytics()
+    
+    def onPeriodChanged(self, index):
+        self.period_type = self.period_combo.itemData(index)
+        self.loadAnalytics()
+    
+    def onCustomerCountLoaded(self, customer_count):
+        self.customer_count = customer_count
+        self.updateStatistics()
+    
+    def onAnalyticsLoaded(self, analytics):
+        if analytics['period_type'] != self.period_type:
+            return  # Kết quả của kỳ đã bị đổi sang kỳ khác
+        self.analytics = analytics
+        self.showAnalytics(analytics)
+    
+    def updateStatistics(self):
+        catalog = product_catalog()
+        if not catalog.isLoaded() or self.customer_count is None:
+            return
+        stats = product_statistics(catalog.products())
+        stats['total_customers'] = self.customer_count
+        self.showStatistics(stats)
+    
+    def showStatistics(self, stats):
+        product_count = stats['total_products']
+        total_stock = stats['total_inventory']
+        customer_count = stats['total_customers']
+        
+        # Cập nhật các card
+        self.cards['total_products'].findChild(QLabel, "valueLabel").setText(f"{product_count:,} sản phẩm")
+        self.cards['total_inventory'].findChild(QLabel, "valueLabel").setText(f"{total_stock:,} sản phẩm")
+        self.cards['total_customers'].findChild(QLabel, "valueLabel").setText(f"{customer_count:,} khách hàng")
         
-        cursor = conn.cursor()
+        # Lưu dữ liệu tổng quan để xuất Excel
+        self.summary_data.update({
+            'total_products': product_count,
+            'total_inventory': total_stock,
+            'total_customers': customer_count,
+        })
+    
+    def showAnalytics(self, analytics):
         try:
-            # Tổng số sản phẩm
-            cursor.execute("SELECT COUNT(*), SUM(stock) FROM products")
-            product_count, total_stock = cursor.fetchone()
-            product_count = int(product_count or 0)
-            total_stock = int(total_stock or 0)
-            
-            # Cập nhật các card
-            self.cards['total_products'].findChild(QLabel, "valueLabel").setText(f"{product_count:,} sản phẩm")
-            self.cards['total_inventory'].findChild(QLabel, "valueLabel").setText(f"{total_stock:,} sản phẩm")
-            
-            # Tổng số khách hàng từ bảng users
-            cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'user'")
-            customer_count = int(cursor.fetchone()[0] or 0)
-            self.cards['total_customers'].findChild(QLabel, "valueLabel").setText(f"{customer_count:,} khách hàng")
-            
-            # Tổng doanh thu (giả định từ giá * số lượng)
-            cursor.execute("SELECT SUM(price * stock) FROM products")
-            total_revenue = cursor.fetchone()[0] or 0
-            total_revenue = float(total_revenue) if isinstance(total_revenue, Decimal) else total_revenue
+            total_revenue = analytics['total_revenue']
             self.cards['total_revenue'].findChild(QLabel, "valueLabel").setText(f"{int(total_revenue):,} VNĐ")
-            
-            # Lưu dữ liệu tổng quan để xuất Excel
-            self.summary_data = {
-                'total_products': product_count,
-                'total_inventory': total_stock,
-                'total_customers': customer_count,
-                'total_revenue': total_revenue
-            }
+            self.summary_data.update({
+                'total_revenue': total_revenue,
+                'total_orders': analytics['total_orders'],
+                'total_units': analytics['total_units'],
+            })
             
             # Data for charts
-            cursor.execute("""
-                SELECT name, stock, price * stock as revenue, price 
-                FROM products 
-                ORDER BY revenue DESC 
-                LIMIT 5
-            """)
-            self.top_products = cursor.fetchall()
-            
-            # Update pie chart
-            names = [p[0] for p in self.top_products]
-            revenues = [float(p[2]) if isinstance(p[2], Decimal) else p[2] for p in self.top_products]
-            self.ax1.clear()
-            wedges, texts, autotexts = self.ax1.pie(
-                revenues, 
-                labels=names,
-                autopct='%1.1f%%',
-                textprops={'fontsize': 10},
-                wedgeprops={'linewidth': 1, 'edgecolor': 'white'}
-            )
-            # Make pie chart labels more readable
-            for text in texts:
-                text.set_fontsize(9)
-            for autotext in autotexts:
-                autotext.set_fontsize(9)
-                autotext.set_weight('bold')
-                
-            self.ax1.set_title('Top 5 Sản Phẩm theo Doanh Thu', fontsize=12, pad=15)
-            
-            # Update bar chart
-            stocks = [p[1] for p in self.top_products]
-            self.ax2.clear()
-            bars = self.ax2.bar(
-                names, 
-                stocks,
-                color='#4CAF50',
-                edgecolor='white',
-                linewidth=1
-            )
-            
-            # Add data labels on top of bars
-            for bar in bars:
-                height = bar.get_height()
-                self.ax2.text(
-                    bar.get_x() + bar.get_width()/2., 
-                    height + 0.1,
-                    f'{int(height):,}',
-                    ha='center', 
-                    va='bottom',
-                    fontsize=9
-                )
-                
-            self.ax2.set_title('Số Lượng Tồn Kho của Top 5 Sản Phẩm', fontsize=12, pad=15)
-            self.ax2.tick_params(axis='x', rotation=45, labelsize=9)
-            self.ax2.tick_params(axis='y', labelsize=9)
-            self.ax2.spines['top'].set_visible(False)
-            self.ax2.spines['right'].set_visible(False)
-            self.ax2.set_axisbelow(True)
-            self.ax2.grid(axis='y', linestyle='--', alpha=0.7)
+            self.top_products = analytics['top_products']
+            names = [p[1] for p in self.top_products]
+            revenues = [p[3] for p in self.top_products]
             
-            self.figure1.tight_layout(pad=3.0)  # Increased padding
-            self.canvas1.draw()
+            # Chỉ vẽ biểu đồ có dữ liệu đổi; artist được cập nhật tại chỗ nếu bố cục giữ nguyên
+            layout_changed = False
+            pie_changed = self.chart_layer.changed("pie", names, revenues)
+            if pie_changed:
+                layout_changed |= self.drawTopProducts(names, revenues)
+            series_changed = self.chart_layer.changed("series", analytics['period_type'], analytics['series'])
+            if series_changed:
+                layout_changed |= self.drawRevenueSeries(analytics['period_type'], analytics['series'])
+            if layout_changed:
+                self.figure1.tight_layout(pad=3.0)  # Increased padding
+                self.chart_layer.redraw()
+            elif pie_changed or series_changed:
+                self.chart_layer.refresh()
             
             # Update table
             self.stats_table.setRowCount(len(self.top_products))
-            total_rev = sum(revenues)
-            total_rev = float(total_rev) if total_rev else 1  # Avoid division by zero
+            total_rev = sum(revenues) or 1  # Avoid division by zero
             
-            for i, (name, stock, revenue, price) in enumerate(self.top_products):
-                revenue = float(revenue) if isinstance(revenue, Decimal) else revenue
-                
+            for i, (_, name, units, revenue) in enumerate(self.top_products):
                 # Format cells and add data
                 name_item = QTableWidgetItem(name)
                 name_item.setTextAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
                 
-                stock_item = QTableWidgetItem(f"{stock:,}")
-                stock_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                units_item = QTableWidgetItem(f"{units:,}")
+                units_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
                 
                 revenue_item = QTableWidgetItem(f"{int(revenue):,} VNĐ")
                 revenue_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
@@ -318,138 +428,228 @@ class StatisticsTab(QWidget):
                 percentage_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
                 
                 self.stats_table.setItem(i, 0, name_item)
-                self.stats_table.setItem(i, 1, stock_item)
+                self.stats_table.setItem(i, 1, units_item)
                 self.stats_table.setItem(i, 2, revenue_item)
                 self.stats_table.setItem(i, 3, percentage_item)
             
             # Format table appearance
             self.stats_table.horizontalHeader().setStretchLastSection(True)
             self.stats_table.setColumnWidth(0, 200)  # Name column
-            self.stats_table.setColumnWidth(1, 100)  # Stock column
+            self.stats_table.setColumnWidth(1, 100)  # Units column
             self.stats_table.setColumnWidth(2, 150)  # Revenue column
             
+            self.showBasketAnalysis(analytics)
+            
         except Exception as e:
             print(f"Lỗi khi tải thống kê: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
     
-    def exportToExcel(self):
-        try:
-            # Chọn vị trí và tên file
-            file_name, _ = QFileDialog.getSaveFileName(
-                self, 
-                "Xuất báo cáo Excel", 
-                f"Báo_Cáo_Doanh_Thu_{datetime.now().strftime('%d-%m-%Y')}.xlsx",
-                "Excel Files (*.xlsx)"
+    def drawTopProducts(self, names, revenues):
+        # Trả về True nếu phải dựng lại biểu đồ (cần vẽ lại toàn bộ), False nếu chỉ cập nhật tại chỗ
+        if self.pie_artists is not None and len(self.pie_artists[0]) == len(revenues) and sum(revenues) > 0:
+            update_pie(*self.pie_artists, revenues, names)
+            return False
+        
+        self.ax1.clear()
+        self.pie_artists = None
+        if sum(revenues) > 0:
+            wedges, texts, autotexts = self.ax1.pie(
+                revenues, 
+                labels=names,
+                autopct='%1.1f%%',
+                textprops={'fontsize': 10},
+                wedgeprops={'linewidth': 1, 'edgecolor': 'white'}
             )
-            
-            if not file_name:
-                return  # Người dùng đã hủy
-            
-            # Tạo file Excel với pandas
-            with pd.ExcelWriter(file_name, engine='xlsxwriter') as writer:
-                workbook = writer.book
-                
-                # Định dạng tiêu đề
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'bg_color': '#4CAF50',
-                    'color': 'white',
-                    'align': 'center',
-                    'valign': 'vcenter',
-                    'border': 1
-                })
-                
-                # Định dạng số liệu
-                number_format = workbook.add_format({
-                    'num_format': '#,##0',
-                    'align': 'right'
-                })
-                
-                # Định dạng tiền tệ
-                currency_format = workbook.add_format({
-                    'num_format': '#,##0 "VNĐ"',
-                    'align': 'right'
-                })
-                
-                # Định dạng phần trăm
-                percent_format = workbook.add_format({
-                    'num_format': '0.0%',
-                    'align': 'right'
-                })
-                
-                # ---- Sheet 1: Tổng Quan ----
-                df_summary = pd.DataFrame({
-                    'Chỉ số': ['Tổng số sản phẩm', 'Tổng hàng tồn kho', 'Tổng số khách hàng', 'Tổng doanh thu'],
-                    'Giá trị': [
-                        self.summary_data['total_products'],
-                        self.summary_data['total_inventory'],
-                        self.summary_data['total_customers'],
-                        self.summary_data['total_revenue']
-                    ],
-                    'Đơn vị': ['sản phẩm', 'sản phẩm', 'khách hàng', 'VNĐ']
-                })
-                
-                df_summary.to_excel(writer, sheet_name='Tổng Quan', index=False)
-                
-                # Định dạng Sheet Tổng Quan
-                sheet1 = writer.sheets['Tổng Quan']
-                sheet1.set_column('A:A', 20)
-                sheet1.set_column('B:B', 15)
-                sheet1.set_column('C:C', 15)
-                
-                # Thêm định dạng cho tiêu đề
-                for col_num, value in enumerate(df_summary.columns.values):
-                    sheet1.write(0, col_num, value, header_format)
-                
-                # Định dạng giá trị
-                for i in range(len(df_summary)):
-                    if i == 3:  # Dòng doanh thu
-                        sheet1.write(i+1, 1, df_summary.iloc[i, 1], currency_format)
-                    else:
-                        sheet1.write(i+1, 1, df_summary.iloc[i, 1], number_format)
-                
-                # ---- Sheet 2: Chi Tiết Sản Phẩm ----
-                if self.top_products:
-                    # Tạo dataframe từ top_products
-                    product_data = []
-                    total_rev = sum(float(p[2]) for p in self.top_products)
-                    
-                    for name, stock, revenue, price in self.top_products:
-                        product_data.append({
-                            'Tên sản phẩm': name,
-                            'Tồn kho': stock,
-                            'Đơn giá': price,
-                            'Doanh thu': revenue,
-                            'Tỷ lệ': revenue / total_rev
-                        })
-                    
-                    df_products = pd.DataFrame(product_data)
-                    df_products.to_excel(writer, sheet_name='Chi Tiết Sản Phẩm', index=False)
-                    
-                    # Định dạng Sheet Chi Tiết
-                    sheet2 = writer.sheets['Chi Tiết Sản Phẩm']
-                    sheet2.set_column('A:A', 30)
-                    sheet2.set_column('B:B', 15)
-                    sheet2.set_column('C:C', 15)
-                    sheet2.set_column('D:D', 20)
-                    sheet2.set_column('E:E', 15)
-                    
-                    # Thêm định dạng cho tiêu đề
-                    for col_num, value in enumerate(df_products.columns.values):
-                        sheet2.write(0, col_num, value, header_format)
-                    
-                    # Định dạng giá trị
-                    for i in range(len(df_products)):
-                        sheet2.write(i+1, 1, df_products.iloc[i, 1], number_format)
-                        sheet2.write(i+1, 2, df_products.iloc[i, 2], currency_format)
-                        sheet2.write(i+1, 3, df_products.iloc[i, 3], currency_format)
-                        sheet2.write(i+1, 4, df_products.iloc[i, 4], percent_format)
-            
+            # Make pie chart labels more readable
+            for text in texts:
+                text.set_fontsize(9)
+            for autotext in autotexts:
+                autotext.set_fontsize(9)
+                autotext.set_weight('bold')
+            self.pie_artists = (wedges, texts, autotexts)
+        else:
+            self.ax1.text(0.5, 0.5, 'Chưa có đơn hàng trong kỳ', ha='center', va='center',
+                          fontsize=10, color='#888', transform=self.ax1.transAxes)
+            self.ax1.axis('off')
+        self.ax1.set_title('Top 5 Sản Phẩm theo Doanh Thu', fontsize=12, pad=15)
+        self.chart_layer.setAnimated("pie", [a for group in (self.pie_artists or ()) for a in group])
+        return True
+    
+    def drawRevenueSeries(self, period_type, series):
+        # Doanh thu (cột) và số sản phẩm bán ra (đường) theo kỳ
+        labels = [period_label(row[0], period_type) for row in series]
+        revenue = [row[3] / 1_000_000 for row in series]
+        units = [row[2] for row in series]
+        if self.revenue_bars is not None and (period_type, labels) == self.series_labels:
+            # Cùng các kỳ (thường là vừa có đơn mới): chỉ đổi chiều cao cột và dữ liệu đường
+            update_bars(self.revenue_bars, revenue)
+            self.units_line.set_ydata(units)
+            revenue_rescaled = fit_ylim(self.ax2, revenue)
+            units_rescaled = fit_ylim(self.ax2_units, units)
+            return revenue_rescaled or units_rescaled
+        
+        positions = range(len(series))
+        self.ax2.clear()
+        self.ax2_units.clear()
+        self.revenue_bars = self.ax2.bar(
+            positions,
+            revenue,
+            color='#4CAF50',
+            edgecolor='white',
+            linewidth=1,
+            label='Doanh thu (triệu VNĐ)'
+        )
+        self.units_line, = self.ax2_units.plot(positions, units, color='#FF9800',
+                                               marker='o', markersize=3, linewidth=1.5, label='Sản phẩm bán ra')
+        self.series_labels = (period_type, labels)
+        
+        # Nhãn trục x thưa bớt khi có nhiều kỳ
+        step = max(1, len(series) // 10)
+        self.ax2.set_xticks(list(positions)[::step])
+        self.ax2.set_xticklabels(labels[::step])
+        self.ax2.set_title(f'Doanh Thu theo {PERIOD_LABELS[period_type].lower()}', fontsize=12, pad=15)
+        self.ax2.set_ylabel('Triệu VNĐ', fontsize=9)
+        self.ax2_units.set_ylabel('Sản phẩm', fontsize=9)
+        self.ax2.tick_params(axis='x', rotation=45, labelsize=9)
+        self.ax2.tick_params(axis='y', labelsize=9)
+        self.ax2_units.tick_params(axis='y', labelsize=9)
+        fit_ylim(self.ax2, revenue)
+        fit_ylim(self.ax2_units, units)
+        self.ax2.spines['top'].set_visible(False)
+        self.ax2_units.spines['top'].set_visible(False)
+        self.ax2.set_axisbelow(True)
+        self.ax2.grid(axis='y', linestyle='--', alpha=0.7)
+        self.chart_layer.setAnimated("series", list(self.revenue_bars) + [self.units_line])
+        return True
+    
+    def showBasketAnalysis(self, analytics):
+        baskets = analytics['baskets']
+        period_name = PERIOD_LABELS[analytics['period_type']].lower()
+        self.basket_summary.setText(
+            f"Trung bình mỗi đơn: {baskets['average_units']:.1f} sản phẩm, "
+            f"{int(baskets['average_value']):,} VNĐ ({SERIES_LENGTH[analytics['period_type']]} {period_name} gần nhất)"
+        )
+        
+        heatmap = analytics['heatmap'] / 1_000_000
+        histogram = baskets['histogram']
+        layout_changed = False
+        heatmap_changed = self.basket_layer.changed("heatmap", heatmap)
+        if heatmap_changed:
+            layout_changed |= self.drawHeatmap(heatmap)
+        histogram_changed = self.basket_layer.changed("baskets", histogram)
+        if histogram_changed:
+            layout_changed |= self.drawBasketSizes(histogram)
+        if layout_changed:
+            self.figure2.tight_layout(pad=3.0)
+            self.basket_layer.redraw()
+        elif heatmap_changed or histogram_changed:
+            self.basket_layer.refresh()
+        
+        pairs = analytics['pairs']
+        self.pairs_table.setRowCount(len(pairs))
+        for i, (first, second, count) in enumerate(pairs):
+            count_item = QTableWidgetItem(f"{count:,}")
+            count_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.pairs_table.setItem(i, 0, QTableWidgetItem(first))
+            self.pairs_table.setItem(i, 1, QTableWidgetItem(second))
+            self.pairs_table.setItem(i, 2, count_item)
+    
+    def drawHeatmap(self, heatmap):
+        # Bản đồ nhiệt doanh thu theo thứ và giờ; kích thước luôn 7 x 24 nên chỉ dựng một lần
+        peak = float(heatmap.max()) or 1.0
+        if self.heatmap_image is not None:
+            self.heatmap_image.set_data(heatmap)
+            if self.heatmap_image.get_clim() == (0, peak):
+                return False
+            # Thang màu đổi thì thanh màu cũng phải vẽ lại
+            self.heatmap_image.set_clim(0, peak)
+            self.heatmap_colorbar.update_normal(self.heatmap_image)
+            return True
+        
+        self.heatmap_image = self.ax3.imshow(heatmap, aspect='auto', cmap='Greens',
+                                             interpolation='nearest', vmin=0, vmax=peak)
+        self.heatmap_colorbar = self.figure2.colorbar(self.heatmap_image, ax=self.ax3)
+        self.heatmap_colorbar.set_label('Triệu VNĐ', fontsize=9)
+        self.ax3.set_yticks(range(7))
+        self.ax3.set_yticklabels(WEEKDAY_LABELS, fontsize=9)
+        self.ax3.set_xticks(range(0, 24, 2))
+        self.ax3.set_xticklabels([f"{h}h" for h in range(0, 24, 2)], fontsize=9)
+        self.ax3.set_title('Doanh Thu theo Giờ trong Tuần', fontsize=12, pad=15)
+        self.basket_layer.setAnimated("heatmap", [self.heatmap_image])
+        return True
+    
+    def drawBasketSizes(self, histogram):
+        # Phân bố số sản phẩm mỗi đơn; số cột cố định nên chỉ dựng một lần
+        if self.basket_bars is not None:
+            update_bars(self.basket_bars, histogram)
+            return fit_ylim(self.ax4, histogram)
+        
+        labels = [str(size) for size in range(1, len(histogram))] + [f"{len(histogram)}+"]
+        self.basket_bars = self.ax4.bar(range(len(histogram)), histogram, color='#2196F3',
+                                        edgecolor='white', linewidth=1)
+        self.ax4.set_xticks(range(len(histogram)))
+        self.ax4.set_xticklabels(labels, fontsize=9)
+        self.ax4.set_xlabel('Số sản phẩm trong đơn', fontsize=9)
+        self.ax4.set_ylabel('Số đơn', fontsize=9)
+        self.ax4.tick_params(axis='y', labelsize=9)
+        self.ax4.set_title('Kích Thước Giỏ Hàng', fontsize=12, pad=15)
+        fit_ylim(self.ax4, histogram)
+        self.ax4.spines['top'].set_visible(False)
+        self.ax4.spines['right'].set_visible(False)
+        self.ax4.set_axisbelow(True)
+        self.ax4.grid(axis='y', linestyle='--', alpha=0.7)
+        self.basket_layer.setAnimated("baskets", self.basket_bars)
+        return True
+    
+    def exportToExcel(self):
+        # Chọn vị trí và tên file
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, 
+            "Xuất báo cáo Excel", 
+            f"Báo_Cáo_Doanh_Thu_{datetime.now().strftime('%d-%m-%Y')}.xlsx",
+            "Excel Files (*.xlsx)"
+        )
+        
+        if not file_name:
+            return  # Người dùng đã hủy
+        if 'total_products' not in self.summary_data or self.analytics is None:
+            QMessageBox.warning(self, "Lỗi xuất Excel", "Số liệu thống kê chưa tải xong, vui lòng thử lại sau.")
+            return
+        
+        # Dựng báo cáo trong tiến trình con; hộp tiến độ không chặn các tab khác
+        self.export_btn.setEnabled(False)
+        progress = QProgressDialog("Đang dựng báo cáo...", "Hủy", 0, 0, self)
+        progress.setWindowTitle("Xuất báo cáo Excel")
+        progress.setWindowModality(Qt.WindowModality.NonModal)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.show()
+        
+        job = report_jobs().start(build_statistics_report, file_name,
+                                  dict(self.summary_data), list(self.top_products),
+                                  partial=partial_path(file_name))
+        
+        def close_progress():
+            progress.close()
+            progress.deleteLater()
+            self.export_btn.setEnabled(True)
+        
+        def update(done, total, message):
+            progress.setMaximum(total)
+            progress.setValue(done)
+            progress.setLabelText(f"Đang dựng báo cáo: {message}")
+        
+        def finished(path):
+            close_progress()
             QMessageBox.information(self, "Xuất Excel thành công", 
-                                   f"Đã xuất báo cáo thành công đến:\n{file_name}")
-            
-        except Exception as e:
+                                   f"Đã xuất báo cáo thành công đến:\n{path}")
+        
+        def failed(message):
+            close_progress()
             QMessageBox.critical(self, "Lỗi xuất Excel", 
-                               f"Đã xảy ra lỗi khi xuất báo cáo: {str(e)}")
\ No newline at end of file
+                               f"Đã xảy ra lỗi khi xuất báo cáo: {message}")
+        
+        job.progress.connect(update)
+        job.finished.connect(finished)
+        job.failed.connect(failed)
+        job.cancelled.connect(close_progress)
+        progress.canceled.connect(job.cancel)
@@ -0,0 +1,109 @@
+# ui/chart_layer.py
+# Lớp vẽ biểu đồ matplotlib cho các tab: bỏ qua lần vẽ khi dữ liệu không đổi (so chữ ký dữ liệu),
+# cập nhật artist có sẵn (chiều cao cột, góc miếng bánh, dữ liệu đường) thay vì clear() rồi vẽ lại,
+# và chỉ blit vùng biểu đồ khi bố cục (trục, nhãn) không đổi; ngược lại hẹn vẽ lại bằng draw_idle.
+
+import hashlib
+import math
+
+PIE_LABEL_DISTANCE = 1.1  # Giá trị mặc định của Axes.pie
+PIE_PCT_DISTANCE = 0.6
+HEADROOM = 1.1            # Khoảng trống phía trên cột cao nhất
+
+def data_signature(*parts):
+    # Chữ ký của dữ liệu đầu vào một biểu đồ; mảng NumPy được băm theo nội dung
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if hasattr(part, "tobytes"):
+            digest.update(part.tobytes())
+        else:
+            digest.update(repr(part).encode("utf-8"))
+        digest.update(b"|")
+    return digest.hexdigest()
+
+def update_pie(wedges, texts, autotexts, values, labels):
+    # Đặt lại góc từng miếng bánh và vị trí nhãn giống cách Axes.pie tính (startangle=0, ngược chiều kim đồng hồ)
+    total = float(sum(values)) or 1.0
+    theta1 = 0.0
+    for wedge, text, autotext, value, label in zip(wedges, texts, autotexts, values, labels):
+        theta2 = theta1 + 360.0 * value / total
+        wedge.set_theta1(theta1)
+        wedge.set_theta2(theta2)
+        middle = math.radians((theta1 + theta2) / 2)
+        x, y = math.cos(middle), math.sin(middle)
+        text.set_position((PIE_LABEL_DISTANCE * x, PIE_LABEL_DISTANCE * y))
+        text.set_horizontalalignment("left" if x > 0 else "right")
+        text.set_text(label)
+        autotext.set_position((PIE_PCT_DISTANCE * x, PIE_PCT_DISTANCE * y))
+        autotext.set_text(f"{100.0 * value / total:.1f}%")
+        theta1 = theta2
+
+def update_bars(bars, heights):
+    for bar, height in zip(bars, heights):
+        bar.set_height(height)
+
+def fit_ylim(ax, values):
+    # Nới trục y khi dữ liệu vượt khung hoặc co lại quá nhiều; trả về True nếu giới hạn đã đổi
+    peak = max((float(v) for v in values), default=0.0)
+    top = peak * HEADROOM if peak > 0 else 1.0
+    _, current = ax.get_ylim()
+    if peak <= current and top >= current * 0.5:
+        return False
+    ax.set_ylim(0, top)
+    return True
+
+class ChartLayer:
+    # Quản lý một FigureCanvas: ghi nhớ chữ ký dữ liệu từng biểu đồ và nền tĩnh để blit
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._signatures = {}
+        self._animated = []
+        self._background = None
+        canvas.mpl_connect("draw_event", self._onDraw)
+
+    def changed(self, key, *data):
+        # True nếu dữ liệu của biểu đồ key khác lần vẽ trước
+        signature = data_signature(*data)
+        if self._signatures.get(key) == signature:
+            return False
+        self._signatures[key] = signature
+        return True
+
+    def forget(self, key=None):
+        # Buộc lần cập nhật sau vẽ lại (ví dụ khi đổi kiểu biểu đồ)
+        if key is None:
+            self._signatures.clear()
+        else:
+            self._signatures.pop(key, None)
+
+    def setAnimated(self, key, artists):
+        # Artist động không nằm trong nền tĩnh; chúng được vẽ riêng khi blit
+        artists = list(artists)
+        for artist in artists:
+            artist.set_animated(True)
+        self._animated = [(k, a) for k, a in self._animated if k != key] + [(key, a) for a in artists]
+
+    def redraw(self):
+        # Bố cục đổi: vẽ lại toàn bộ khi vòng lặp sự kiện rảnh, nền được chụp lại trong _onDraw
+        self._background = None
+        self.canvas.draw_idle()
+
+    def refresh(self):
+        # Chỉ artist động đổi: dán lại nền rồi vẽ đè chúng
+        if self._background is None:
+            self.redraw()
+            return
+        figure = self.canvas.figure
+        self.canvas.restore_region(self._background)
+        self._drawAnimated()
+        self.canvas.blit(figure.bbox)
+
+    def _drawAnimated(self):
+        figure = self.canvas.figure
+        for _, artist in self._animated:
+            if artist.figure is figure:
+                figure.draw_artist(artist)
+
+    def _onDraw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self._drawAnimated()
@@ -0,0 +1,150 @@
+# ui/image_loader.py
+# Nạp ảnh thu nhỏ ở luồng nền để giao diện không bị đứng khi giải mã ảnh lớn.
+# Luồng nền chỉ làm việc với QImage; QPixmap được tạo trên luồng giao diện và lưu vào thumbnail_cache.
+
+import threading
+
+import shiboken6
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from services.thumbnail_store import load_thumbnail_image
+from ui.thumbnail_cache import thumbnail_cache
+
+LOADING_TEXT = "Đang tải..."
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+class _LoaderSignals(QObject):
+    loaded = Signal(object, object)  # (key, QImage hoặc None)
+
+class ImageLoadTask(QRunnable):
+    def __init__(self, key, path, width, height, signals):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.width = width
+        self.height = height
+        self.token = CancelToken()
+        self._signals = signals
+        # Python giữ task để có thể hủy an toàn cả khi task đã chạy xong
+        self.setAutoDelete(False)
+
+    def run(self):
+        if self.token.cancelled:
+            return
+        try:
+            image = load_thumbnail_image(self.path, self.width, self.height)
+        except Exception as e:
+            print(f"Lỗi khi nạp ảnh {self.path}: {str(e)}")
+            image = None
+        if not self.token.cancelled:
+            self._signals.loaded.emit(self.key, image)
+
+class _PendingLoad:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = []  # (group, callback)
+
+class ImageLoader(QObject):
+    # Phát ra khi một ảnh thu nhỏ đã sẵn sàng trong thumbnail_cache
+    thumbnailReady = Signal(object)
+
+    def __init__(self, max_threads=2, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._signals = _LoaderSignals(self)
+        self._signals.loaded.connect(self._onLoaded)
+        self._pending = {}   # key -> _PendingLoad
+        self._failed = set() # Ảnh không giải mã được, không thử lại
+
+    def cached(self, path, width, height):
+        key = thumbnail_cache.cacheKey(path, width, height)
+        return None if key is None else thumbnail_cache.lookup(key)
+
+    def request(self, path, width, height, callback=None, group=None):
+        # Trả về True nếu ảnh đang được nạp (callback(pixmap) sẽ được gọi sau),
+        # False nếu không có ảnh để nạp
+        key = thumbnail_cache.cacheKey(path, width, height)
+        if key is None or key in self._failed:
+            return False
+
+        pending = self._pending.get(key)
+        if pending is None:
+            task = ImageLoadTask(key, path, width, height, self._signals)
+            pending = _PendingLoad(task)
+            self._pending[key] = pending
+            self._pool.start(task)
+        if (group, callback) not in pending.waiters:
+            pending.waiters.append((group, callback))
+        return True
+
+    def loadInto(self, label, path, width, height, group=None, missing_text=None):
+        # Gán ảnh cho QLabel: hiện ngay nếu đã có trong cache, nếu không hiện chữ chờ rồi thay khi nạp xong
+        pixmap = self.cached(path, width, height)
+        if pixmap is not None:
+            label.setPixmap(pixmap)
+            return True
+
+        def apply(pixmap):
+            if not shiboken6.isValid(label):
+                return
+            if pixmap is not None:
+                label.setPixmap(pixmap)
+            elif missing_text is not None:
+                label.setText(missing_text)
+
+        if not self.request(path, width, height, apply, group):
+            return False
+        label.setText(LOADING_TEXT)
+        return True
+
+    def cancelGroup(self, group, keep=()):
+        # Hủy các yêu cầu của group (trừ các key trong keep); task không còn ai chờ sẽ bị gỡ khỏi hàng đợi
+        keep = set(keep)
+        for key in list(self._pending):
+            if key in keep:
+                continue
+            pending = self._pending[key]
+            pending.waiters = [w for w in pending.waiters if w[0] is not group]
+            if not pending.waiters:
+                pending.task.token.cancel()
+                self._pool.tryTake(pending.task)
+                del self._pending[key]
+
+    def pendingKeys(self, group):
+        return [key for key, pending in self._pending.items()
+                if any(w[0] is group for w in pending.waiters)]
+
+    @Slot(object, object)
+    def _onLoaded(self, key, image):
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return  # Đã bị hủy
+        pixmap = None
+        if image is None:
+            self._failed.add(key)
+        else:
+            pixmap = thumbnail_cache.insert(key, image)
+        for _, callback in pending.waiters:
+            if callback is not None:
+                callback(pixmap)
+        self.thumbnailReady.emit(key)
+
+_loader = None
+
+def image_loader():
+    # Tạo khi cần vì QObject chỉ được tạo sau khi đã có QApplication
+    global _loader
+    if _loader is None:
+        _loader = ImageLoader()
+    return _loader
@@ -0,0 +1,222 @@
+from datetime import datetime
+from PySide6.QtWidgets import QTableView, QStyledItemDelegate, QAbstractItemView, QHeaderView
+from PySide6.QtGui import QColor, QPainter, QFont, QCursor
+from PySide6.QtCore import (Qt, Signal, QRect, QAbstractTableModel, QModelIndex,
+                            QPersistentModelIndex, QEvent)
+
+ORDER_HEADERS = ["Mã ĐH", "Tên KH", "Số điện thoại", "Ngày Đặt", "Tổng Tiền", "Trạng Thái", "Chi tiết"]
+DETAIL_COLUMN = 6
+BUTTON_WIDTH, BUTTON_HEIGHT = 48, 24
+
+class OrderTableModel(QAbstractTableModel):
+    # Mỗi dòng là một tuple (id, customer_name, phone_number, order_date, total_amount, status)
+    OrderIdRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._orders = []
+        self._ids = {}      # Mã đơn -> khóa sắp xếp (order_date, id)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._orders)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(ORDER_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return ORDER_HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        order_id, name, phone, date, amount, status = self._orders[index.row()]
+        column = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            # Định dạng khi vẽ, không lưu sẵn chuỗi cho từng dòng
+            if column == 0:
+                return str(order_id)
+            if column == 1:
+                return name
+            if column == 2:
+                return phone
+            if column == 3:
+                if isinstance(date, str):
+                    date = datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
+                return date.strftime("%d/%m/%Y %H:%M")
+            if column == 4:
+                return f"{format(amount, ',.0f')} VNĐ"
+            if column == 5:
+                return status
+            if column == DETAIL_COLUMN:
+                return "Xem"
+            return None
+
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if column == 4:
+                return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+            if column in (0, 3, 5, DETAIL_COLUMN):
+                return Qt.AlignmentFlag.AlignCenter
+            return Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+
+        if role == Qt.ItemDataRole.BackgroundRole and column == 5:
+            # Màu nền theo phương thức thanh toán
+            return QColor("#E8F5E9") if status == "Tiền mặt" else QColor("#E3F2FD")
+
+        if role == self.OrderIdRole:
+            return order_id
+        return None
+
+    def clear(self):
+        self.beginResetModel()
+        self._orders = []
+        self._ids = {}
+        self.endResetModel()
+
+    def containsOrder(self, order_id):
+        return order_id in self._ids
+
+    @staticmethod
+    def sortKey(order):
+        return (order[3], order[0])
+
+    def _bisect(self, key):
+        # Dòng đầu tiên có khóa <= key; bảng xếp theo (order_date, id) giảm dần như truy vấn phân trang
+        low, high = 0, len(self._orders)
+        while low < high:
+            middle = (low + high) // 2
+            if self.sortKey(self._orders[middle]) > key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _rowOf(self, order_id):
+        row = self._bisect(self._ids[order_id])
+        if row < len(self._orders) and self._orders[row][0] == order_id:
+            return row
+        # Thứ tự mã đơn theo collation của CSDL có thể khác so sánh chuỗi của Python
+        return next(i for i, order in enumerate(self._orders) if order[0] == order_id)
+
+    def appendOrders(self, orders):
+        if not orders:
+            return
+        first = len(self._orders)
+        self.beginInsertRows(QModelIndex(), first, first + len(orders) - 1)
+        self._orders.extend(tuple(order) for order in orders)
+        self._ids.update((order[0], self.sortKey(order)) for order in orders)
+        self.endInsertRows()
+
+    def removeOrders(self, order_ids):
+        # Trả về các dòng đã gỡ (đơn chưa được tải thì bỏ qua)
+        removed = []
+        for order_id in order_ids:
+            if order_id not in self._ids:
+                continue
+            row = self._rowOf(order_id)
+            self.beginRemoveRows(QModelIndex(), row, row)
+            removed.append(self._orders.pop(row))
+            del self._ids[order_id]
+            self.endRemoveRows()
+        return removed
+
+    def insertOrders(self, orders):
+        # Chèn đơn mới vào đúng vị trí theo (order_date, id) giảm dần
+        for order in orders:
+            order = tuple(order)
+            key = self.sortKey(order)
+            row = self._bisect(key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._orders.insert(row, order)
+            self._ids[order[0]] = key
+            self.endInsertRows()
+
+class ViewButtonDelegate(QStyledItemDelegate):
+    # Vẽ nút "Xem" thay vì tạo QPushButton cho từng dòng
+    clicked = Signal(QModelIndex)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None
+        self._font = QFont("Arial", 9)
+
+    @staticmethod
+    def buttonRect(cell_rect):
+        rect = QRect(0, 0, min(BUTTON_WIDTH, cell_rect.width() - 4), min(BUTTON_HEIGHT, cell_rect.height() - 4))
+        rect.moveCenter(cell_rect.center())
+        return rect
+
+    def paint(self, painter, option, index):
+        button = self.buttonRect(option.rect)
+        cursor_pos = option.widget.viewport().mapFromGlobal(QCursor.pos()) if option.widget else None
+        if self._pressed is not None and QModelIndex(self._pressed) == index:
+            color = "#0D47A1"
+        elif cursor_pos is not None and button.contains(cursor_pos):
+            color = "#1565C0"
+        else:
+            color = "#1976D2"
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(color))
+        painter.drawRoundedRect(button, 3, 3)
+        painter.setPen(QColor("white"))
+        painter.setFont(self._font)
+        painter.drawText(button, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        on_button = self.buttonRect(option.rect).contains(event.position().toPoint())
+        if option.widget:
+            option.widget.viewport().update(option.rect)
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self._pressed = QPersistentModelIndex(index) if on_button else None
+            return on_button
+
+        was_pressed = self._pressed is not None and QModelIndex(self._pressed) == index
+        self._pressed = None
+        if was_pressed and on_button:
+            self.clicked.emit(index)
+        return was_pressed
+
+class OrderTableView(QTableView):
+    # Chi phí vẽ chỉ phụ thuộc số dòng đang hiển thị, không phụ thuộc tổng số đơn đã tải
+    detailRequested = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.order_model = OrderTableModel(self)
+        self.setModel(self.order_model)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setMouseTracking(True)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+
+        self.button_delegate = ViewButtonDelegate(self)
+        self.button_delegate.clicked.connect(
+            lambda index: self.detailRequested.emit(index.data(OrderTableModel.OrderIdRole)))
+        self.setItemDelegateForColumn(DETAIL_COLUMN, self.button_delegate)
+
+        self._hover_index = QPersistentModelIndex()
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        # Cập nhật màu nút khi di chuột qua
+        index = self.indexAt(event.position().toPoint())
+        if QModelIndex(self._hover_index) != index:
+            if self._hover_index.isValid():
+                self.viewport().update(self.visualRect(QModelIndex(self._hover_index)))
+            self._hover_index = QPersistentModelIndex(index)
+        on_button = (index.isValid() and index.column() == DETAIL_COLUMN
+                     and ViewButtonDelegate.buttonRect(self.visualRect(index)).contains(event.position().toPoint()))
+        if index.isValid():
+            self.viewport().update(self.visualRect(index))
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor if on_button else Qt.CursorShape.ArrowCursor)
@@ -1,7 +1,7 @@
-import os
 from PySide6.QtWidgets import QFrame, QVBoxLayout, QLabel
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QPixmap
+from PySide6.QtGui import QFont
+from ui.thumbnail_cache import get_thumbnail
 
 def createProductCard(product):
     card = QFrame()
@@ -31,14 +31,9 @@ def createProductCard(product):
     
     # Hình ảnh sản phẩm
     image_label = QLabel()
-    if product[4] and os.path.exists(product[4]):  # image_path
-        pixmap = QPixmap(product[4])
-        scaled_pixmap = pixmap.scaled(
-            200, 200,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        image_label.setPixmap(scaled_pixmap)
+    pixmap = get_thumbnail(product[4], 200, 200)  # image_path
+    if pixmap:
+        image_label.setPixmap(pixmap)
         image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
     else:
         image_label.setText("Không có hình ảnh")
@@ -0,0 +1,341 @@
+import bisect
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PySide6.QtGui import QFont, QColor, QPen, QPainter, QCursor
+from PySide6.QtCore import (Qt, Signal, QSize, QRect, QAbstractListModel, QModelIndex,
+                            QPersistentModelIndex, QPoint, QEvent, QTimer)
+from ui.thumbnail_cache import thumbnail_cache
+from ui.image_loader import image_loader
+
+# Kích thước thẻ sản phẩm (giữ nguyên như thẻ QFrame cũ)
+CARD_WIDTH, CARD_HEIGHT = 200, 280
+IMAGE_WIDTH, IMAGE_HEIGHT = 180, 140
+CARD_MARGIN = 10
+BUTTON_HEIGHT = 34
+
+class ProductListModel(QAbstractListModel):
+    # Mỗi dòng là một tuple sản phẩm của danh mục (id, name, price, stock, image_path, import_date)
+    ProductRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._products = []
+        self._keys = []     # Khóa sắp xếp (tên thường, mã) song song với _products
+        self._rows = {}     # Mã sản phẩm -> dòng
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._products)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        product = self._products[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return product[1]
+        if role == self.ProductRole:
+            return product
+        return None
+
+    @staticmethod
+    def sortKey(product):
+        return (product[1].lower(), product[0])
+
+    def setProducts(self, products):
+        self.beginResetModel()
+        self._products = list(products)
+        self._keys = [self.sortKey(p) for p in self._products]
+        self._rows = {}
+        self._reindex(0)
+        self.endResetModel()
+
+    def _reindex(self, start):
+        # Đánh lại số dòng từ start trở đi sau khi chèn / xóa
+        for row in range(start, len(self._products)):
+            self._rows[self._products[row][0]] = row
+
+    def _rowOf(self, product_id):
+        return self._rows.get(product_id, -1)
+
+    def replaceProduct(self, product):
+        # Thay dòng có cùng mã tại chỗ (giữ vị trí); trả về False nếu không có
+        row = self._rowOf(product[0])
+        if row < 0:
+            return False
+        self._products[row] = product
+        self._keys[row] = self.sortKey(product)
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def upsertProduct(self, product):
+        # Cập nhật đúng một dòng khi danh mục thay đổi, giữ thứ tự theo tên
+        row = self._rowOf(product[0])
+        if row >= 0 and self._products[row][1] == product[1]:
+            self.replaceProduct(product)
+            return
+        if row >= 0:
+            self.removeProduct(product[0])
+        key = self.sortKey(product)
+        row = bisect.bisect_left(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._products.insert(row, product)
+        self._keys.insert(row, key)
+        self._reindex(row)
+        self.endInsertRows()
+
+    def removeProduct(self, product_id):
+        row = self._rowOf(product_id)
+        if row >= 0:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._products[row]
+            del self._keys[row]
+            del self._rows[product_id]
+            self._reindex(row)
+            self.endRemoveRows()
+
+class ProductCardDelegate(QStyledItemDelegate):
+    # Vẽ thẻ sản phẩm thay vì tạo QFrame cho từng sản phẩm
+    addToCartRequested = Signal(QModelIndex)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None
+        self._name_font = QFont("Arial", 10, QFont.Weight.Bold)
+        self._price_font = QFont("Arial", 11, QFont.Weight.Bold)
+        self._placeholder_font = QFont("Arial", 10)
+        self._button_font = QFont("Arial", 9, QFont.Weight.Bold)
+
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT)
+
+    @staticmethod
+    def buttonRect(card_rect):
+        return QRect(card_rect.left() + CARD_MARGIN,
+                     card_rect.bottom() - CARD_MARGIN - BUTTON_HEIGHT + 1,
+                     IMAGE_WIDTH, BUTTON_HEIGHT)
+
+    def pixmapFor(self, image_path):
+        # Chỉ lấy ảnh đã có trong cache; nếu chưa có thì nạp nền, view sẽ vẽ lại khi xong
+        pixmap = image_loader().cached(image_path, IMAGE_WIDTH, IMAGE_HEIGHT)
+        if pixmap is not None:
+            return pixmap, False
+        return None, image_loader().request(image_path, IMAGE_WIDTH, IMAGE_HEIGHT, group=self)
+
+    def paint(self, painter, option, index):
+        product_id, name, price, stock, image_path = index.data(ProductListModel.ProductRole)[:5]
+        card = option.rect.adjusted(0, 0, -1, -1)
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Khung thẻ
+        painter.setPen(QPen(QColor("#2196F3" if hovered else "#ddd"), 1))
+        painter.setBrush(QColor("white"))
+        painter.drawRoundedRect(card, 10, 10)
+
+        x = card.left() + CARD_MARGIN
+        y = card.top() + CARD_MARGIN
+
+        # Hình ảnh
+        image_rect = QRect(x, y, IMAGE_WIDTH, IMAGE_HEIGHT)
+        painter.setPen(QPen(QColor("#eee"), 1))
+        painter.setBrush(QColor("#f9f9f9"))
+        painter.drawRoundedRect(image_rect, 5, 5)
+        pixmap, loading = self.pixmapFor(image_path)
+        if pixmap and not pixmap.isNull():
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(image_rect.center())
+            painter.drawPixmap(target, pixmap)
+        else:
+            painter.setPen(QColor("#999"))
+            painter.setFont(self._placeholder_font)
+            painter.drawText(image_rect, Qt.AlignmentFlag.AlignCenter,
+                             "Đang tải..." if loading else "Không có\nhình ảnh")
+        y += IMAGE_HEIGHT + 8
+
+        # Tên sản phẩm
+        painter.setPen(QColor("#333"))
+        painter.setFont(self._name_font)
+        painter.drawText(QRect(x, y, IMAGE_WIDTH, 42),
+                         Qt.AlignmentFlag.AlignCenter | Qt.TextFlag.TextWordWrap, name)
+        y += 42 + 8
+
+        # Đường kẻ ngăn cách
+        painter.setPen(QPen(QColor("#eee"), 1))
+        painter.drawLine(x, y, x + IMAGE_WIDTH, y)
+        y += 8
+
+        # Giá
+        painter.setPen(QColor("#e53935"))
+        painter.setFont(self._price_font)
+        painter.drawText(QRect(x, y, IMAGE_WIDTH, 24), Qt.AlignmentFlag.AlignCenter, f"{price:,.0f} VNĐ")
+
+        # Nút thêm vào giỏ hàng
+        button = self.buttonRect(option.rect)
+        cursor_pos = option.widget.viewport().mapFromGlobal(QCursor.pos()) if option.widget else None
+        if self._pressed is not None and QModelIndex(self._pressed) == index:
+            button_color = "#2E7D32"
+        elif cursor_pos is not None and button.contains(cursor_pos):
+            button_color = "#388E3C"
+        else:
+            button_color = "#4CAF50"
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(button_color))
+        painter.drawRoundedRect(button, 5, 5)
+        painter.setPen(QColor("white"))
+        painter.setFont(self._button_font)
+        painter.drawText(button, Qt.AlignmentFlag.AlignCenter, "+ Thêm vào giỏ hàng")
+
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        on_button = self.buttonRect(option.rect).contains(event.position().toPoint())
+        if option.widget:
+            option.widget.viewport().update(option.rect)
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self._pressed = QPersistentModelIndex(index) if on_button else None
+            return on_button
+
+        was_pressed = self._pressed is not None and QModelIndex(self._pressed) == index
+        self._pressed = None
+        if was_pressed and on_button:
+            self.addToCartRequested.emit(index)
+        return was_pressed
+
+class ProductGridView(QListView):
+    # Lưới sản phẩm ảo hóa: chỉ các thẻ đang hiển thị mới được vẽ, không có widget con cho từng sản phẩm
+    addToCartRequested = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setMovement(QListView.Movement.Static)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(True)
+        self.setUniformItemSizes(True)
+        self.setSpacing(10)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+
+        # source_model: toàn bộ danh mục theo tên; search_model: kết quả tìm kiếm đã xếp hạng
+        self.source_model = ProductListModel(self)
+        self.search_model = ProductListModel(self)
+        self.setModel(self.source_model)
+
+        self.delegate = ProductCardDelegate(self)
+        self.delegate.addToCartRequested.connect(self._emitAddToCart)
+        self.setItemDelegate(self.delegate)
+
+        self._hover_rect = QRect()
+
+        # Vẽ lại khi ảnh nạp xong; hủy ảnh đang chờ của các thẻ đã cuộn ra khỏi màn hình
+        image_loader().thumbnailReady.connect(self.viewport().update)
+        self._cancel_timer = QTimer(self)
+        self._cancel_timer.setSingleShot(True)
+        self._cancel_timer.setInterval(100)
+        self._cancel_timer.timeout.connect(self.cancelOffscreenLoads)
+        self.verticalScrollBar().valueChanged.connect(self._cancel_timer.start)
+        for model in (self.source_model, self.search_model):
+            model.modelReset.connect(self._cancel_timer.start)
+            model.rowsRemoved.connect(self._cancel_timer.start)
+
+    def visibleImageKeys(self):
+        # Chỉ xét các dòng giữa thẻ ở góc trên-trái và góc dưới-phải của khung nhìn,
+        # nới thêm một hàng thẻ mỗi phía cho các hàng bị cắt dở
+        model = self.model()
+        count = model.rowCount()
+        if count == 0:
+            return set()
+        viewport_rect = self.viewport().rect()
+        first = self._edgeIndex(viewport_rect.topLeft(), 1)
+        last = self._edgeIndex(viewport_rect.bottomRight(), -1)
+        per_line = max(1, viewport_rect.width() // (CARD_WIDTH + 2 * self.spacing()))
+        first_row = max(0, first.row() - per_line) if first.isValid() else 0
+        last_row = min(count - 1, last.row() + per_line) if last.isValid() else count - 1
+
+        keys = set()
+        for row in range(first_row, last_row + 1):
+            index = model.index(row, 0)
+            if self.visualRect(index).intersects(viewport_rect):
+                image_path = index.data(ProductListModel.ProductRole)[4]
+                key = thumbnail_cache.cacheKey(image_path, IMAGE_WIDTH, IMAGE_HEIGHT)
+                if key is not None:
+                    keys.add(key)
+        return keys
+
+    def _edgeIndex(self, corner, direction):
+        # Góc có thể rơi vào khoảng trống giữa các thẻ: dò chéo vào trong khung nhìn
+        step = max(1, self.spacing())
+        reach = max(CARD_WIDTH, CARD_HEIGHT) + 2 * self.spacing()
+        for offset in range(0, reach, step):
+            index = self.indexAt(corner + QPoint(direction * offset, direction * offset))
+            if index.isValid():
+                return index
+        return QModelIndex()
+
+    def cancelOffscreenLoads(self):
+        if image_loader().pendingKeys(self.delegate):
+            image_loader().cancelGroup(self.delegate, keep=self.visibleImageKeys())
+
+    def setProducts(self, products):
+        self.source_model.setProducts(products)
+
+    def upsertProduct(self, product):
+        # Trả về False nếu đang hiển thị kết quả tìm kiếm mà sản phẩm chưa có trong đó
+        self.source_model.upsertProduct(product)
+        if self.isSearching():
+            return self.search_model.replaceProduct(product)
+        return True
+
+    def removeProduct(self, product_id):
+        self.source_model.removeProduct(product_id)
+        self.search_model.removeProduct(product_id)
+
+    def setSearchResults(self, products):
+        # Hiển thị kết quả theo đúng thứ tự xếp hạng
+        self.search_model.setProducts(products)
+        if self.model() is not self.search_model:
+            self.setModel(self.search_model)
+        self.scrollToTop()
+
+    def clearSearch(self):
+        if self.model() is not self.source_model:
+            self.search_model.setProducts([])
+            self.setModel(self.source_model)
+            self._cancel_timer.start()
+
+    def isSearching(self):
+        return self.model() is self.search_model
+
+    def visibleCount(self):
+        return self.model().rowCount()
+
+    def _emitAddToCart(self, index):
+        self.addToCartRequested.emit(index.data(ProductListModel.ProductRole))
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        # Cập nhật màu nút khi di chuột trong cùng một thẻ
+        pos = event.position().toPoint()
+        rect = self.visualRect(self.indexAt(pos))
+        if rect != self._hover_rect:
+            self.viewport().update(self._hover_rect)
+            self._hover_rect = rect
+        if rect.isValid():
+            self.viewport().update(rect)
+        on_button = rect.isValid() and ProductCardDelegate.buttonRect(rect).contains(pos)
+        self.viewport().setCursor(Qt.CursorShape.PointingHandCursor if on_button else Qt.CursorShape.ArrowCursor)
+
+    def leaveEvent(self, event):
+        super().leaveEvent(event)
+        self.viewport().update(self._hover_rect)
+        self._hover_rect = QRect()
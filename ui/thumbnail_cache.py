@@ -0,0 +1,68 @@
+# ui/thumbnail_cache.py
+# Cache ảnh thu nhỏ dùng chung cho mọi tab.
+# - Trên đĩa: services/thumbnail_store (product_images/.thumbs)
+# - Trong bộ nhớ: LRU các QPixmap theo (đường dẫn, mtime, kích thước), giới hạn theo dung lượng
+
+from collections import OrderedDict
+
+from PySide6.QtGui import QPixmap
+
+from services.thumbnail_store import source_key, load_thumbnail_image
+
+# Giới hạn bộ nhớ cho các QPixmap đã giải mã
+MEMORY_LIMIT_BYTES = 64 * 1024 * 1024
+
+class ThumbnailCache:
+    # Chỉ dùng trên luồng giao diện vì QPixmap không an toàn đa luồng
+    def __init__(self, memory_limit=MEMORY_LIMIT_BYTES):
+        self.memory_limit = memory_limit
+        self._pixmaps = OrderedDict()  # (path, mtime, w, h) -> QPixmap
+        self._bytes = 0
+
+    @staticmethod
+    def cacheKey(path, width, height):
+        key = source_key(path)
+        return None if key is None else (key[0], key[1], width, height)
+
+    def get(self, path, width, height):
+        key = self.cacheKey(path, width, height)
+        if key is None:
+            return None
+        pixmap = self.lookup(key)
+        if pixmap is not None:
+            return pixmap
+        image = load_thumbnail_image(path, width, height)
+        if image is None:
+            return None
+        return self.insert(key, image)
+
+    def lookup(self, key):
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def insert(self, key, image):
+        pixmap = QPixmap.fromImage(image)
+        if key in self._pixmaps:
+            self._bytes -= self._pixmapBytes(self._pixmaps.pop(key))
+        self._pixmaps[key] = pixmap
+        self._bytes += self._pixmapBytes(pixmap)
+        while self._bytes > self.memory_limit and len(self._pixmaps) > 1:
+            _, evicted = self._pixmaps.popitem(last=False)
+            self._bytes -= self._pixmapBytes(evicted)
+        return pixmap
+
+    def clear(self):
+        self._pixmaps.clear()
+        self._bytes = 0
+
+    @staticmethod
+    def _pixmapBytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+# Dùng chung trong toàn ứng dụng
+thumbnail_cache = ThumbnailCache()
+
+def get_thumbnail(path, width, height):
+    return thumbnail_cache.get(path, width, height)
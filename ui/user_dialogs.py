@@ -2,7 +2,47 @@ from PySide6.QtWidgets import (QDialog, QVBoxLayout, QGridLayout, QLabel,
                               QPushButton, QLineEdit, QMessageBox)
 from PySide6.QtCore import Qt
 
-from database_connection import connect_db
+from services.query_executor import query_executor
+
+def update_profile(conn, user_id, name, email, phone):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE users
+            SET name = %s, email = %s, phone = %s
+            WHERE id = %s
+        """, (name, email, phone, user_id))
+        conn.commit()
+    finally:
+        cursor.close()
+
+def change_password(conn, user_id, current_password, new_password):
+    # Chạy ở luồng nền; trả về thông báo lỗi, hoặc None nếu đã đổi mật khẩu
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT password FROM users 
+            WHERE id = %s
+        """, (user_id,))
+        
+        result = cursor.fetchone()
+        if not result:
+            return "Không tìm thấy thông tin người dùng!"
+        
+        # Kiểm tra mật khẩu (trong thực tế cần hash password)
+        if current_password != result[0]:
+            return "Mật khẩu hiện tại không đúng!"
+        
+        # Cập nhật mật khẩu mới
+        cursor.execute("""
+            UPDATE users 
+            SET password = %s 
+            WHERE id = %s
+        """, (new_password, user_id))
+        conn.commit()
+        return None
+    finally:
+        cursor.close()
 
 class UserProfileDialog(QDialog):
     def __init__(self, user_data, parent=None):
@@ -91,9 +131,9 @@ class UserProfileDialog(QDialog):
         button_layout.setColumnStretch(0, 1)
         button_layout.setColumnStretch(1, 1)
         
-        save_button = QPushButton("Lưu thay đổi")
-        save_button.clicked.connect(self.saveChanges)
-        button_layout.addWidget(save_button, 0, 0)
+        self.save_button = QPushButton("Lưu thay đổi")
+        self.save_button.clicked.connect(self.saveChanges)
+        button_layout.addWidget(self.save_button, 0, 0)
         
         cancel_button = QPushButton("Hủy")
         cancel_button.setObjectName("cancelButton")
@@ -116,29 +156,28 @@ class UserProfileDialog(QDialog):
             QMessageBox.warning(self, "Lỗi", "Vui lòng nhập email!")
             return
         
-        # Cập nhật thông tin vào CSDL
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE users
-                    SET name = %s, email = %s, phone = %s
-                    WHERE id = %s
-                """, (name, email, phone, self.user_data["id"]))
-                conn.commit()
-                
-                # Cập nhật lại dữ liệu người dùng
-                self.user_data["name"] = name
-                self.user_data["email"] = email
-                self.user_data["phone"] = phone
-                
-                QMessageBox.information(self, "Thành công", "Thông tin đã được cập nhật!")
-                self.accept()
-            except Exception as e:
-                QMessageBox.critical(self, "Lỗi", f"Không thể cập nhật thông tin: {str(e)}")
-            finally:
-                conn.close()
+        # Cập nhật thông tin vào CSDL ở luồng nền
+        self.save_button.setEnabled(False)
+        query_executor().submit(
+            update_profile, self.user_data["id"], name, email, phone,
+            owner=self, timeout=None,
+            on_result=lambda _: self.onProfileSaved(name, email, phone),
+            on_error=self.onSaveFailed
+        )
+    
+    def onProfileSaved(self, name, email, phone):
+        # Cập nhật lại dữ liệu người dùng
+        self.user_data["name"] = name
+        self.user_data["email"] = email
+        self.user_data["phone"] = phone
+        
+        QMessageBox.information(self, "Thành công", "Thông tin đã được cập nhật!")
+        self.accept()
+    
+    def onSaveFailed(self, e):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Lỗi", f"Không thể cập nhật thông tin: {str(e)}")
+
 class ChangePasswordDialog(QDialog):
     def __init__(self, user_id, parent=None):
         super().__init__(parent)
@@ -207,9 +246,9 @@ class ChangePasswordDialog(QDialog):
         button_layout.setColumnStretch(0, 1)
         button_layout.setColumnStretch(1, 1)
         
-        save_button = QPushButton("Đổi mật khẩu")
-        save_button.clicked.connect(self.changePassword)
-        button_layout.addWidget(save_button, 0, 0)
+        self.save_button = QPushButton("Đổi mật khẩu")
+        self.save_button.clicked.connect(self.changePassword)
+        button_layout.addWidget(self.save_button, 0, 0)
         
         cancel_button = QPushButton("Hủy")
         cancel_button.setObjectName("cancelButton")
@@ -236,40 +275,22 @@ class ChangePasswordDialog(QDialog):
             QMessageBox.warning(self, "Lỗi", "Mật khẩu mới phải có ít nhất 6 ký tự!")
             return
         
-        # Kiểm tra mật khẩu hiện tại
-        conn = connect_db()
-        if conn:
-            try:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT password FROM users 
-                    WHERE id = %s
-                """, (self.user_id,))
-                
-                result = cursor.fetchone()
-                if not result:
-                    QMessageBox.critical(self, "Lỗi", "Không tìm thấy thông tin người dùng!")
-                    return
-                
-                stored_password = result[0]
-                
-                # Kiểm tra mật khẩu (trong thực tế cần hash password)
-                if current_password != stored_password:
-                    QMessageBox.warning(self, "Lỗi", "Mật khẩu hiện tại không đúng!")
-                    return
-                
-                # Cập nhật mật khẩu mới
-                cursor.execute("""
-                    UPDATE users 
-                    SET password = %s 
-                    WHERE id = %s
-                """, (new_password, self.user_id))
-                
-                conn.commit()
-                QMessageBox.information(self, "Thành công", "Mật khẩu đã được cập nhật!")
-                self.accept()
-                
-            except Exception as e:
-                QMessageBox.critical(self, "Lỗi", f"Không thể cập nhật mật khẩu: {str(e)}")
-            finally:
-                conn.close()
\ No newline at end of file
+        # Kiểm tra mật khẩu hiện tại và cập nhật ở luồng nền
+        self.save_button.setEnabled(False)
+        query_executor().submit(
+            change_password, self.user_id, current_password, new_password,
+            owner=self, timeout=None,
+            on_result=self.onPasswordChanged, on_error=self.onChangeFailed
+        )
+    
+    def onPasswordChanged(self, error):
+        if error:
+            self.save_button.setEnabled(True)
+            QMessageBox.warning(self, "Lỗi", error)
+            return
+        QMessageBox.information(self, "Thành công", "Mật khẩu đã được cập nhật!")
+        self.accept()
+    
+    def onChangeFailed(self, e):
+        self.save_button.setEnabled(True)
+        QMessageBox.critical(self, "Lỗi", f"Không thể cập nhật mật khẩu: {str(e)}")